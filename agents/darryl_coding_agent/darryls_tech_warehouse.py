@@ -2,6 +2,8 @@ import ollama
 from multi_agent_orchestrator.agents import Agent, AgentOptions, AgentCallbacks
 from multi_agent_orchestrator.types import ConversationMessage
 from typing import List, Optional, Dict
+from common.streaming import StreamingResponse
+from common.tracing import span
 
 MODEL = "gemma3:1b"  # Default model
 
@@ -22,6 +24,9 @@ class DarrylBot(Agent):
         super().__init__(options)
         self.model = MODEL
 
+    def is_streaming_enabled(self) -> bool:
+        return True
+
     def set_model(self, model_name):
         """Switch between Gemma 1B and Gemma 4B."""
         if model_name in ["gemma3:1b", "gemma3:4b"]:
@@ -48,7 +53,7 @@ class DarrylBot(Agent):
             except ValueError as e:
                 return str(e)
 
-        return await self.generate_code(message)
+        return self.stream_code(message)
 
     def detect_language_from_prompt(self, prompt: str) -> str:
         known_languages = [
@@ -61,14 +66,25 @@ class DarrylBot(Agent):
                 return lang
         return "text"
 
-    async def generate_code(self, prompt):
-        """Generate code using the selected model."""
-        response = ollama.chat(model=self.model, messages=[{"role": "user", "content": prompt}])
-        content = response["message"]["content"] if "message" in response else "Error: No response."
-
+    def stream_code(self, prompt) -> StreamingResponse:
+        """Stream generated code from the selected model as it is produced."""
         language = self.detect_language_from_prompt(prompt)
 
-        return f"```{language}{content.strip()}```"
+        async def chunks():
+            with span("ollama.generate", model=self.model):
+                stream = await ollama.AsyncClient().chat(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True
+                )
+                async for part in stream:
+                    yield part["message"]["content"] if "message" in part else ""
+
+        return StreamingResponse(chunks(), prefix=f"```{language}", suffix="```")
+
+    async def generate_code(self, prompt):
+        """Generate code using the selected model."""
+        return await self.stream_code(prompt).text()
 
     async def debug_code(self, code_snippet):
         """Provide debugging suggestions for a given code snippet."""
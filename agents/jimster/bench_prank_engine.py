@@ -0,0 +1,72 @@
+"""
+Benchmarks applying a prank dictionary to large task lists.
+
+    python agents/jimster/bench_prank_engine.py --tasks 10000 100000 --entries 500
+
+"split" is the original prank_task: split on whitespace and look each word up in a dict.
+"matcher" applies PrankMatcher per task; "batch" applies it to the whole list in one pass.
+Matcher times include compiling the pattern.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from agents.jimster.prank_engine import PrankMatcher
+
+WORDS = [
+    "file", "report", "meeting", "sales", "call", "client", "paper", "beets", "audit", "invoice",
+    "schedule", "review", "order", "fax", "memo", "budget", "warehouse", "quarterly", "training", "party",
+]
+
+
+def make_tasks(count, rng):
+    tasks = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(3, 9))
+        words[0] = words[0].capitalize()
+        tasks.append(" ".join(words) + rng.choice(["", ".", "!", " (urgent)"]))
+    return tasks
+
+
+def make_dictionary(entries, rng):
+    pranks = {word: f"{word}-o-rama" for word in WORDS[:10]}
+    while len(pranks) < entries:
+        # Phrases of two or three words, plus filler entries that never match, as a big dictionary would.
+        phrase = " ".join(rng.choices(WORDS, k=rng.randint(2, 3))) if rng.random() < 0.5 else f"word{len(pranks)}"
+        pranks[phrase] = f"{phrase} but silly"
+    return pranks
+
+
+def split_lookup(tasks, pranks):
+    return [" ".join(pranks.get(word, word) for word in task.split()) for task in tasks]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--entries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pranks = make_dictionary(args.entries, rng)
+    print(f"📖 {len(pranks)} dictionary entries, {sum(' ' in key for key in pranks)} of them phrases")
+    print(f"{'tasks':>10}{'split ms':>12}{'matcher ms':>12}{'batch ms':>12}{'batch/task µs':>15}")
+    for count in args.tasks:
+        tasks = make_tasks(count, rng)
+        split = timed(lambda: split_lookup(tasks, pranks))
+        per_task = timed(lambda: [matcher.apply(task) for matcher in [PrankMatcher(pranks)] for task in tasks])
+        batch = timed(lambda: PrankMatcher(pranks).apply_batch(tasks))
+        print(f"{count:>10,}{split:>12.1f}{per_task:>12.1f}{batch:>12.1f}{batch * 1000 / count:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
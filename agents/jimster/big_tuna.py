@@ -5,6 +5,8 @@ from common.mistral_agent import MistralAgent
 from multi_agent_orchestrator.agents import Agent, AgentOptions, AgentCallbacks
 from multi_agent_orchestrator.types import ConversationMessage
 from typing import List, Optional, Dict
+from agents.jimster.prank_dictionary import PrankDictionary
+from agents.jimster.prank_engine import PrankMatcher
 
 CONFIG_FILE = "config.json"
 
@@ -27,6 +29,8 @@ class JimsterAgent(Agent):
         self.prank_mode = config["prank_mode"]
         self.prank_probability = config["prank_probability"]
         self.fake_task_probability = config["fake_task_probability"]
+        # Substitutions persist across runs; only words never seen before go to the model.
+        self.dictionary = PrankDictionary(self.suggest_substitutions)
 
     async def process_request(
         self,
@@ -41,16 +45,16 @@ class JimsterAgent(Agent):
         print(f"🤡 JimsterAgent received: {message}")
 
         if message.startswith("prankify task"):
-            task_description = message.replace("prankify task", "").strip()
-            prank_dict = self.generate_prank_dictionary([(task_description, "", "")])
-            pranked_task = self.prank_task(task_description, prank_dict)
+            task_description = message.replace("prankify task", "").strip(" :,")
+            prank_dict = await self.generate_prank_dictionary([(task_description, "", "")])
+            pranked_task = await self.prank_task(task_description, prank_dict)
             return f"🤡 Pranked Task: '{pranked_task}'"
 
-        elif message == "generate prank task":
-            fake_task = self.generate_fake_task()
+        elif message.rstrip(":,") == "generate prank task":
+            fake_task = await self.generate_fake_task()
             return f"🎭 Fake Task: {fake_task}"
 
-        elif message == "toggle prank mode":
+        elif message.rstrip(":,") == "toggle prank mode":
             return self.toggle_prank_mode()
 
         return "❌ Command not recognized."
@@ -76,65 +80,78 @@ class JimsterAgent(Agent):
         status = "ON" if self.prank_mode else "OFF"
         return f"🎭 Jimster's Prank Mode is now {status}!"
 
-    def generate_prank_dictionary(self, tasks: List[tuple]) -> Dict[str, str]:
-        """Generates a prank word substitution dictionary using Mistral."""
-        if not tasks:
-            return {}
-
-        task_descriptions = "\n".join([task[0] for task in tasks])
+    async def suggest_substitutions(self, words: List[str]) -> str:
+        """Asks Mistral for prank replacements for a batch of words; returns the raw reply."""
         prompt = f"""
         You are Jim Halpert from The Office. You love pranking Dwight.
-        Based on the following task descriptions, generate a humorous word substitution dictionary that makes tasks ridiculous but still recognizable.
-        
-        Task List:
-        {task_descriptions}
-        
+        For the following words from Dwight's task list, suggest humorous replacements that make tasks ridiculous but still recognizable.
+        Keys may also be short phrases made of these words, like "sales call". Leave out any word you would not replace.
+
+        Words:
+        {', '.join(words)}
+
         Example output format: {{"meeting": "party", "report": "memoir", "presentation": "stand-up routine"}}
         """
-        
-        response = self.mistral.generate_response(prompt)
-        try:
-            prank_dict = json.loads(response)
-            return prank_dict if isinstance(prank_dict, dict) else {}
-        except json.JSONDecodeError:
+        return await self.mistral.agenerate_response(prompt)
+
+    async def generate_prank_dictionary(self, tasks: List[tuple]) -> Dict[str, str]:
+        """Prank substitutions covering ``tasks``; the model is only asked about words it has not seen."""
+        if not tasks:
             return {}
+        return await self.dictionary.ensure(task[0] for task in tasks)
 
-    def prank_task(self, task: str, prank_dict: Optional[Dict[str, str]] = None) -> str:
+    async def prank_task(self, task: str, prank_dict: Optional[Dict[str, str]] = None) -> str:
         """Modifies task description using the prank dictionary."""
         if not self.prank_mode:
             return task
 
         if prank_dict is None:
-            prank_dict = self.generate_prank_dictionary([(task, "", "")])
+            prank_dict = await self.generate_prank_dictionary([(task, "", "")])
+
+        return self.matcher_for(prank_dict).apply(task)
+
+    async def prank_tasks(self, descriptions: List[str], prank_dict: Optional[Dict[str, str]] = None) -> List[str]:
+        """prank_task for a whole batch, in one pass of the matcher."""
+        if not self.prank_mode or not descriptions:
+            return list(descriptions)
+
+        if prank_dict is None:
+            prank_dict = await self.generate_prank_dictionary([(desc, "", "") for desc in descriptions])
 
-        words = task.split()
-        pranked_words = [prank_dict.get(word, word) for word in words]
-        return " ".join(pranked_words)
+        return self.matcher_for(prank_dict).apply_batch(descriptions)
 
-    def generate_fake_task(self) -> str:
+    def matcher_for(self, prank_dict: Dict[str, str]) -> PrankMatcher:
+        # The persistent dictionary keeps its compiled matcher; anything else is compiled here.
+        if prank_dict is self.dictionary.substitutions:
+            return self.dictionary.matcher
+        return PrankMatcher(prank_dict)
+
+    async def generate_fake_task(self) -> str:
         """Generates a single absurd fake task using Mistral."""
         prompt = """You are Jim Halpert from The Office. Generate a single, absurd fake task that would confuse Dwight but still seem vaguely plausible.
         **ONLY return the task description, no extra commentary.**
         Example Output:
         "Hide all of SchruteBot’s beets"
         """
-        return self.mistral.generate_response(prompt).strip().strip('"')
+        return (await self.mistral.agenerate_response(prompt)).strip().strip('"')
 
-    def prank_task_list(self, tasks: List[tuple]) -> List[tuple]:
+    async def prank_task_list(self, tasks: List[tuple]) -> List[tuple]:
         """Modifies some task descriptions in the task list and generates dynamic fake tasks."""
         if not self.prank_mode:
             return tasks
 
-        prank_dict = self.generate_prank_dictionary(tasks)
-        pranked_tasks = []
-
-        for desc, status, priority in tasks:
-            if random.random() < self.prank_probability:  # Use config value
-                desc = self.prank_task(desc, prank_dict)
-            pranked_tasks.append((desc, status, priority))
+        # Roll first: the dictionary is only needed for the tasks that get pranked.
+        chosen = [random.random() < self.prank_probability for _ in tasks]  # Use config value
+        selected = [task for task, pranked in zip(tasks, chosen) if pranked]
+        prank_dict = await self.generate_prank_dictionary(selected) if selected else {}
+        pranked = iter(await self.prank_tasks([task[0] for task in selected], prank_dict))
+        pranked_tasks = [
+            (next(pranked) if chosen_task else desc, status, priority)
+            for (desc, status, priority), chosen_task in zip(tasks, chosen)
+        ]
 
         if random.random() < self.fake_task_probability:  # Use config value
-            fake_task = self.generate_fake_task()
+            fake_task = await self.generate_fake_task()
             pranked_tasks.append((fake_task, "pending", "low"))
 
         return pranked_tasks
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from agents.jimster.prank_engine import PrankMatcher
+
+PRANK_DICTIONARY_FILE = "prank_dictionary.json"
+PRANK_WORDS_PER_CALL = 40  # New words sent to the model at once; the rest wait for the next call
+PRANK_RETRY_AFTER = 60 * 60  # Seconds before words from an unparseable reply are offered again
+
+# Words too common to be worth a substitution, so never sent to the model.
+SKIP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "of",
+    "on", "or", "the", "to", "up", "with", "my", "our", "your", "all", "new", "get", "do",
+}
+
+_WORD = re.compile(r"[a-z][a-z'-]+")
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def prank_words(text: str) -> List[str]:
+    """Lower-cased words of a task that are candidates for substitution, in order, without repeats."""
+    words = []
+    for word in _WORD.findall(text.lower()):
+        if word not in SKIP_WORDS and word not in words:
+            words.append(word)
+    return words
+
+
+def parse_substitutions(response: str) -> Dict[str, str]:
+    """The first JSON object in a model reply, keys lower-cased; raises ValueError if there is none."""
+    match = _JSON_OBJECT.search(response)
+    if not match:
+        raise ValueError("no JSON object in reply")
+    data = json.loads(match.group(0))
+    if not isinstance(data, dict):
+        raise ValueError("reply is not a JSON object")
+    return {str(key).lower().strip(): str(value).strip() for key, value in data.items()
+            if str(key).strip() and str(value).strip()}
+
+
+class PrankDictionary:
+    """
+    Word and phrase substitutions that grow with every task Jimster sees.
+
+    ``ensure`` sends only words the model has never been asked about, in one batch, and
+    remembers the answer in ``path``. Words the model chose not to replace are remembered
+    too, so they are not asked again. Words from a reply that fails to parse are held back
+    for ``retry_after`` seconds, so one bad reply does not cost a model call per task.
+    """
+
+    def __init__(self, generate: Callable[[List[str]], Awaitable[str]], path: str = PRANK_DICTIONARY_FILE,
+                 words_per_call: int = PRANK_WORDS_PER_CALL, retry_after: float = PRANK_RETRY_AFTER,
+                 clock: Callable[[], float] = time.time):
+        self.generate = generate
+        self.path = path
+        self.words_per_call = words_per_call
+        self.retry_after = retry_after
+        self.clock = clock
+        self.substitutions: Dict[str, str] = {}
+        self.seen = set()
+        self.failed: Dict[str, float] = {}  # word -> when a reply about it failed to parse
+        self.calls = 0
+        self._lock = asyncio.Lock()
+        self._matcher: Optional[PrankMatcher] = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.substitutions = dict(data.get("substitutions", {}))
+        self.seen = set(data.get("seen", [])) | set(self.substitutions)
+        self.failed = dict(data.get("failed", {}))
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # Write then rename, so a crash never leaves half a dictionary behind.
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, encoding="utf-8") as file:
+            json.dump({"substitutions": self.substitutions, "seen": sorted(self.seen), "failed": self.failed}, file)
+        os.replace(file.name, self.path)
+
+    @property
+    def matcher(self) -> PrankMatcher:
+        """Compiled once per version of the dictionary, not per task."""
+        if self._matcher is None:
+            self._matcher = PrankMatcher(self.substitutions)
+        return self._matcher
+
+    def unseen(self, texts: Iterable[str]) -> List[str]:
+        """Words never offered to the model, minus those whose last reply failed too recently."""
+        retry_before = self.clock() - self.retry_after
+        words = []
+        for text in texts:
+            words.extend(word for word in prank_words(text)
+                         if word not in self.seen and word not in words
+                         and self.failed.get(word, retry_before) <= retry_before)
+        return words
+
+    async def ensure(self, texts: Iterable[str]) -> Dict[str, str]:
+        """Makes sure the words in ``texts`` have been offered to the model; returns all substitutions."""
+        texts = list(texts)
+        if not self.unseen(texts):
+            return self.substitutions
+        # One caller asks at a time, so concurrent tasks with the same new words share a call.
+        async with self._lock:
+            words = self.unseen(texts)[:self.words_per_call]
+            if words:
+                self.calls += 1
+                try:
+                    found = parse_substitutions(await self.generate(words))
+                except ValueError:
+                    now = self.clock()
+                    self.failed.update((word, now) for word in words)
+                    self._save()
+                    return self.substitutions
+                self.substitutions.update(found)
+                self._matcher = None
+                self.seen.update(words)
+                self.seen.update(found)
+                for word in words:
+                    self.failed.pop(word, None)
+                self._save()
+        return self.substitutions
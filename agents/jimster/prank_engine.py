@@ -0,0 +1,91 @@
+import re
+from typing import Dict, List, Optional
+
+# Joins a batch into one string for a single regex pass. It is neither a word character nor
+# a space or tab, so no pattern can match across two descriptions.
+BATCH_SEPARATOR = "\x1f"
+
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(phrase: str) -> str:
+    return _SPACES.sub(" ", phrase.strip().lower())
+
+
+def trie_pattern(phrases) -> str:
+    """
+    One regex for all ``phrases``, factored by common prefix. A flat alternation makes the
+    engine try every phrase at every word; the trie only follows branches that still match.
+    Spaces inside phrases match any run of spaces or tabs.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a phrase
+
+    def emit(node) -> str:
+        branches = [
+            (r"[ \t]+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy: the longest phrase is tried first, and shorter ones when it fails to fit.
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def match_case(original: str, replacement: str) -> str:
+    """Gives ``replacement`` the casing of the text it replaces: UPPER, Capitalised or as written."""
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class PrankMatcher:
+    """
+    Applies a prank dictionary with one precompiled regex.
+
+    Keys may be words or phrases and match case-insensitively on word boundaries, so
+    "report," and "Sales  Meeting" are found too. Longer phrases win over the words inside
+    them, since the pattern is greedy. Replacements keep the casing of the text they replace.
+    """
+
+    def __init__(self, substitutions: Dict[str, str]):
+        self.substitutions = {}
+        for key, value in substitutions.items():
+            if _normalize(key) and value:
+                self.substitutions[_normalize(key)] = value
+        self.pattern: Optional[re.Pattern] = None
+        if self.substitutions:
+            # Whole words only, but a possessive "'s" may follow: "meeting's" pranks "meeting".
+            self.pattern = re.compile(rf"(?<![\w'])(?:{trie_pattern(self.substitutions)})(?!\w|'(?!s\b)\w)",
+                                      re.IGNORECASE)
+        self._replacements: Dict[str, str] = {}  # matched text -> cased replacement
+
+    def _replace(self, match: re.Match) -> str:
+        text = match.group(0)
+        replaced = self._replacements.get(text)
+        if replaced is None:
+            replacement = self.substitutions.get(_normalize(text))
+            replaced = self._replacements[text] = match_case(text, replacement) if replacement else text
+        return replaced
+
+    def apply(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._replace, text)
+
+    def apply_batch(self, texts: List[str]) -> List[str]:
+        """``apply`` over a whole list in one regex pass."""
+        if self.pattern is None or not texts:
+            return list(texts)
+        if any(BATCH_SEPARATOR in text for text in texts):
+            return [self.apply(text) for text in texts]
+        return self.apply(BATCH_SEPARATOR.join(texts)).split(BATCH_SEPARATOR)
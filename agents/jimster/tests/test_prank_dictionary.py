@@ -0,0 +1,82 @@
+import json
+import pytest
+
+from agents.jimster.big_tuna import JimsterAgent
+from agents.jimster.prank_dictionary import PrankDictionary, parse_substitutions, prank_words
+
+class Model:
+    """Answers with a fixed substitution table, restricted to the words it was asked about."""
+    def __init__(self, table, reply=None):
+        self.table = table
+        self.reply = reply
+        self.asked = []
+
+    async def __call__(self, words):
+        self.asked.append(list(words))
+        if self.reply is not None:
+            return self.reply
+        return "Sure! " + json.dumps({word: self.table[word] for word in words if word in self.table})
+
+TABLE = {"meeting": "party", "report": "memoir", "beets": "turnips"}
+
+def test_prank_words_skip_filler_and_repeats():
+    assert prank_words("File the TPS report, then FILE it again") == ["file", "tps", "report", "then", "again"]
+
+def test_parse_substitutions_finds_the_json_object():
+    assert parse_substitutions('Here you go: {"Meeting": "party"} enjoy') == {"meeting": "party"}
+    with pytest.raises(ValueError):
+        parse_substitutions("I'd rather not.")
+
+@pytest.mark.asyncio
+async def test_only_unseen_words_are_sent_and_the_answers_persist(tmp_path):
+    path = str(tmp_path / "pranks.json")
+    model = Model(TABLE)
+    dictionary = PrankDictionary(model, path)
+
+    assert await dictionary.ensure(["Weekly sales meeting"]) == {"meeting": "party"}
+    assert await dictionary.ensure(["Sales meeting report"]) == {"meeting": "party", "report": "memoir"}
+    # "weekly" was asked about once and not replaced; it is not asked again.
+    assert model.asked == [["weekly", "sales", "meeting"], ["report"]]
+    await dictionary.ensure(["weekly sales report"])
+    assert len(model.asked) == 2
+
+    reloaded_model = Model(TABLE)
+    reloaded = PrankDictionary(reloaded_model, path)
+    assert await reloaded.ensure(["Sales meeting report"]) == {"meeting": "party", "report": "memoir"}
+    assert reloaded_model.asked == []
+
+@pytest.mark.asyncio
+async def test_unparseable_reply_is_retried_only_after_a_while(tmp_path):
+    path = str(tmp_path / "pranks.json")
+    now = [1000.0]
+    model = Model(TABLE, reply="no")
+    dictionary = PrankDictionary(model, path, retry_after=60, clock=lambda: now[0])
+    assert await dictionary.ensure(["beets"]) == {}
+    model.reply = None
+    # Held back across restarts too, so the model is not asked on every task.
+    reloaded = PrankDictionary(model, path, retry_after=60, clock=lambda: now[0])
+    assert await reloaded.ensure(["beets"]) == {}
+    assert model.asked == [["beets"]]
+
+    now[0] += 61
+    assert await reloaded.ensure(["beets"]) == {"beets": "turnips"}
+    assert model.asked == [["beets"], ["beets"]]
+    assert reloaded.failed == {}
+
+@pytest.mark.asyncio
+async def test_prank_rolls_that_select_nothing_never_call_the_model(tmp_path):
+    # Skip __init__: it loads the Mistral model, which these rolls must never need.
+    jim = JimsterAgent.__new__(JimsterAgent)
+    model = Model(TABLE)
+    jim.dictionary = PrankDictionary(model, str(tmp_path / "pranks.json"))
+    jim.prank_mode = True
+    jim.fake_task_probability = 0.0
+    tasks = [("Sales meeting", "pending", "high"), ("Weekly report", "pending", "low")]
+
+    jim.prank_probability = 0.0
+    assert await jim.prank_task_list(tasks) == tasks
+    assert model.asked == []
+
+    jim.prank_probability = 1.0
+    assert await jim.prank_task_list(tasks) == [("Sales party", "pending", "high"), ("Weekly memoir", "pending", "low")]
+    assert len(model.asked) == 1
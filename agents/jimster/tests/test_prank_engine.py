@@ -0,0 +1,33 @@
+from agents.jimster.prank_engine import BATCH_SEPARATOR, PrankMatcher, match_case
+
+PRANKS = {"meeting": "party", "sales meeting": "bake sale", "report": "memoir", "tps": "TPS-ish"}
+
+def test_phrases_win_over_the_words_inside_them():
+    matcher = PrankMatcher(PRANKS)
+    assert matcher.apply("Prepare for the sales meeting") == "Prepare for the bake sale"
+    assert matcher.apply("Prepare for the meeting") == "Prepare for the party"
+
+def test_punctuation_whitespace_and_case_variants_match():
+    matcher = PrankMatcher(PRANKS)
+    assert matcher.apply("Report, then SALES   MEETING!") == "Memoir, then BAKE SALE!"
+    assert matcher.apply("(report) meeting's notes") == "(memoir) party's notes"
+
+def test_only_whole_words_are_replaced():
+    matcher = PrankMatcher(PRANKS)
+    assert matcher.apply("Reporters at the meetings") == "Reporters at the meetings"
+
+def test_match_case():
+    assert match_case("TPS", "memo") == "MEMO"
+    assert match_case("Report", "memoir") == "Memoir"
+    assert match_case("report", "Memoir") == "Memoir"
+
+def test_batch_matches_one_by_one_and_never_crosses_tasks():
+    matcher = PrankMatcher(PRANKS)
+    tasks = ["Sales", "meeting at noon", "File the TPS report", "", "Sales meeting"]
+    assert matcher.apply_batch(tasks) == [matcher.apply(task) for task in tasks]
+    assert matcher.apply_batch(["Sales", "meeting"]) == ["Sales", "party"]
+    assert matcher.apply_batch([f"a{BATCH_SEPARATOR}report"]) == [f"a{BATCH_SEPARATOR}memoir"]
+
+def test_empty_dictionary_changes_nothing():
+    assert PrankMatcher({}).apply_batch(["Sales meeting"]) == ["Sales meeting"]
+    assert PrankMatcher({"  ": "x", "beets": ""}).apply("beets") == "beets"
@@ -29,18 +29,21 @@ class OscarAgent(Agent):
         self.model = MODEL
         self.research_tool = DueDiligenceTool()
 
+    def is_streaming_enabled(self) -> bool:
+        return True
+
     async def handle_search_request(self, query: str) -> str:
         return await self.research_tool.search(query) #"Search functionality is currently unavailable. Please use summarization or deep crawl features."
 
-    async def handle_summarize_request(self, query: str) -> str:
+    async def handle_summarize_request(self, query: str, stream: bool = False):
         if not query or not query.strip():
             return "A specific query is required for summarized research."
-        return await self.research_tool.summarize_search_results(query.strip())
+        return await self.research_tool.summarize_search_results(query.strip(), stream=stream)
 
-    async def handle_deep_crawl_request(self, url: str) -> str:
+    async def handle_deep_crawl_request(self, url: str, stream: bool = False):
         if not url or not url.strip().startswith(('http://', 'https://')):
             return "Please provide a valid URL (starting with http:// or https://) for the deep crawl."
-        return await self.research_tool.deep_crawl_url(url.strip())
+        return await self.research_tool.deep_crawl_url(url.strip(), stream=stream)
 
     async def process_request(
         self,
@@ -60,5 +63,5 @@ class OscarAgent(Agent):
             except ValueError as e:
                 return str(e)
 
-        # Default behavior: summarize the query
-        return await self.handle_summarize_request(message)
\ No newline at end of file
+        # Default behavior: summarize the query, streaming the summary as it is written
+        return await self.handle_summarize_request(message, stream=True)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 import asyncio
 import logging
 from multi_agent_orchestrator.orchestrator import MultiAgentOrchestrator, OrchestratorConfig
@@ -7,12 +8,16 @@ from multi_agent_orchestrator.agents import Agent
 
 # Add project root to sys.path dynamically
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-from common.mistral_agent import MistralAgent
-from agents.jimster.big_tuna import JimsterAgent
-from agents.schrute_bot.schrute_bot import SchruteBot
-from agents.darryl_coding_agent.darryls_tech_warehouse import DarrylBot
-from agents.oscar.agent_oscar import OscarAgent
+from agents.registry import AgentRegistry, DEFAULT_AGENTS
 from common.mistral_classifier import MistralClassifier
+from common.streaming import StreamingResponse
+from common.sqlite_chat_storage import SqliteChatStorage, CHAT_DB_FILE
+from common.history_compactor import HistoryCompactor, build_summary_prompt
+from agents.pam_bot.planner import RequestPlanner, merge_responses
+from common import tracing
+
+# With a summary in front, history can reach further back than the default ten turns.
+CHAT_HISTORY_PAIRS = 25
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.CRITICAL)  # You can set this dynamically later
@@ -25,15 +30,12 @@ if not logging.getLogger().handlers:
     )
 
 class PamBot:
-    def __init__(self, log_verbose: bool = True):
-        # Initialize Mistral LLM
-        self.mistral = MistralAgent()
-        self.schrute_bot = SchruteBot()
-        self.jimster_agent = JimsterAgent()
-        self.darryl_agent = DarrylBot()
-        self.oscar_agent = OscarAgent()
+    def __init__(self, log_verbose: bool = True, registry: AgentRegistry = None, chat_db: str = CHAT_DB_FILE):
+        started = time.perf_counter()
+        # Agents are only described here; each one is imported and built on its first request.
+        self.registry = registry or AgentRegistry(DEFAULT_AGENTS)
         self.classifier = MistralClassifier()
-        
+        self._mistral = None
 
         self.DEFAULT_CONFIG = OrchestratorConfig(
             LOG_AGENT_CHAT=log_verbose,
@@ -49,32 +51,109 @@ class PamBot:
             GENERAL_ROUTING_ERROR_MSG_MESSAGE="An error occurred while processing your request. Please try again later."
         )
 
-        self.orchestrator = MultiAgentOrchestrator(options=self.DEFAULT_CONFIG, classifier=self.classifier)
+        # Conversations persist in SQLite; only recent sessions and their last few turns stay in memory.
+        # Older turns are folded into a running summary so history stays within a token budget.
+        self.chat_storage = SqliteChatStorage(chat_db, max_pairs=CHAT_HISTORY_PAIRS,
+                                              compactor=HistoryCompactor(self.summarize_history))
+        self.orchestrator = MultiAgentOrchestrator(options=self.DEFAULT_CONFIG, storage=self.chat_storage,
+                                                   classifier=self.classifier)
         self.register_agents()
+        # Compound messages are split into sub-requests, which are routed concurrently.
+        self.planner = RequestPlanner(is_command=self.classifier.command_router.starts_with_command)
+        # Stage timings go to DUNDER_TRACE_FILE when it is set; DUNDER_METRICS_PORT serves them at /metrics.
+        tracing.configure()
+        self.startup_time = time.perf_counter() - started
+        logger.info(f"PamBot ready in {self.startup_time * 1000:.0f} ms")
+
+    @property
+    def mistral(self):
+        if self._mistral is None:
+            from common.mistral_agent import MistralAgent
+            self._mistral = MistralAgent()
+        return self._mistral
+
+    async def summarize_history(self, previous: str, transcript: str, max_tokens: int) -> str:
+        """Summariser for the chat history compactor; runs on the shared local model."""
+        # The first call loads the model, so build the agent off the event loop.
+        mistral = self._mistral or await asyncio.to_thread(lambda: self.mistral)
+        return await mistral.service.generate(build_summary_prompt(previous, transcript, max_tokens),
+                                              max_tokens=max_tokens)
+
+    # Loaded on first access, like every other agent in the registry.
+    @property
+    def schrute_bot(self):
+        return self.registry.get("SchruteBot")
+
+    @property
+    def jimster_agent(self):
+        return self.registry.get("JimsterAgent")
+
+    @property
+    def darryl_agent(self):
+        return self.registry.get("DarrylAgent")
+
+    @property
+    def oscar_agent(self):
+        return self.registry.get("OscarAgent")
 
-    # Register agents    
+    # Register agents
     def register_agents(self):
-        """Registers all available agents."""
-        agents = [self.schrute_bot, 
-                  self.jimster_agent,
-                  self.darryl_agent,
-                  self.oscar_agent
-                  ]
+        """Registers a lazy proxy for every agent in the registry."""
+        agents = self.registry.proxies()
         for agent in agents:
             logger.debug(f"Type: {type(agent)}, Value: {agent}")
         # Pass agents list to the classifier before adding them
         self.classifier.set_agents(agents)
-        
+
         for agent in agents:
             self.orchestrator.add_agent(agent)
             logger.debug(f"✅ Registered agent: {agent.name}")
 
-    async def route_requests(self, message: str, user_id: str, session_id: str):
-        """Routes the user message to the appropriate agent."""
-        # Call the orchestrator's route_request method
+    def routing_stats(self):
+        """Classifier counters, such as the command fast-path hit rate."""
+        return self.classifier.stats()
+
+    def stats(self):
+        """Routing counters, queue depth and wait times of each loaded model, web cache and chat storage usage."""
+        from common.mistral_agent import inference_stats
+        from common.disk_cache import web_cache_stats
+        stats = self.routing_stats()
+        for model_name, service_stats in inference_stats().items():
+            stats[f"inference {model_name}"] = service_stats
+        cache_stats = web_cache_stats()
+        if cache_stats is not None:
+            stats["web cache"] = cache_stats
+        stats["chat storage"] = self.chat_storage.stats()
+        stats["planner"] = self.planner.stats()
+        return stats
+
+    def metrics(self) -> str:
+        """Stage timing histograms (routing, classification, agents, models, SQLite, crawls) in Prometheus text."""
+        return tracing.tracer().prometheus_text()
+
+    async def route_requests(self, message: str, user_id: str, session_id: str, stream: bool = False):
+        """Routes the user message to the appropriate agent.
+
+        With ``stream=True`` a streaming agent's output is left as a StreamingResponse for
+        the caller to render token by token; otherwise it is collected into a string.
+        A compound message is split into sub-requests that run concurrently; their answers
+        come back merged into one string.
+        """
+        with tracing.span("route_requests", session=session_id) as current:
+            parts = self.planner.plan(message)
+            current.attributes["parts"] = len(parts)
+            if len(parts) > 1:
+                responses = await self.planner.run(parts, lambda part: self.route_request(part, user_id, session_id))
+                return merge_responses(message, user_id, session_id, parts, responses)
+            return await self.route_request(message, user_id, session_id, stream)
+
+    async def route_request(self, message: str, user_id: str, session_id: str, stream: bool = False):
+        """Routes a single request through the orchestrator."""
         response = await self.orchestrator.route_request(
             user_input=message,
             user_id=user_id,
             session_id=session_id
         )
+        if not stream and isinstance(response.output, StreamingResponse):
+            response.output = await response.output.text()
         return response
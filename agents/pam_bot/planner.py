@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, List, Sequence
+
+from multi_agent_orchestrator.agents import AgentProcessingResult, AgentResponse
+
+logger = logging.getLogger(__name__)
+
+PLAN_CONCURRENCY = 3  # Sub-requests of one message that run at the same time
+
+# Where a compound message may be cut: a semicolon, a new line, or "and" / "then" / "and then".
+SPLIT_PATTERN = re.compile(r"\s*(?:;|\n|,?\s+and\s+then\s+|,?\s+then\s+|,?\s+and\s+)\s*", re.IGNORECASE)
+
+# Besides command phrases, a cut is only made before one of these, so "buy beets and eggs" stays whole.
+REQUEST_OPENERS = (
+    "write", "debug", "explain", "generate", "fix", "research", "summarize", "summarise",
+    "look up", "find", "give me", "tell me", "show me", "prank", "make up",
+)
+
+# Free-form parts that point back at an earlier one ("then summarize it") depend on it, so stay attached.
+BACK_REFERENCES = {"it", "them", "that", "this", "these", "those", "result", "results"}
+
+# Batch commands read the rest of the message, separators included, as their task list.
+BATCH_COMMANDS = ("add tasks", "complete tasks")
+
+
+class RequestPlanner:
+    """
+    Splits a compound message into sub-requests and runs them side by side.
+
+    "add task review Q3 numbers and write python to parse the CSV" becomes two requests,
+    routed on their own, so the reply takes as long as the slowest part rather than the sum.
+    Cuts happen only where the next part opens like a request of its own; anything else stays
+    a single request and goes through unchanged.
+    """
+
+    def __init__(self, is_command: Callable[[str], bool] = lambda text: False,
+                 max_concurrency: int = PLAN_CONCURRENCY):
+        self.is_command = is_command
+        self.max_concurrency = max_concurrency
+        self.compound = 0
+        self.sub_requests = 0
+
+    def opens_request(self, text: str) -> bool:
+        """True if ``text`` starts a request that stands on its own."""
+        if self.is_command(text):
+            return True  # a command carries its own arguments
+        lowered = text.lower()
+        if not any(lowered == opener or lowered.startswith(opener + " ") for opener in REQUEST_OPENERS):
+            return False
+        clause = SPLIT_PATTERN.split(lowered, maxsplit=1)[0]
+        return not BACK_REFERENCES.intersection(re.findall(r"\w+", clause))
+
+    def plan(self, message: str) -> List[str]:
+        """The sub-requests of ``message``, in order; a single item when it is not compound."""
+        parts = []
+        start = 0
+        for separator in SPLIT_PATTERN.finditer(message):
+            part = message[start:separator.start()].strip()
+            if part.lower().startswith(BATCH_COMMANDS):
+                break
+            if part and self.opens_request(message[separator.end():]):
+                parts.append(part)
+                start = separator.end()
+        parts.append(message[start:].strip())
+        return [part for part in parts if part] or [message]
+
+    async def run(self, parts: Sequence[str],
+                  route: Callable[[str], Awaitable[AgentResponse]]) -> List[AgentResponse]:
+        """Routes every part, at most ``max_concurrency`` at a time; results keep the order of ``parts``."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(part):
+            async with semaphore:
+                return await route(part)
+
+        self.compound += 1
+        self.sub_requests += len(parts)
+        return await asyncio.gather(*(limited(part) for part in parts), return_exceptions=True)
+
+    def stats(self):
+        return {"compound_requests": self.compound, "sub_requests": self.sub_requests}
+
+
+def merge_responses(message: str, user_id: str, session_id: str, parts: Sequence[str],
+                    responses: Sequence) -> AgentResponse:
+    """One response for a compound message: each part's answer under the agent that gave it."""
+    sections = []
+    agents = []
+    for part, response in zip(parts, responses):
+        if isinstance(response, BaseException):
+            logger.warning(f"Sub-request '{part}' failed: {response}")
+            sections.append(f"❌ **{part}**\nThat part could not be processed: {response}")
+            continue
+        agents.append(response.metadata)
+        sections.append(f"**{response.metadata.agent_name}** · {part}\n{response.output}")
+
+    metadata = AgentProcessingResult(
+        user_input=message,
+        agent_id=", ".join(dict.fromkeys(agent.agent_id for agent in agents)),
+        agent_name=", ".join(dict.fromkeys(agent.agent_name for agent in agents)),
+        user_id=user_id,
+        session_id=session_id,
+        additional_params={"sub_requests": list(parts)},
+    )
+    return AgentResponse(metadata=metadata, output="\n\n".join(sections), streaming=False)
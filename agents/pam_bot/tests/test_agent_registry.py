@@ -0,0 +1,81 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from multi_agent_orchestrator.agents import Agent, AgentOptions
+
+from agents.registry import AgentRegistry, AgentDescriptor, DEFAULT_AGENTS
+
+BUILT = []
+
+class EchoAgent(Agent):
+    def __init__(self, helper=None):
+        super().__init__(AgentOptions(name="EchoAgent", description="Echoes input."))
+        self.helper = helper
+        BUILT.append("EchoAgent")
+
+    async def process_request(self, input_text, user_id, session_id, chat_history, additional_params=None):
+        return f"echo: {input_text}"
+
+class HelperAgent(EchoAgent):
+    def __init__(self):
+        super().__init__()
+        BUILT[-1] = "HelperAgent"
+
+def make_registry():
+    BUILT.clear()
+    return AgentRegistry([
+        AgentDescriptor("EchoAgent", "Echoes input.", __name__, "EchoAgent", dependencies={"helper": "HelperAgent"}),
+        AgentDescriptor("HelperAgent", "Helps.", __name__, "HelperAgent"),
+    ])
+
+@pytest.mark.asyncio
+async def test_agents_are_built_on_first_request():
+    registry = make_registry()
+    proxies = registry.proxies()
+    assert [p.name for p in proxies] == ["EchoAgent", "HelperAgent"]
+    assert BUILT == []
+
+    response = await proxies[0].process_request("hi", "user", "session", [])
+    assert response == "echo: hi"
+    assert BUILT == ["HelperAgent", "EchoAgent"]
+    assert registry.get("EchoAgent").helper is registry.get("HelperAgent")
+
+    await proxies[0].process_request("again", "user", "session", [])
+    assert len(BUILT) == 2
+
+def test_duplicate_names_rejected():
+    registry = make_registry()
+    with pytest.raises(ValueError):
+        registry.register(AgentDescriptor("EchoAgent", "dup", __name__, "EchoAgent"))
+
+def test_pambot_starts_without_importing_agents(tmp_path):
+    from agents.pam_bot.agent_pam import PamBot
+    started = time.perf_counter()
+    pam = PamBot(log_verbose=False, chat_db=str(tmp_path / "chat_history.db"))
+    assert time.perf_counter() - started < 1.0
+    assert pam.registry.instances == {}
+    assert "gpt4all" not in sys.modules
+    assert {agent.name for agent in pam.classifier.agents} == {d.name for d in DEFAULT_AGENTS}
+
+@pytest.mark.asyncio
+async def test_first_summary_loads_the_model_off_the_event_loop(monkeypatch):
+    import common.mistral_agent
+    from agents.pam_bot.agent_pam import PamBot
+    built_on = []
+
+    class SlowMistral:
+        def __init__(self):
+            built_on.append(threading.current_thread())
+            time.sleep(0.05)  # stands in for loading the model
+            async def generate(prompt, **kwargs):
+                return f"summary ({kwargs['max_tokens']} tokens)"
+            self.service = SimpleNamespace(generate=generate)
+
+    monkeypatch.setattr(common.mistral_agent, "MistralAgent", SlowMistral)
+    pam = PamBot.__new__(PamBot)  # skips the orchestrator and storage setup
+    pam._mistral = None
+    assert await pam.summarize_history("", "User: hi", 64) == "summary (64 tokens)"
+    assert await pam.summarize_history("", "User: bye", 64) == "summary (64 tokens)"
+    assert built_on and built_on[0] is not threading.main_thread() and len(built_on) == 1
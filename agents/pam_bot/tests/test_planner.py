@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from multi_agent_orchestrator.agents import AgentProcessingResult, AgentResponse
+
+from agents.pam_bot.planner import RequestPlanner, merge_responses
+from agents.registry import DEFAULT_AGENTS
+from common.command_router import CommandRouter
+
+def make_planner(**kwargs):
+    router = CommandRouter()
+    router.compile({d.name: d.commands for d in DEFAULT_AGENTS})
+    return RequestPlanner(is_command=router.starts_with_command, **kwargs)
+
+def response(agent, output):
+    metadata = AgentProcessingResult(user_input="", agent_id=agent.lower(), agent_name=agent,
+                                     user_id="u", session_id="s")
+    return AgentResponse(metadata=metadata, output=output, streaming=False)
+
+@pytest.mark.parametrize("message, parts", [
+    ("add task review Q3 numbers and write python to parse the CSV",
+     ["add task review Q3 numbers", "write python to parse the CSV"]),
+    ("view tasks; daily report", ["view tasks", "daily report"]),
+    ("add task call Jim, then prankify task call Jim", ["add task call Jim", "prankify task call Jim"]),
+    ("add task buy beets and eggs", ["add task buy beets and eggs"]),
+    ("research robotics and then summarize it", ["research robotics and then summarize it"]),
+    ("view tasks and add task fix this bug", ["view tasks", "add task fix this bug"]),
+    ("add task a and add tasks b; c\nwrite d", ["add task a", "add tasks b; c\nwrite d"]),
+    ("complete tasks x; view tasks", ["complete tasks x; view tasks"]),
+    ("write a haiku; view tasks:", ["write a haiku", "view tasks:"]),
+])
+def test_plan_splits_only_before_a_new_request(message, parts):
+    assert make_planner().plan(message) == parts
+
+@pytest.mark.asyncio
+async def test_parts_run_concurrently_under_the_limit():
+    planner = make_planner(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def route(part):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return response("EchoAgent", part)
+
+    parts = ["view tasks", "daily report", "dwightism", "write code"]
+    responses = await asyncio.wait_for(planner.run(parts, route), timeout=5)
+    assert peak == 2
+    assert [r.output for r in responses] == parts
+    assert planner.stats() == {"compound_requests": 1, "sub_requests": 4}
+
+def test_merge_keeps_each_answer_and_reports_failures():
+    merged = merge_responses("add task a and write b", "u", "s", ["add task a", "write b", "research c"],
+                             [response("SchruteBot", "✅ Task added: a"), response("DarrylAgent", "print('b')"),
+                              RuntimeError("model offline")])
+    assert merged.metadata.agent_name == "SchruteBot, DarrylAgent"
+    assert merged.metadata.additional_params["sub_requests"] == ["add task a", "write b", "research c"]
+    sections = merged.output.split("\n\n")
+    assert sections[0] == "**SchruteBot** · add task a\n✅ Task added: a"
+    assert sections[1].endswith("print('b')")
+    assert "model offline" in sections[2]
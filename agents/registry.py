@@ -0,0 +1,205 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from multi_agent_orchestrator.agents import Agent, AgentOptions, AgentCallbacks
+from multi_agent_orchestrator.types import ConversationMessage
+from common.command_router import Command
+from common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentDescriptor:
+    """Everything the router needs to know about an agent without importing it."""
+    name: str
+    description: str
+    module: str
+    class_name: str
+    # Routing hints: example requests this agent should receive.
+    examples: List[str] = field(default_factory=list)
+    # Command grammar: inputs starting with these are routed here without the LLM classifier.
+    commands: List[Command] = field(default_factory=list)
+    # Constructor keyword -> name of another registered agent to pass in.
+    dependencies: Dict[str, str] = field(default_factory=dict)
+
+    def load_class(self):
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+
+class LazyAgent(Agent):
+    """Stand-in registered with the orchestrator; builds the real agent on its first request."""
+
+    def __init__(self, descriptor: AgentDescriptor, registry: "AgentRegistry"):
+        super().__init__(AgentOptions(
+            name=descriptor.name,
+            description=descriptor.description,
+            save_chat=True,
+            callbacks=AgentCallbacks(),
+            LOG_AGENT_DEBUG_TRACE=False
+        ))
+        self.descriptor = descriptor
+        self.registry = registry
+
+    @property
+    def examples(self) -> List[str]:
+        return self.descriptor.examples
+
+    @property
+    def commands(self) -> List[Command]:
+        return self.descriptor.commands
+
+    @property
+    def loaded(self) -> bool:
+        return self.registry.is_loaded(self.name)
+
+    def is_streaming_enabled(self) -> bool:
+        if not self.loaded:
+            return False
+        return self.registry.get(self.name).is_streaming_enabled()
+
+    async def process_request(
+        self,
+        input_text: str,
+        user_id: str,
+        session_id: str,
+        chat_history: List[ConversationMessage],
+        additional_params: Optional[Dict[str, str]] = None
+    ):
+        # For a streaming agent this times the start of the stream, not its last token.
+        with span("agent.process_request", agent=self.name, cold=not self.loaded):
+            agent = await self.registry.aget(self.name)
+            return await agent.process_request(input_text, user_id, session_id, chat_history, additional_params)
+
+
+class AgentRegistry:
+    """Keeps agent descriptors and constructs each agent the first time it is needed."""
+
+    def __init__(self, descriptors: Optional[List[AgentDescriptor]] = None):
+        self.descriptors: Dict[str, AgentDescriptor] = {}
+        self.instances: Dict[str, Agent] = {}
+        self.load_times: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        for descriptor in descriptors or []:
+            self.register(descriptor)
+
+    def register(self, descriptor: AgentDescriptor):
+        if descriptor.name in self.descriptors:
+            raise ValueError(f"An agent named '{descriptor.name}' is already registered.")
+        self.descriptors[descriptor.name] = descriptor
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.instances
+
+    def get(self, name: str) -> Agent:
+        """Returns the agent called ``name``, importing and constructing it on first use."""
+        if name in self.instances:
+            return self.instances[name]
+        if name not in self.descriptors:
+            raise KeyError(f"No agent named '{name}' is registered.")
+
+        with self._lock:
+            if name not in self.instances:
+                descriptor = self.descriptors[name]
+                started = time.perf_counter()
+                kwargs = {arg: self.get(dep) for arg, dep in descriptor.dependencies.items()}
+                self.instances[name] = descriptor.load_class()(**kwargs)
+                self.load_times[name] = time.perf_counter() - started
+                logger.info(f"Loaded {name} in {self.load_times[name]:.2f}s")
+            return self.instances[name]
+
+    async def aget(self, name: str) -> Agent:
+        """Like ``get`` but builds the agent off the event loop, since loading models can take a while."""
+        if name in self.instances:
+            return self.instances[name]
+        return await asyncio.to_thread(self.get, name)
+
+    def proxies(self) -> List[LazyAgent]:
+        return [LazyAgent(descriptor, self) for descriptor in self.descriptors.values()]
+
+
+DEFAULT_AGENTS = [
+    AgentDescriptor(
+        name="SchruteBot",
+        description="Assistant for managing tasks with a Dwight Schrute persona.",
+        module="agents.schrute_bot.schrute_bot",
+        class_name="SchruteBot",
+        examples=[
+            "assign a task to Jim",
+            "view my task list",
+            "mark the client proposal as complete",
+            "daily report",
+            "give me a dwight quote",
+        ],
+        commands=[
+            Command("add task"),
+            Command("add tasks"),
+            Command("complete task"),
+            Command("complete tasks"),
+            Command("view tasks"),
+            Command("search tasks"),
+            Command("daily report", exact=True),
+            Command("dwightism", exact=True),
+            Command("prank toggle"),
+        ],
+        dependencies={"jimster": "JimsterAgent"},
+    ),
+    AgentDescriptor(
+        name="JimsterAgent",
+        description="A prankster assistant specializing in humorous task modifications and fake assignments.",
+        module="agents.jimster.big_tuna",
+        class_name="JimsterAgent",
+        examples=[
+            "prank dwight's tasks",
+            "make up a fake task for dwight",
+            "play a joke on the office",
+        ],
+        commands=[
+            Command("prankify task"),
+            Command("generate prank task", exact=True),
+            Command("toggle prank mode", exact=True),
+        ],
+    ),
+    AgentDescriptor(
+        name="DarrylAgent",
+        description=(
+            "A helpful AI assistant that specializes in all programming tasks — "
+            "including writing code, debugging, optimizing, generating code from prompts, "
+            "explaining code, or answering technical questions."
+        ),
+        module="agents.darryl_coding_agent.darryls_tech_warehouse",
+        class_name="DarrylBot",
+        examples=[
+            "write code to sort a list",
+            "give me python code for binary search",
+            "how do I write a REST API in FastAPI?",
+            "debug this script",
+            "generate code",
+        ],
+        # DarrylBot.set_model only accepts these two; any other "set model" goes to OscarAgent.
+        commands=[
+            Command("set model gemma3:1b", exact=True),
+            Command("set model gemma3:4b", exact=True),
+        ],
+    ),
+    AgentDescriptor(
+        name="OscarAgent",
+        description=(
+            "A precise AI assistant modeled after Oscar Martinez. Capabilities include summarizing search results, "
+            "and deep crawling URLs to extract structured insights."
+        ),
+        module="agents.oscar.agent_oscar",
+        class_name="OscarAgent",
+        examples=[
+            "research the latest trends in electric vehicles",
+            "summarize what's new in robotics",
+            "look up the state of AI adoption in finance",
+        ],
+        commands=[Command("set model")],
+    ),
+]
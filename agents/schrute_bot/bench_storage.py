@@ -0,0 +1,112 @@
+"""
+Benchmarks SchruteBot's task storage against the original schema.
+
+    python agents/schrute_bot/bench_storage.py --rows 100000 1000000
+
+"legacy" is the pre-storage.py setup: rollback journal, no indexes, COUNT(*) after
+every insert and for the daily report. "store" is TaskStore.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from agents.schrute_bot.storage import PRIORITY_RANK_SQL, TaskStore, task_hash
+
+PRIORITIES = ["high", "medium", "low"]
+PAGE_SIZE = 50
+
+
+def seed_rows(count):
+    rng = random.Random(42)
+    for i in range(count):
+        description = f"task {i}"
+        status = "completed" if rng.random() < 0.3 else "pending"
+        yield description, status, rng.choice(PRIORITIES), task_hash(description)
+
+
+def timed(fn, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench_legacy(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            priority TEXT DEFAULT 'medium',
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            hash TEXT UNIQUE
+        )
+    """)
+    conn.executemany("INSERT INTO tasks (description, status, priority, hash) VALUES (?, ?, ?, ?)", seed_rows(rows))
+    conn.commit()
+
+    counter = iter(range(10 ** 9))
+
+    def add_task():
+        description = f"legacy new {next(counter)}"
+        conn.execute("INSERT INTO tasks (description, priority, hash) VALUES (?, ?, ?)",
+                     (description, "medium", task_hash(description)))
+        conn.commit()
+        conn.execute("SELECT COUNT(*) FROM tasks").fetchone()
+
+    results = {
+        "add task + count": timed(add_task),
+        "daily report count": timed(lambda: conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status = 'completed'").fetchone()),
+        f"first {PAGE_SIZE} by priority": timed(lambda: conn.execute(
+            f"SELECT description, status, priority FROM tasks ORDER BY {PRIORITY_RANK_SQL} LIMIT {PAGE_SIZE}").fetchall()),
+    }
+    conn.close()
+    return results
+
+
+def bench_store(path, rows):
+    store = TaskStore(path)
+    with store.conn:
+        store.conn.executemany("INSERT INTO tasks (description, status, priority, hash) VALUES (?, ?, ?, ?)",
+                               seed_rows(rows))
+
+    counter = iter(range(10 ** 9))
+
+    def add_task():
+        store.add_task(f"store new {next(counter)}")
+        store.count()
+
+    results = {
+        "add task + count": timed(add_task),
+        "daily report count": timed(lambda: store.count("completed")),
+        f"first {PAGE_SIZE} by priority": timed(lambda: store.conn.execute(
+            f"SELECT description, status, priority FROM tasks ORDER BY {PRIORITY_RANK_SQL}, id LIMIT {PAGE_SIZE}").fetchall()),
+    }
+    store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = bench_legacy(os.path.join(tmp, "legacy.db"), rows)
+            store = bench_store(os.path.join(tmp, "store.db"), rows)
+        print(f"\n📊 {rows:,} tasks (ms per call)")
+        print(f"{'operation':<28}{'legacy':>10}{'store':>10}{'speedup':>10}")
+        for name in legacy:
+            print(f"{name:<28}{legacy[name]:>10.3f}{store[name]:>10.3f}{legacy[name] / store[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
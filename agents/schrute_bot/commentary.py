@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMMENTARY_POOL_DEPTH = int(os.getenv("SCHRUTE_COMMENTARY_DEPTH", "5"))  # Lines kept ready per bucket
+COMMENTARY_LOW_WATER = int(os.getenv("SCHRUTE_COMMENTARY_LOW_WATER", "2"))  # Refill once a bucket drops below this
+REFILL_BACKOFF = 0.5  # Seconds the refiller waits while the model is busy with live requests
+
+Bucket = Tuple[str, str]  # (prompt_type, context)
+
+POP_SQL = """
+    DELETE FROM commentary_pool
+    WHERE id = (SELECT id FROM commentary_pool WHERE prompt_type = ? AND bucket = ? ORDER BY id LIMIT 1)
+    RETURNING text
+"""
+LEVEL_SQL = "SELECT COUNT(*) FROM commentary_pool WHERE prompt_type = ? AND bucket = ?"
+
+
+def pop_commentary(conn: sqlite3.Connection, prompt_type: str, bucket: str) -> Tuple[Optional[str], int]:
+    """Takes the oldest line in a bucket; returns it (or None) and how many are left."""
+    with conn:
+        row = conn.execute(POP_SQL, (prompt_type, bucket)).fetchone()
+        left = conn.execute(LEVEL_SQL, (prompt_type, bucket)).fetchone()[0]
+    return (row[0] if row else None), left
+
+
+def push_commentary(conn: sqlite3.Connection, prompt_type: str, bucket: str, text: str) -> int:
+    """Stores a generated line; returns the bucket's new level."""
+    with conn:
+        conn.execute("INSERT INTO commentary_pool (prompt_type, bucket, text) VALUES (?, ?, ?)",
+                     (prompt_type, bucket, text))
+        return conn.execute(LEVEL_SQL, (prompt_type, bucket)).fetchone()[0]
+
+
+def commentary_level(conn: sqlite3.Connection, prompt_type: str, bucket: str) -> int:
+    return conn.execute(LEVEL_SQL, (prompt_type, bucket)).fetchone()[0]
+
+
+def commentary_levels(conn: sqlite3.Connection) -> Dict[Bucket, int]:
+    rows = conn.execute("SELECT prompt_type, bucket, COUNT(*) FROM commentary_pool GROUP BY prompt_type, bucket")
+    return {(prompt_type, bucket): count for prompt_type, bucket, count in rows}
+
+
+class CommentaryPool:
+    """
+    Persona lines generated ahead of time, one queue per (prompt_type, context) bucket.
+
+    ``take`` serves the oldest pooled line straight from SQLite and only generates live
+    when the bucket is empty. Buckets that fall below ``low_water`` are topped back up to
+    ``depth`` by a single background task, one generation at a time, and only while
+    ``is_idle`` reports the model free, so refills never queue ahead of live requests.
+    Buckets fill lazily, on their first take; ``warm`` fills every known bucket up front.
+    Pooled lines are stored in the task database and survive restarts.
+    """
+
+    def __init__(
+        self,
+        store,
+        generate: Callable[[str, str], Awaitable[str]],
+        buckets: Iterable[Bucket] = (),
+        depth: int = COMMENTARY_POOL_DEPTH,
+        low_water: int = COMMENTARY_LOW_WATER,
+        is_idle: Callable[[], bool] = lambda: True
+    ):
+        self.store = store
+        self.generate = generate
+        self.buckets = list(buckets)
+        self.depth = depth
+        self.low_water = min(low_water, depth)
+        self.is_idle = is_idle
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[Bucket, None] = {}  # Insertion-ordered set of buckets to refill
+        self._refiller: Optional[asyncio.Task] = None
+
+    async def take(self, prompt_type: str, context: str = "") -> str:
+        text, left = await self.store.write(pop_commentary, prompt_type, context)
+        if text is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            text = await self.generate(prompt_type, context)
+        # Scheduled after any live generation so the refill queues behind it, not ahead.
+        if left < self.low_water:
+            self._schedule((prompt_type, context))
+        return text
+
+    async def warm(self):
+        """Queues a refill for every known bucket below the low-water mark; a long job on a cold pool."""
+        levels = await self.store.read(commentary_levels)
+        for bucket in self.buckets:
+            if levels.get(bucket, 0) < self.low_water:
+                self._schedule(bucket)
+
+    def _schedule(self, bucket: Bucket):
+        self._pending[bucket] = None
+        if self._refiller is None or self._refiller.done():
+            self._refiller = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        while self._pending:
+            prompt_type, context = bucket = next(iter(self._pending))
+            level = await self.store.read(commentary_level, prompt_type, context)
+            while level < self.depth:
+                while not self.is_idle():
+                    await asyncio.sleep(REFILL_BACKOFF)
+                try:
+                    text = await self.generate(prompt_type, context)
+                except Exception as e:
+                    # Leave the bucket short; the next take schedules it again.
+                    logger.warning(f"Commentary refill for {prompt_type} failed: {e}")
+                    break
+                level = await self.store.write(push_commentary, prompt_type, context, text)
+            self._pending.pop(bucket, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "pending_refills": len(self._pending)}
+
+    async def close(self):
+        if self._refiller is not None:
+            self._refiller.cancel()
+            try:
+                await self._refiller
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List
+
+from agents.schrute_bot.search import QUOTE_INDEXES
+
+TABLE_NAME = "office_lines"
+INGEST_BATCH_ROWS = 10_000  # Rows read per Arrow batch and committed per transaction
+CHECKSUM_CHUNK_BYTES = 1 << 20
+
+Batch = Dict[str, List[Any]]  # column name -> values, the shape of RecordBatch.to_pydict()
+
+INGEST_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS ingest_state (
+        source TEXT PRIMARY KEY,
+        checksum TEXT NOT NULL,
+        columns TEXT NOT NULL,
+        rows_done INTEGER NOT NULL DEFAULT 0,
+        complete INTEGER NOT NULL DEFAULT 0
+    )
+"""
+DWIGHT_QUOTES_SQL = """
+    CREATE TABLE IF NOT EXISTS dwight_quotes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        line_text TEXT UNIQUE
+    )
+"""
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHECKSUM_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_parquet_batches(path: str, batch_rows: int = INGEST_BATCH_ROWS, skip_rows: int = 0) -> Iterable[Batch]:
+    """Streams a Parquet file as column batches, skipping whole row groups already loaded."""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    row_groups = []
+    for group in range(parquet.num_row_groups):
+        group_rows = parquet.metadata.row_group(group).num_rows
+        if skip_rows >= group_rows:
+            skip_rows -= group_rows
+        else:
+            row_groups.append(group)
+    for batch in parquet.iter_batches(batch_size=batch_rows, row_groups=row_groups):
+        if skip_rows >= batch.num_rows:
+            skip_rows -= batch.num_rows
+            continue
+        yield batch.slice(skip_rows).to_pydict()
+        skip_rows = 0
+
+
+def parquet_columns(path: str) -> List[str]:
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path).schema_arrow.names
+
+
+def _reset(conn: sqlite3.Connection, source: str, checksum: str, columns: List[str]):
+    """Drops a previous load so a new or changed source starts from row zero."""
+    quoted = ", ".join(f'"{column}" TEXT' for column in columns)
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+        conn.execute(f"CREATE TABLE {TABLE_NAME} ({quoted})")
+        conn.execute("DELETE FROM dwight_quotes")
+        for index, (_, create_sql) in QUOTE_INDEXES.items():
+            conn.execute(create_sql)
+            conn.execute(f"INSERT INTO {index}({index}) VALUES ('delete-all')")
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest_state (source, checksum, columns, rows_done, complete) VALUES (?, ?, ?, 0, 0)",
+            (source, checksum, json.dumps(columns))
+        )
+
+
+def _load_batch(conn: sqlite3.Connection, source: str, columns: List[str], batch: Batch, first_rowid: int) -> int:
+    """Inserts one batch and everything derived from it in a single transaction; returns its row count."""
+    rows = list(zip(*(batch[column] for column in columns)))
+    if not rows:
+        return 0
+    names = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    with conn:
+        # Rowids follow the source row numbers, so rows_done is also the last rowid loaded.
+        conn.executemany(
+            f"INSERT INTO {TABLE_NAME} (rowid, {names}) VALUES (?, {placeholders})",
+            ((first_rowid + offset, *row) for offset, row in enumerate(rows))
+        )
+        last_rowid = first_rowid + len(rows) - 1
+        last_quote = conn.execute("SELECT COALESCE(MAX(id), 0) FROM dwight_quotes").fetchone()[0]
+        conn.execute(f"""
+            INSERT INTO dwight_quotes (line_text)
+            SELECT line_text FROM {TABLE_NAME} WHERE rowid BETWEEN ? AND ? AND speaker = 'Dwight'
+            ON CONFLICT(line_text) DO NOTHING
+        """, (first_rowid, last_rowid))
+        # The FTS indexes are external-content, so they are fed the same rowid ranges.
+        conn.execute(f"""
+            INSERT INTO office_lines_fts (rowid, line_text, speaker)
+            SELECT rowid, line_text, speaker FROM {TABLE_NAME} WHERE rowid BETWEEN ? AND ?
+        """, (first_rowid, last_rowid))
+        conn.execute("""
+            INSERT INTO dwight_quotes_fts (rowid, line_text)
+            SELECT id, line_text FROM dwight_quotes WHERE id > ?
+        """, (last_quote,))
+        conn.execute("UPDATE ingest_state SET rows_done = ? WHERE source = ?", (last_rowid, source))
+    return len(rows)
+
+
+def ingest(conn: sqlite3.Connection, source: str, checksum: str, columns: List[str], read_batches) -> Dict[str, Any]:
+    """
+    Loads a transcript into office_lines, dwight_quotes and their FTS indexes in one pass.
+
+    ``read_batches(skip_rows)`` yields column batches starting after the rows already
+    loaded. Each batch commits on its own, so an interrupted load resumes from the last
+    committed batch, and a source whose checksum and columns match a finished load is
+    skipped. Returns what was done as a dict for the caller to report.
+    """
+    with conn:
+        conn.execute(INGEST_STATE_SQL)
+        conn.execute(DWIGHT_QUOTES_SQL)
+    state = conn.execute(
+        "SELECT checksum, columns, rows_done, complete FROM ingest_state WHERE source = ?", (source,)
+    ).fetchone()
+    unchanged = state is not None and state[0] == checksum and json.loads(state[1]) == columns
+    if unchanged and state[3]:
+        return {"status": "skipped", "rows": state[2]}
+
+    status = "resumed" if unchanged and state[2] else "loaded"
+    rows_done = state[2] if unchanged else 0
+    if not unchanged:
+        _reset(conn, source, checksum, columns)
+
+    for batch in read_batches(rows_done):
+        rows_done += _load_batch(conn, source, columns, batch, rows_done + 1)
+
+    with conn:
+        conn.execute("UPDATE ingest_state SET complete = 1 WHERE source = ?", (source,))
+    for index in QUOTE_INDEXES:
+        conn.execute(f"INSERT INTO {index}({index}) VALUES ('optimize')")
+    conn.commit()
+    return {"status": status, "rows": rows_done}
@@ -0,0 +1,107 @@
+import random
+import sqlite3
+from typing import Iterable, List, Optional
+
+from agents.schrute_bot.search import _table_exists
+
+MAX_DRAWS_PER_QUOTE = 8  # Random ids tried per quote before gaps in the id range end the search
+
+# Cumulative quote lengths: the row whose running total first exceeds a random point in
+# [0, total) is picked with probability proportional to its length. Keying on the running
+# total makes that lookup a single rowid seek.
+QUOTE_WEIGHTS_SQL = """
+    CREATE TABLE IF NOT EXISTS dwight_quote_weights (
+        cumulative INTEGER PRIMARY KEY,
+        quote_id INTEGER NOT NULL
+    )
+"""
+QUOTE_WEIGHTS_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS dwight_quote_weights_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        quotes INTEGER NOT NULL,
+        max_id INTEGER NOT NULL
+    )
+"""
+
+
+def _quote_snapshot(conn: sqlite3.Connection):
+    return conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM dwight_quotes").fetchone()
+
+
+def build_quote_weights(conn: sqlite3.Connection, rebuild: bool = False) -> bool:
+    """
+    Builds the length-weighted sampling table, unless it already matches dwight_quotes.
+    Returns True when it was (re)built.
+    """
+    if not _table_exists(conn, "dwight_quotes"):
+        return False
+    with conn:
+        conn.execute(QUOTE_WEIGHTS_SQL)
+        conn.execute(QUOTE_WEIGHTS_STATE_SQL)
+        snapshot = _quote_snapshot(conn)
+        state = conn.execute("SELECT quotes, max_id FROM dwight_quote_weights_state").fetchone()
+        if not rebuild and state == snapshot:
+            return False
+        conn.execute("DELETE FROM dwight_quote_weights")
+        conn.execute("""
+            INSERT INTO dwight_quote_weights (cumulative, quote_id)
+            SELECT SUM(MAX(LENGTH(line_text), 1)) OVER (ORDER BY id), id FROM dwight_quotes
+        """)
+        conn.execute("INSERT OR REPLACE INTO dwight_quote_weights_state (id, quotes, max_id) VALUES (1, ?, ?)",
+                     snapshot)
+    return True
+
+
+def _uniform_ids(conn: sqlite3.Connection, k: int, rng: random.Random) -> List[int]:
+    low, high = conn.execute("SELECT MIN(id), MAX(id) FROM dwight_quotes").fetchone()
+    if low is None:
+        return []
+    ids = []
+    for _ in range(k * MAX_DRAWS_PER_QUOTE):
+        if len(ids) == k:
+            break
+        quote_id = rng.randint(low, high)
+        # Ids skipped by deduplicated inserts are redrawn, so every stored quote stays equally likely.
+        if quote_id not in ids and conn.execute("SELECT 1 FROM dwight_quotes WHERE id = ?", (quote_id,)).fetchone():
+            ids.append(quote_id)
+    return ids
+
+
+def _weighted_ids(conn: sqlite3.Connection, k: int, rng: random.Random) -> List[int]:
+    total = conn.execute("SELECT MAX(cumulative) FROM dwight_quote_weights").fetchone()[0]
+    if total is None:
+        return []
+    ids = []
+    for _ in range(k * MAX_DRAWS_PER_QUOTE):
+        if len(ids) == k:
+            break
+        row = conn.execute(
+            "SELECT quote_id FROM dwight_quote_weights WHERE cumulative > ? ORDER BY cumulative LIMIT 1",
+            (rng.randrange(total),)
+        ).fetchone()
+        if row and row[0] not in ids:
+            ids.append(row[0])
+    return ids
+
+
+def sample_quotes(conn: sqlite3.Connection, k: int, weighted: bool = False,
+                  exclude: Iterable[str] = (), rng: Optional[random.Random] = None) -> List[str]:
+    """
+    Up to ``k`` distinct random Dwight quotes, drawn by id straight from SQLite.
+
+    Uniform by default; ``weighted`` favours longer quotes in proportion to their length
+    (needs build_quote_weights). Quotes in ``exclude`` are never returned. Nothing is
+    loaded beyond the rows picked, so memory does not grow with the corpus.
+    """
+    if k <= 0 or not _table_exists(conn, "dwight_quotes"):
+        return []
+    rng = rng or random
+    exclude = set(exclude)
+    weighted = weighted and _table_exists(conn, "dwight_quote_weights")
+    ids = (_weighted_ids if weighted else _uniform_ids)(conn, k + len(exclude), rng)
+    if not ids:
+        return []
+    placeholders = ", ".join("?" for _ in ids)
+    texts = dict(conn.execute(f"SELECT id, line_text FROM dwight_quotes WHERE id IN ({placeholders})", ids).fetchall())
+    quotes = [texts[quote_id] for quote_id in ids if quote_id in texts and texts[quote_id] not in exclude]
+    return quotes[:k]
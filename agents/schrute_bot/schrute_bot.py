@@ -1,7 +1,5 @@
 import time
 import random
-import sqlite3
-import hashlib
 import sys
 import os
 # Add project root to sys.path dynamically
@@ -12,11 +10,70 @@ from multi_agent_orchestrator.types import ConversationMessage
 from typing import List, Optional, Dict
 from common.mistral_agent import MistralAgent
 from agents.jimster.big_tuna import JimsterAgent
+from agents.schrute_bot.storage import DB_FILE, PRIORITY_RANK, AsyncTaskStore, TaskQuery, decode_cursor
+from agents.schrute_bot.task_import import normalize_description, read_task_batch
+from agents.schrute_bot.search import build_quote_index, search_quotes
+from agents.schrute_bot.quotes import build_quote_weights, sample_quotes
+from agents.schrute_bot.commentary import CommentaryPool
 
-DB_FILE = "schrutebot.db"
+PRANK_SAMPLE_SIZE = 50  # Tasks shown to Jimster when building one prank dictionary for a batch
+BATCH_PREVIEW_SIZE = 10
+PROMPT_QUOTES = 5
+
+# Commentary scenarios. Each one is a pool bucket with lines generated ahead of time,
+# so they describe the situation without per-request details like counts.
+OVERCOMMITTED = "Oh boy, here he goes again... overcommitting."
+FIRST_TASK = "Finally, a task. I was starting to think you were as lazy as Jim."
+TASK_ADDED = "Good. Efficiency is key. Unlike Kevin’s work ethic."
+BATCH_ADDED = "A batch of tasks was just added at once. A true Schrute can handle any workload."
+BATCH_ADDED_DUPLICATES = "A batch of tasks was just added at once. Some were duplicates. Sloppy."
+BATCH_COMPLETED = "A batch of tasks was completed in one sweep."
+BATCH_COMPLETED_MISSING = "A batch of tasks was completed in one sweep. Some of them did not even exist. Lies."
+TASK_COMPLETED = "Impressive. But is it truly complete, or like Stanley's sales calls?"
+TASK_MISSING = "Either you never added it, or you're lying. I never tolerate liars."
+TASKS_VIEWED = "Report these findings to corporate."
+REPORT_ACCEPTABLE = "More than five tasks were completed today. Acceptable."
+REPORT_DISAPPOINTING = "Five tasks or fewer were completed today. Disappointing."
+
+COMMENTARY_BUCKETS = [
+    ("add_task", OVERCOMMITTED), ("add_task", FIRST_TASK), ("add_task", TASK_ADDED),
+    ("add_tasks", BATCH_ADDED), ("add_tasks", BATCH_ADDED_DUPLICATES),
+    ("complete_tasks", BATCH_COMPLETED), ("complete_tasks", BATCH_COMPLETED_MISSING),
+    ("complete_task", TASK_COMPLETED), ("task_missing", TASK_MISSING),
+    ("view_tasks", TASKS_VIEWED),
+    ("daily_report", REPORT_ACCEPTABLE), ("daily_report", REPORT_DISAPPOINTING),
+    ("dwightism", ""),
+]
+
+
+def parse_view_tasks(args: str):
+    """
+    Parses the arguments of ``view tasks``: ``page N``, ``status:<status>``, ``priority:<priority>``
+    or ``after <token>``. Returns (TaskQuery, page number, keyset or None); raises ValueError.
+    """
+    words = args.split()
+    if len(words) == 2 and words[0].lower() == "after":
+        return decode_cursor(words[1])
+
+    status = priority = None
+    page = 1
+    i = 0
+    while i < len(words):
+        word = words[i].lower()
+        if word == "page" and i + 1 < len(words) and words[i + 1].isdigit():
+            page = max(1, int(words[i + 1]))
+            i += 1
+        elif word.startswith("status:") and len(word) > len("status:"):
+            status = word[len("status:"):]
+        elif word.startswith("priority:") and word[len("priority:"):] in PRIORITY_RANK:
+            priority = word[len("priority:"):]
+        else:
+            raise ValueError(f"Unknown view tasks option: {words[i]}")
+        i += 1
+    return TaskQuery(status, priority), page, None
 
 class SchruteBot(Agent):
-    def __init__(self):
+    def __init__(self, jimster: Optional[JimsterAgent] = None):
         options = AgentOptions(
             name="SchruteBot",
             description="Assistant for managing tasks with a Dwight Schrute persona.",
@@ -25,42 +82,40 @@ class SchruteBot(Agent):
             LOG_AGENT_DEBUG_TRACE=False
         )
         super().__init__(options)
-        self.conn = sqlite3.connect(DB_FILE)
-        self.cursor = self.conn.cursor()
-        self.create_tables()
+        # Schema migrations, WAL and the task counters live in storage.py. Queries run on the
+        # store's own threads, so concurrent sessions never block the event loop or each other.
+        self.store = AsyncTaskStore(DB_FILE)
+        # Indexes the quote tables if setup.py loaded them after the last build. Quotes stay in
+        # SQLite and are sampled per prompt, so startup does not read the corpus.
+        for build in (build_quote_index, build_quote_weights):
+            self.store.submit_write(build).result()
         self.idle_time = 0
-        self.cached_quotes = self.load_dwight_quotes()
-        self.jimster = JimsterAgent()
+        # Share PamBot's Jimster when given so prank mode and the model handle stay in one place.
+        self.jimster = jimster or JimsterAgent()
         self.mistral = MistralAgent()
+        # Looked up once; the idle check runs on every refill step.
+        self.inference = self.mistral.service
+        # Handlers take pre-generated lines; the pool refills itself while the model is idle.
+        self.commentary = CommentaryPool(
+            self.store, self.generate_dynamic_response, COMMENTARY_BUCKETS,
+            is_idle=self.model_is_idle
+        )
 
-    def create_tables(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                description TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                priority TEXT DEFAULT 'medium',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                hash TEXT UNIQUE
-            )
-        ''')
-        self.conn.commit()
-
-    def generate_hash(self, task):
-        return hashlib.sha256(task.encode()).hexdigest()
-
-    def load_dwight_quotes(self):
-        try:
-            self.cursor.execute("SELECT line_text FROM dwight_quotes")
-            quotes = [row[0] for row in self.cursor.fetchall()]
-            return quotes if quotes else ["You have failed to populate quotes. Typical."]
-        except sqlite3.OperationalError:
-            return ["You have failed to set up the database correctly. Shame."]
-
-    def generate_dynamic_response(self, prompt_type, context=""):
-        quote_context = "\n".join(random.sample(self.cached_quotes, min(len(self.cached_quotes), 5)))
+    def model_is_idle(self) -> bool:
+        """True when no prompt is queued on or running in the shared model, so pool refills never delay a user."""
+        return self.inference.in_flight == 0
+
+    async def relevant_quotes(self, prompt_type, context=""):
+        """Quotes ranked by BM25 against the scenario, topped up with random ones when few match."""
+        quotes = await self.store.read(search_quotes, f"{prompt_type.replace('_', ' ')} {context}", PROMPT_QUOTES)
+        # Longer quotes give the model more of Dwight's voice, so the top-up favours them.
+        quotes += await self.store.read(sample_quotes, PROMPT_QUOTES - len(quotes), True, quotes)
+        return quotes or ["You have failed to populate quotes. Run setup.py. Typical."]
+
+    async def generate_dynamic_response(self, prompt_type, context=""):
+        quote_context = "\n".join(await self.relevant_quotes(prompt_type, context))
         prompt = f"Act as Dwight Schrute from The Office.\n\nScenario: {context}\n\nUse these quotes:\n{quote_context}\n\nRespond as Dwight."
-        return self.mistral.generate_response(prompt)
+        return await self.mistral.agenerate_response(prompt)
 
     async def process_request(
         self,
@@ -71,23 +126,37 @@ class SchruteBot(Agent):
         additional_params: Optional[Dict[str, str]] = None
     ) -> str:
         message = input_text.lower().strip()
+        # The router accepts "view tasks:" and "daily report,", so exact commands do too.
+        command = message.rstrip(":,")
+
+        # Batch commands keep the original text, since file paths are case-sensitive. Descriptions
+        # are normalised in the handlers, so single and batch commands find the same tasks.
+        if message.startswith("add tasks"):
+            return await self.add_tasks(input_text.strip()[len("add tasks"):].lstrip(" :"))
+
+        if message.startswith("complete tasks"):
+            return await self.complete_tasks(input_text.strip()[len("complete tasks"):].lstrip(" :"))
 
         if message.startswith("add task"):
-            desc = message.replace("add task", "").strip()
-            return self.add_task(desc)
+            desc = message.replace("add task", "").strip(" :,")
+            return await self.add_task(desc)
 
         if message.startswith("complete task"):
-            desc = message.replace("complete task", "").strip()
-            return self.complete_task(desc)
+            desc = message.replace("complete task", "").strip(" :,")
+            return await self.complete_task(desc)
+
+        if message.startswith("search tasks"):
+            return await self.search_tasks(input_text.strip()[len("search tasks"):].strip(" :,"))
 
-        if message == "view tasks":
-            return self.view_tasks()
+        if message.startswith("view tasks"):
+            # Page tokens are case-sensitive, so parse the original text.
+            return await self.view_tasks(input_text.strip()[len("view tasks"):].lstrip(" :,"))
 
-        if message == "daily report":
-            return self.daily_report()
+        if command == "daily report":
+            return await self.daily_report()
 
-        if message == "dwightism":
-            return self.dwightism()
+        if command == "dwightism":
+            return await self.dwightism()
 
         if message.startswith("prank toggle"):
             self.jimster.toggle_prank_mode()
@@ -95,66 +164,115 @@ class SchruteBot(Agent):
 
         return "❌ Command not recognized."
 
-    def add_task(self, task, priority="medium"):
-        task = self.jimster.prank_task(task)
-        task_hash = self.generate_hash(task)
-        self.cursor.execute("INSERT INTO tasks (description, priority, hash) VALUES (?, ?, ?)", (task, priority, task_hash))
-        self.conn.commit()
+    async def add_task(self, task, priority="medium"):
+        task = normalize_description(await self.jimster.prank_task(task))
+        if await self.store.add_task(task, priority) is None:
+            return f"⚠️ Task already on the list: {task}"
 
-        self.cursor.execute("SELECT COUNT(*) FROM tasks")
-        task_count = self.cursor.fetchone()[0]
+        task_count = await self.store.count()
 
-        context = (
-            "Oh boy, here he goes again... overcommitting." if task_count > 10 else
-            "Finally, a task. I was starting to think you were as lazy as Jim." if task_count == 1 else
-            "Good. Efficiency is key. Unlike Kevin’s work ethic."
-        )
-        commentary = self.generate_dynamic_response("add_task", context)
+        context = OVERCOMMITTED if task_count > 10 else FIRST_TASK if task_count == 1 else TASK_ADDED
+        commentary = await self.commentary.take("add_task", context)
         return f"✅ Task added: {task}\n\n💬 *{commentary}*"
 
-    def complete_task(self, task):
-        task_hash = self.generate_hash(task)
-        self.cursor.execute("UPDATE tasks SET status = 'completed' WHERE hash = ?", (task_hash,))
-        self.conn.commit()
+    async def add_tasks(self, source):
+        """Adds every task from a pasted list or a CSV/JSONL path in one transaction."""
+        try:
+            rows = read_task_batch(source)
+        except (OSError, ValueError) as e:
+            return f"❌ Could not read tasks: {e}"
+        if not rows:
+            return "❌ No tasks found. Paste one task per line, or give a CSV/JSONL file path."
+
+        if self.jimster.prank_mode:
+            # One prank dictionary for the whole batch instead of one LLM call per task.
+            sample = random.sample(rows, min(len(rows), PRANK_SAMPLE_SIZE))
+            prank_dict = await self.jimster.generate_prank_dictionary([(desc, "", "") for desc, _ in sample])
+            pranked = await self.jimster.prank_tasks([desc for desc, _ in rows], prank_dict)
+            rows = [(desc, priority) for desc, (_, priority) in zip(pranked, rows)]
 
-        if self.cursor.rowcount:
-            context = "Impressive. But is it truly complete, or like Stanley's sales calls?"
-            commentary = self.generate_dynamic_response("complete_task", context)
+        rows = [(normalize_description(desc), priority) for desc, priority in rows]
+        added = await self.store.add_tasks(rows)
+        skipped = len(rows) - added
+        commentary = await self.commentary.take("add_tasks", BATCH_ADDED_DUPLICATES if skipped else BATCH_ADDED)
+        preview = "\n".join(f"• {desc} ({priority.upper()})" for desc, priority in rows[:BATCH_PREVIEW_SIZE])
+        more = f"\n…and {len(rows) - BATCH_PREVIEW_SIZE} more" if len(rows) > BATCH_PREVIEW_SIZE else ""
+        skipped_note = f" ({skipped} already on the list)" if skipped else ""
+        return f"✅ Added {added} tasks{skipped_note}:\n{preview}{more}\n\n💬 *{commentary}*"
+
+    async def complete_tasks(self, source):
+        """Completes every task from a pasted list or a CSV/JSONL path in one transaction."""
+        try:
+            rows = read_task_batch(source)
+        except (OSError, ValueError) as e:
+            return f"❌ Could not read tasks: {e}"
+        if not rows:
+            return "❌ No tasks found. Paste one task per line, or give a CSV/JSONL file path."
+
+        completed = await self.store.complete_tasks(normalize_description(desc) for desc, _ in rows)
+        missing = len(rows) - completed
+        commentary = await self.commentary.take("complete_tasks", BATCH_COMPLETED_MISSING if missing else BATCH_COMPLETED)
+        missing_note = f", {missing} not found" if missing else ""
+        return f"✅ Completed {completed} tasks{missing_note}\n\n💬 *{commentary}*"
+
+    async def complete_task(self, task):
+        task = normalize_description(task)
+        if await self.store.complete_task(task):
+            commentary = await self.commentary.take("complete_task", TASK_COMPLETED)
             return f"✅ Task completed: {task}\n\n💬 *{commentary}*"
         else:
-            context = "Either you never added it, or you're lying. I never tolerate liars."
-            commentary = self.generate_dynamic_response("task_missing", context)
+            commentary = await self.commentary.take("task_missing", TASK_MISSING)
             return f"❌ Task not found: {task}\n\n💬 *{commentary}*"
 
-    def view_tasks(self):
-        self.cursor.execute("""
-            SELECT description, status, priority 
-            FROM tasks 
-            ORDER BY CASE priority 
-                WHEN 'high' THEN 1 
-                WHEN 'medium' THEN 2 
-                ELSE 3 END
-        """)
-        tasks = self.cursor.fetchall()
-        if not tasks:
-            return "📋 **Task List**\n\nNo tasks found. Productivity is the backbone of civilization!"
+    async def view_tasks(self, args=""):
+        """One page of tasks; only the rows on screen are pranked and formatted."""
+        try:
+            query, page_number, after = parse_view_tasks(args)
+        except ValueError as e:
+            return f"❌ {e}. Try `view tasks page 2`, `view tasks status:pending priority:high` or `view tasks after <token>`."
+
+        page = await self.store.task_page(query, page_number, after)
+        filters = " ".join(f"{name}:{value}" for name, value in (("status", query.status), ("priority", query.priority)) if value)
+        title = f"📋 **Task List**{f' ({filters})' if filters else ''} - page {page.number}"
+        if not page.rows:
+            if page.number > 1:
+                return f"{title}\n\nNo more tasks."
+            return f"{title}\n\nNo tasks found. Productivity is the backbone of civilization!"
 
-        tasks = self.jimster.prank_task_list(tasks)
-        lines = ["📋 **Task List**"]
+        tasks = await self.jimster.prank_task_list(page.rows)
+        lines = [title]
         for desc, status, priority in tasks:
             icon = {"high": "🔥", "medium": "📌", "low": "🧊"}.get(priority.lower(), "➖")
             lines.append(f"{icon} {desc.strip().capitalize()} - {status.upper()} ({priority.upper()})")
+        if page.total is not None:
+            lines.append(f"\n{page.total} tasks in total.")
+        if page.next_cursor:
+            lines.append(f"➡️ Next page: view tasks after {page.next_cursor}")
 
-        commentary = self.generate_dynamic_response("view_tasks", "Report these findings to corporate.")
+        if page.number > 1:
+            return "\n".join(lines)
+        # Dwight only comments once per listing, not on every page.
+        commentary = await self.commentary.take("view_tasks", TASKS_VIEWED)
         return "\n".join(lines) + f"\n\n💬 *{commentary}*"
 
-    def daily_report(self):
-        self.cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = 'completed'")
-        completed = self.cursor.fetchone()[0]
-        context = f"Today, {completed} tasks were completed. {'Acceptable.' if completed > 5 else 'Disappointing.'}"
-        commentary = self.generate_dynamic_response("daily_report", context)
+    async def search_tasks(self, terms):
+        """Full-text task search, best matches first."""
+        if not terms:
+            return "❌ Search for what? Try `search tasks paper sales`."
+        tasks = await self.store.search_tasks(terms)
+        if not tasks:
+            return f"🔍 No tasks match '{terms}'. Either it was never assigned, or someone shredded the evidence."
+        lines = [f"🔍 **Tasks matching '{terms}'**"]
+        for desc, status, priority in tasks:
+            icon = {"high": "🔥", "medium": "📌", "low": "🧊"}.get(priority.lower(), "➖")
+            lines.append(f"{icon} {desc.strip().capitalize()} - {status.upper()} ({priority.upper()})")
+        return "\n".join(lines)
+
+    async def daily_report(self):
+        completed = await self.store.count("completed")
+        commentary = await self.commentary.take("daily_report", REPORT_ACCEPTABLE if completed > 5 else REPORT_DISAPPOINTING)
         return f"📊 **Daily Report**\nTasks completed: {completed}\n\n💬 *{commentary}*"
 
-    def dwightism(self):
-        commentary = self.generate_dynamic_response("dwightism")
+    async def dwightism(self):
+        commentary = await self.commentary.take("dwightism")
         return f"💬 *{commentary}*"
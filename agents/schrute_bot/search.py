@@ -0,0 +1,90 @@
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+# Words that match nearly every line and only dilute BM25.
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "he", "her",
+    "his", "i", "if", "in", "into", "is", "it", "its", "me", "my", "no", "not", "of", "on", "or", "our",
+    "she", "so", "that", "the", "their", "them", "then", "there", "these", "they", "this", "to", "was",
+    "we", "were", "what", "when", "which", "who", "will", "with", "you", "your",
+}
+MAX_QUERY_TERMS = 16
+
+# External-content FTS5 indexes over the transcript tables created by setup.py. The rowids
+# point back at the source rows, so rebuild them whenever setup.py reloads the tables.
+QUOTE_INDEXES = {
+    "dwight_quotes_fts": (
+        "dwight_quotes",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS dwight_quotes_fts USING fts5("
+        "line_text, content='dwight_quotes', content_rowid='id', tokenize='porter unicode61')",
+    ),
+    "office_lines_fts": (
+        "office_lines",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS office_lines_fts USING fts5("
+        "line_text, speaker UNINDEXED, content='office_lines', tokenize='porter unicode61')",
+    ),
+}
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query that matches any of its meaningful words.
+    Each term is quoted, so user input can never be parsed as FTS5 syntax.
+    """
+    terms = []
+    for word in re.findall(r"\w+", text.lower()):
+        if len(word) > 1 and word not in STOPWORDS and word not in terms:
+            terms.append(word)
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms[:MAX_QUERY_TERMS])
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def build_quote_index(conn: sqlite3.Connection, rebuild: bool = False) -> List[str]:
+    """
+    Creates the FTS indexes for whichever transcript tables exist, filling any that are empty
+    (or all of them with ``rebuild``). Returns the indexes that were (re)built.
+    """
+    built = []
+    with conn:
+        for index, (source, create_sql) in QUOTE_INDEXES.items():
+            if not _table_exists(conn, source):
+                continue
+            conn.execute(create_sql)
+            # An external-content table reads through to its source, so look at the index's own rows.
+            empty = conn.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {index}_docsize)").fetchone()[0]
+            if rebuild or empty:
+                conn.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+                built.append(index)
+    return built
+
+
+def search_quotes(conn: sqlite3.Connection, context: str, k: int = 5) -> List[str]:
+    """Top ``k`` Dwight quotes for ``context``, best BM25 match first. Empty if nothing matches."""
+    query = fts_query(context)
+    if query is None or not _table_exists(conn, "dwight_quotes_fts"):
+        return []
+    rows = conn.execute(
+        "SELECT line_text FROM dwight_quotes_fts WHERE dwight_quotes_fts MATCH ? ORDER BY rank LIMIT ?",
+        (query, k)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def search_lines(conn: sqlite3.Connection, context: str, k: int = 5,
+                 speaker: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Top ``k`` (speaker, line) pairs from the whole transcript, optionally for one speaker."""
+    query = fts_query(context)
+    if query is None or not _table_exists(conn, "office_lines_fts"):
+        return []
+    sql = "SELECT speaker, line_text FROM office_lines_fts WHERE office_lines_fts MATCH ?"
+    params = [query]
+    if speaker:
+        sql += " AND speaker = ?"
+        params.append(speaker)
+    return conn.execute(sql + " ORDER BY rank LIMIT ?", (*params, k)).fetchall()
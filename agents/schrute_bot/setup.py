@@ -1,72 +1,48 @@
+import os
+import sys
 import sqlite3
-import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+from agents.schrute_bot.ingest import file_checksum, ingest, parquet_columns, read_parquet_batches
+from agents.schrute_bot.quotes import build_quote_weights
+from agents.schrute_bot.search import build_quote_index
 
 DB_FILE = "schrutebot.db"
 PARQUET_FILE = "train-00000-of-00001-f3693a9d93680a13.parquet"
-TABLE_NAME = "office_lines"
-
-def create_database():
-    """Creates a SQLite database and dynamically creates a table based on the Parquet file columns."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
 
-    # Load Parquet file into a DataFrame
-    df = pd.read_parquet(PARQUET_FILE)
-
-    # Dynamically create table schema based on Parquet columns
-    columns = ", ".join([f'"{col}" TEXT' for col in df.columns])
-    cursor.execute(f'CREATE TABLE IF NOT EXISTS {TABLE_NAME}  ({columns})')
-    # Ensure the Dwight quotes table exists
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS dwight_quotes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            line_text TEXT UNIQUE
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
 
-def populate_office_lines():
-    """Inserts the entire Parquet dataset into the office_lines table."""
+def load_transcript():
+    """
+    Streams the Parquet transcript into office_lines, dwight_quotes and their FTS indexes.
+    Unchanged files are skipped and interrupted loads pick up where they stopped.
+    """
     conn = sqlite3.connect(DB_FILE)
-    
-    # Load Parquet file
-    df = pd.read_parquet(PARQUET_FILE)
-
-    # Insert data into SQLite (replace existing duplicates)
-    df.to_sql(TABLE_NAME, conn, if_exists='replace', index=False)
-
-    conn.commit()
+    conn.execute("PRAGMA journal_mode=WAL")
+    result = ingest(
+        conn,
+        source=os.path.basename(PARQUET_FILE),
+        checksum=file_checksum(PARQUET_FILE),
+        columns=parquet_columns(PARQUET_FILE),
+        read_batches=lambda skip_rows: read_parquet_batches(PARQUET_FILE, skip_rows=skip_rows)
+    )
+    build_quote_weights(conn)
     conn.close()
-    print(f"✅ Entire dataset stored in {TABLE_NAME}!")
-
-def extract_dwight_quotes():
-    """Extracts Dwight Schrute's quotes into the dwight_quotes table."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Ensure the table exists before inserting
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS dwight_quotes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            line_text TEXT UNIQUE
-        )
-    ''')
+    if result["status"] == "skipped":
+        print(f"✅ {PARQUET_FILE} is unchanged, {result['rows']:,} lines already loaded.")
+    else:
+        print(f"✅ {result['rows']:,} lines {result['status']} into office_lines, with Dwight's quotes and search indexes!")
 
-    # Extract only Dwight's quotes from the office_lines table
-    cursor.execute(f'''
-        INSERT INTO dwight_quotes (line_text)
-        SELECT line_text FROM office_lines WHERE speaker = 'Dwight'
-        ON CONFLICT(line_text) DO NOTHING
-    ''')
 
-    conn.commit()
+def build_search_index():
+    """Rebuilds the FTS5 indexes over office_lines and dwight_quotes used for quote retrieval."""
+    conn = sqlite3.connect(DB_FILE)
+    built = build_quote_index(conn, rebuild=True)
     conn.close()
-    print("✅ Dwight Schrute quotes extracted successfully!")
+    print(f"✅ Full-text indexes rebuilt: {', '.join(built) or 'none'}")
 
 
 if __name__ == "__main__":
-    create_database()
-    populate_office_lines()
-    extract_dwight_quotes()
+    if "--rebuild-index" in sys.argv:
+        build_search_index()
+    else:
+        load_transcript()
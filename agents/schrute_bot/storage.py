@@ -0,0 +1,405 @@
+import asyncio
+import base64
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from agents.schrute_bot.search import fts_query
+from common.tracing import span
+
+DB_FILE = "schrutebot.db"
+
+# Must match the expression in the rank indexes exactly, or SQLite falls back to sorting.
+PRIORITY_RANK_SQL = "CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END"
+PRIORITY_RANK = {"high": 1, "medium": 2, "low": 3}
+PAGE_SIZE = 20
+
+# Each entry upgrades the schema by one version; PRAGMA user_version records how far a file has got.
+# Never edit a shipped migration, append a new one instead.
+MIGRATIONS = [
+    # 1: the original tasks table. IF NOT EXISTS adopts databases created before migrations existed.
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        priority TEXT DEFAULT 'medium',
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        hash TEXT UNIQUE
+    );
+    """,
+    # 2: indexes for view_tasks ordering and status filters.
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority_rank ON tasks(({PRIORITY_RANK_SQL}), id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+    """,
+    # 3: counters kept in step with tasks by triggers, so reports never scan the table.
+    """
+    CREATE TABLE IF NOT EXISTS task_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    DELETE FROM task_counters;
+    INSERT INTO task_counters (name, value) SELECT 'total', COUNT(*) FROM tasks;
+    INSERT INTO task_counters (name, value)
+        SELECT 'status:' || COALESCE(status, ''), COUNT(*) FROM tasks GROUP BY status;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_count_insert AFTER INSERT ON tasks BEGIN
+        UPDATE task_counters SET value = value + 1 WHERE name = 'total';
+        INSERT INTO task_counters (name, value) VALUES ('status:' || COALESCE(NEW.status, ''), 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_count_delete AFTER DELETE ON tasks BEGIN
+        UPDATE task_counters SET value = value - 1 WHERE name = 'total';
+        UPDATE task_counters SET value = value - 1 WHERE name = 'status:' || COALESCE(OLD.status, '');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_count_status AFTER UPDATE OF status ON tasks
+    WHEN OLD.status IS NOT NEW.status BEGIN
+        UPDATE task_counters SET value = value - 1 WHERE name = 'status:' || COALESCE(OLD.status, '');
+        INSERT INTO task_counters (name, value) VALUES ('status:' || COALESCE(NEW.status, ''), 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    END;
+    """,
+    # 4: one index per view_tasks filter combination, each already in page order.
+    # idx_tasks_status_rank also covers plain status lookups, so it replaces idx_tasks_status.
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_rank ON tasks(status, ({PRIORITY_RANK_SQL}), id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority, id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_priority ON tasks(status, priority, id);
+    DROP INDEX IF EXISTS idx_tasks_status;
+    """,
+    # 5: full-text index over task descriptions for "search tasks", kept in sync by triggers.
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        description, content='tasks', content_rowid='id', tokenize='porter unicode61'
+    );
+    INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild');
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, description) VALUES (NEW.id, NEW.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_update AFTER UPDATE OF description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        INSERT INTO tasks_fts(rowid, description) VALUES (NEW.id, NEW.description);
+    END;
+    """,
+    # 6: pre-generated commentary served by commentary.py, oldest first per bucket.
+    """
+    CREATE TABLE IF NOT EXISTS commentary_pool (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        prompt_type TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        text TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_commentary_pool_bucket ON commentary_pool(prompt_type, bucket, id);
+    """,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Statements are module constants so every call reuses sqlite3's per-connection prepared statement cache.
+INSERT_TASK_SQL = "INSERT OR IGNORE INTO tasks (description, priority, hash) VALUES (?, ?, ?)"
+COMPLETE_TASK_SQL = "UPDATE tasks SET status = 'completed' WHERE hash = ?"
+LIST_TASKS_SQL = f"SELECT description, status, priority FROM tasks ORDER BY {PRIORITY_RANK_SQL}, id"
+COUNTER_SQL = "SELECT value FROM task_counters WHERE name = ?"
+SEARCH_TASKS_SQL = """
+    SELECT t.description, t.status, t.priority
+    FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+    WHERE tasks_fts MATCH ?
+    ORDER BY tasks_fts.rank
+    LIMIT ?
+"""
+
+
+def task_hash(description: str) -> str:
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Brings the database up to SCHEMA_VERSION, one transaction per migration. Returns the new version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    return max(version, SCHEMA_VERSION)
+
+
+def connect(path: str = DB_FILE, read_only: bool = False) -> sqlite3.Connection:
+    """Opens a task database in WAL mode with the schema migrated to the latest version.
+
+    Read-only connections skip the migration; open a writable one first.
+    """
+    conn = sqlite3.connect(path, cached_statements=256, check_same_thread=False)
+    if read_only:
+        conn.execute("PRAGMA query_only=1")
+        return conn
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Safe with WAL: a crash can lose the last commits but never corrupts the file.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    migrate(conn)
+    return conn
+
+
+# Each query is a plain function of a connection, so the sync and async stores share them.
+# conn.execute opens a fresh cursor per call; no cursor outlives its query.
+
+def insert_task(conn: sqlite3.Connection, description: str, priority: str = "medium") -> Optional[int]:
+    with conn:
+        cursor = conn.execute(INSERT_TASK_SQL, (description, priority, task_hash(description)))
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def mark_completed(conn: sqlite3.Connection, description: str) -> bool:
+    with conn:
+        cursor = conn.execute(COMPLETE_TASK_SQL, (task_hash(description),))
+    return cursor.rowcount > 0
+
+
+def insert_tasks(conn: sqlite3.Connection, rows: Iterable[Tuple[str, str]]) -> int:
+    """Inserts (description, priority) rows in one transaction; duplicates are skipped. Returns rows added."""
+    with conn:
+        cursor = conn.executemany(
+            INSERT_TASK_SQL, ((desc, priority, task_hash(desc)) for desc, priority in rows)
+        )
+    return cursor.rowcount
+
+
+def mark_completed_many(conn: sqlite3.Connection, descriptions: Iterable[str]) -> int:
+    """Completes every matching task in one transaction. Returns how many tasks matched."""
+    with conn:
+        cursor = conn.executemany(COMPLETE_TASK_SQL, ((task_hash(desc),) for desc in descriptions))
+    return cursor.rowcount
+
+
+def select_tasks(conn: sqlite3.Connection) -> List[Tuple[str, str, str]]:
+    return conn.execute(LIST_TASKS_SQL).fetchall()
+
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """Filters for a paginated task listing."""
+    status: Optional[str] = None
+    priority: Optional[str] = None
+
+
+@dataclass
+class TaskPage:
+    rows: List[Tuple[str, str, str]]
+    number: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def encode_cursor(query: TaskQuery, page: int, rank: int, task_id: int) -> str:
+    """Opaque token for the page after (rank, task_id); it carries the filters so they stay applied."""
+    raw = f"{query.status or ''}|{query.priority or ''}|{page}|{rank}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[TaskQuery, int, Tuple[int, int]]:
+    """Returns (query, page number, (rank, id)) for a token from encode_cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        status, priority, page, rank, task_id = raw.split("|")
+        return TaskQuery(status or None, priority or None), int(page), (int(rank), int(task_id))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid page token: {token}") from e
+
+
+def select_task_page(conn: sqlite3.Connection, query: TaskQuery = TaskQuery(), page: int = 1,
+                     after: Optional[Tuple[int, int]] = None, limit: int = PAGE_SIZE) -> TaskPage:
+    """
+    One page of tasks in view_tasks order. ``after`` continues from a (rank, id) key, which
+    stays an index seek however deep the page is; without it ``page`` is reached by offset.
+    """
+    conditions, params = [], []
+    if query.status:
+        conditions.append("status = ?")
+        params.append(query.status)
+    if query.priority:
+        # A single priority has a single rank, so id alone orders the page.
+        conditions.append("priority = ?")
+        params.append(query.priority)
+        order_by = "id"
+        if after is not None:
+            conditions.append("id > ?")
+            params.append(after[1])
+    else:
+        order_by = f"{PRIORITY_RANK_SQL}, id"
+        if after is not None:
+            # Spelled out rather than as a row value so the leading rank bound becomes an index seek.
+            rank, task_id = after
+            conditions.append(f"({PRIORITY_RANK_SQL}) >= ? AND (({PRIORITY_RANK_SQL}) > ? OR id > ?)")
+            params.extend([rank, rank, task_id])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    offset = 0 if after is not None else (page - 1) * limit
+
+    rows = conn.execute(
+        f"SELECT description, status, priority, {PRIORITY_RANK_SQL}, id FROM tasks {where} "
+        f"ORDER BY {order_by} LIMIT ? OFFSET ?",
+        (*params, limit + 1, offset)
+    ).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        *_, rank, task_id = rows[-1]
+        next_cursor = encode_cursor(query, page + 1, rank, task_id)
+    total = read_counter(conn, query.status) if not query.priority else None
+    return TaskPage([row[:3] for row in rows], page, next_cursor, total)
+
+
+def search_tasks(conn: sqlite3.Connection, terms: str, limit: int = PAGE_SIZE) -> List[Tuple[str, str, str]]:
+    """(description, status, priority) of the tasks matching any of ``terms``, best BM25 match first."""
+    query = fts_query(terms)
+    if query is None:
+        return []
+    return conn.execute(SEARCH_TASKS_SQL, (query, limit)).fetchall()
+
+
+def read_counter(conn: sqlite3.Connection, status: Optional[str] = None) -> int:
+    name = "total" if status is None else f"status:{status}"
+    row = conn.execute(COUNTER_SQL, (name,)).fetchone()
+    return row[0] if row else 0
+
+
+class TaskStore:
+    """SchruteBot's tasks, backed by SQLite."""
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self.conn = connect(path)
+
+    def add_task(self, description: str, priority: str = "medium") -> Optional[int]:
+        """Inserts a task and returns its id, or None if an identical task already exists."""
+        return insert_task(self.conn, description, priority)
+
+    def complete_task(self, description: str) -> bool:
+        """Marks the task as completed. Returns False if there is no such task."""
+        return mark_completed(self.conn, description)
+
+    def add_tasks(self, rows: Iterable[Tuple[str, str]]) -> int:
+        """Bulk insert of (description, priority) rows. Returns how many were new."""
+        return insert_tasks(self.conn, rows)
+
+    def complete_tasks(self, descriptions: Iterable[str]) -> int:
+        return mark_completed_many(self.conn, descriptions)
+
+    def list_tasks(self) -> List[Tuple[str, str, str]]:
+        """(description, status, priority) rows, highest priority first, oldest first within a priority."""
+        return select_tasks(self.conn)
+
+    def count(self, status: Optional[str] = None) -> int:
+        """Number of tasks, or of tasks with ``status``, read from the trigger-maintained counters."""
+        return read_counter(self.conn, status)
+
+    def task_page(self, query: TaskQuery = TaskQuery(), page: int = 1,
+                  after: Optional[Tuple[int, int]] = None, limit: int = PAGE_SIZE) -> TaskPage:
+        return select_task_page(self.conn, query, page, after, limit)
+
+    def search_tasks(self, terms: str, limit: int = PAGE_SIZE) -> List[Tuple[str, str, str]]:
+        return search_tasks(self.conn, terms, limit)
+
+    def schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+READER_THREADS = 4
+
+
+class AsyncTaskStore:
+    """Awaitable task storage that keeps sqlite3 off the event loop.
+
+    Writes are serialised on one writer thread, which owns the only writable
+    connection. Reads run on a small pool of threads, each with its own read-only
+    connection. Under WAL they see the latest commit without waiting on the writer.
+    """
+
+    def __init__(self, path: str = DB_FILE, readers: int = READER_THREADS):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tasks-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="tasks-reader")
+        # Migrate on the writer before any reader connects.
+        self._writer.submit(self._connection, False).result()
+
+    def _connection(self, read_only: bool) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path, read_only=read_only)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _run(self, read_only: bool, fn: Callable[..., Any], args) -> Any:
+        return fn(self._connection(read_only), *args)
+
+    def submit_write(self, fn: Callable[..., Any], *args) -> Future:
+        """Runs ``fn(conn, *args)`` on the writer thread."""
+        return self._writer.submit(self._run, False, fn, args)
+
+    def submit_read(self, fn: Callable[..., Any], *args) -> Future:
+        """Runs ``fn(conn, *args)`` on a reader thread with a read-only connection."""
+        return self._readers.submit(self._run, True, fn, args)
+
+    async def write(self, fn: Callable[..., Any], *args) -> Any:
+        with span("db.write", op=fn.__name__):
+            return await asyncio.wrap_future(self.submit_write(fn, *args))
+
+    async def read(self, fn: Callable[..., Any], *args) -> Any:
+        with span("db.read", op=fn.__name__):
+            return await asyncio.wrap_future(self.submit_read(fn, *args))
+
+    async def add_task(self, description: str, priority: str = "medium") -> Optional[int]:
+        return await self.write(insert_task, description, priority)
+
+    async def complete_task(self, description: str) -> bool:
+        return await self.write(mark_completed, description)
+
+    async def add_tasks(self, rows: Iterable[Tuple[str, str]]) -> int:
+        return await self.write(insert_tasks, list(rows))
+
+    async def complete_tasks(self, descriptions: Iterable[str]) -> int:
+        return await self.write(mark_completed_many, list(descriptions))
+
+    async def list_tasks(self) -> List[Tuple[str, str, str]]:
+        return await self.read(select_tasks)
+
+    async def count(self, status: Optional[str] = None) -> int:
+        return await self.read(read_counter, status)
+
+    async def task_page(self, query: TaskQuery = TaskQuery(), page: int = 1,
+                        after: Optional[Tuple[int, int]] = None, limit: int = PAGE_SIZE) -> TaskPage:
+        return await self.read(select_task_page, query, page, after, limit)
+
+    async def search_tasks(self, terms: str, limit: int = PAGE_SIZE) -> List[Tuple[str, str, str]]:
+        return await self.read(search_tasks, terms, limit)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
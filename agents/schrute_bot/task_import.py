@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+import re
+from typing import List, Tuple
+
+PRIORITIES = ("high", "medium", "low")
+
+# "- [ ] ", "* ", "3. ", "2) " style list markers pasted from notes or markdown.
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]\s*)?(?:\[[ xX]?\]\s*)?(?:\d+[.)]\s*)?")
+# Optional trailing priority: "file TPS reports (high)" or "file TPS reports !high".
+_PRIORITY_SUFFIX = re.compile(r"\s*(?:\((high|medium|low)\)|!(high|medium|low))\s*$", re.IGNORECASE)
+
+TaskRow = Tuple[str, str]  # (description, priority)
+
+
+def _normalize_priority(value) -> str:
+    value = str(value or "").strip().lower()
+    return value if value in PRIORITIES else "medium"
+
+
+def normalize_description(description: str) -> str:
+    """Lower-cased with whitespace collapsed; task hashes are computed on this form on every path."""
+    return " ".join(description.lower().split())
+
+
+def parse_task_line(line: str) -> TaskRow:
+    line = _LIST_MARKER.sub("", line, count=1).strip()
+    match = _PRIORITY_SUFFIX.search(line)
+    if match:
+        return line[:match.start()].strip(), (match.group(1) or match.group(2)).lower()
+    return line, "medium"
+
+
+def parse_task_list(text: str) -> List[TaskRow]:
+    """One task per line (or per ';' on a single line), with optional list markers and priority suffixes."""
+    lines = text.splitlines() if "\n" in text.strip() else text.split(";")
+    rows = [parse_task_line(line) for line in lines]
+    return [(desc, priority) for desc, priority in rows if desc]
+
+
+def load_csv(path: str) -> List[TaskRow]:
+    """CSV with a ``description`` (or ``task``) column and optional ``priority``; without a header the first two columns are used."""
+    with open(path, newline="", encoding="utf-8") as file:
+        header = [cell.strip().lower() for cell in next(csv.reader([file.readline()]), [])]
+        file.seek(0)
+        if "description" in header or "task" in header:
+            rows = []
+            for record in csv.DictReader(file):
+                record = {(key or "").strip().lower(): value for key, value in record.items()}
+                desc = (record.get("description") or record.get("task") or "").strip()
+                if desc:
+                    rows.append((desc, _normalize_priority(record.get("priority"))))
+            return rows
+        return [
+            (record[0].strip(), _normalize_priority(record[1] if len(record) > 1 else None))
+            for record in csv.reader(file) if record and record[0].strip()
+        ]
+
+
+def load_jsonl(path: str) -> List[TaskRow]:
+    """One JSON value per line: a string, or an object with ``description``/``task`` and ``priority``."""
+    rows = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                rows.append(parse_task_line(record))
+            elif isinstance(record, dict):
+                desc = str(record.get("description") or record.get("task") or "").strip()
+                if desc:
+                    rows.append((desc, _normalize_priority(record.get("priority"))))
+    return rows
+
+
+def read_task_batch(argument: str) -> List[TaskRow]:
+    """Tasks from a CSV/JSONL file path, or from a pasted list if ``argument`` is not a file."""
+    path = os.path.expanduser(argument.strip().strip('"\''))
+    if "\n" not in path and os.path.isfile(path):
+        if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+            return load_jsonl(path)
+        return load_csv(path)
+    return parse_task_list(argument)
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import pytest
+
+from agents.schrute_bot.commentary import CommentaryPool, commentary_levels
+from agents.schrute_bot.schrute_bot import SchruteBot
+from agents.schrute_bot.storage import AsyncTaskStore
+from common.inference_service import InferenceService
+
+class Generator:
+    """Records every generation; lines are numbered so the test can tell them apart."""
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def __call__(self, prompt_type, context):
+        await asyncio.sleep(self.delay)
+        self.calls.append((prompt_type, context))
+        return f"{prompt_type} #{len(self.calls)}"
+
+@pytest.fixture
+def store(tmp_path):
+    store = AsyncTaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+async def settle(pool):
+    if pool._refiller is not None:
+        await pool._refiller
+
+@pytest.mark.asyncio
+async def test_empty_bucket_generates_live_then_refills_in_background(store):
+    generate = Generator()
+    pool = CommentaryPool(store, generate, depth=3, low_water=1)
+
+    assert await pool.take("dwightism") == "dwightism #1"
+    await settle(pool)
+    assert await store.read(commentary_levels) == {("dwightism", ""): 3}
+
+    # Pooled lines are served oldest first without touching the model.
+    assert await pool.take("dwightism") == "dwightism #2"
+    assert len(generate.calls) == 4
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_low_water_mark_triggers_refill_to_depth(store):
+    generate = Generator()
+    pool = CommentaryPool(store, generate, buckets=[("view_tasks", "Report")], depth=4, low_water=2)
+    await pool.warm()
+    await settle(pool)
+    assert len(generate.calls) == 4
+
+    await pool.take("view_tasks", "Report")
+    await pool.take("view_tasks", "Report")
+    await settle(pool)
+    # 4 -> 3 leaves it above the mark, 3 -> 2 does not drop below it either.
+    assert len(generate.calls) == 4
+    await pool.take("view_tasks", "Report")
+    await settle(pool)
+    assert len(generate.calls) == 7
+    assert await store.read(commentary_levels) == {("view_tasks", "Report"): 4}
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_survives_restart(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    store = AsyncTaskStore(path)
+    first = CommentaryPool(store, Generator(), buckets=[("daily_report", "Acceptable.")], depth=2)
+    await first.warm()
+    await settle(first)
+    await first.close()
+    store.close()
+
+    store = AsyncTaskStore(path)
+    generate = Generator()
+    second = CommentaryPool(store, generate, buckets=[("daily_report", "Acceptable.")], depth=2, low_water=1)
+    assert await second.take("daily_report", "Acceptable.") == "daily_report #1"
+    assert generate.calls == []
+    await second.close()
+    store.close()
+
+@pytest.mark.asyncio
+async def test_refill_waits_while_the_model_is_busy(store):
+    busy = True
+    generate = Generator()
+    pool = CommentaryPool(store, generate, buckets=[("dwightism", "")], depth=2, is_idle=lambda: not busy)
+    await pool.warm()
+    await asyncio.sleep(0.05)
+    assert generate.calls == []
+
+    busy = False
+    await asyncio.wait_for(settle(pool), timeout=5)
+    assert len(generate.calls) == 2
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_schrutebot_idle_check_lets_the_pool_refill(store):
+    service = InferenceService(lambda prompt, **kwargs: "unused", name="test-model")
+    bot = SchruteBot.__new__(SchruteBot)  # skips loading the real model
+    bot.inference = service
+    generate = Generator()
+    pool = CommentaryPool(store, generate, buckets=[("dwightism", "")], depth=2, low_water=1,
+                          is_idle=bot.model_is_idle)
+    try:
+        await pool.warm()
+        await asyncio.wait_for(settle(pool), timeout=5)
+        assert await store.read(commentary_levels) == {("dwightism", ""): 2}
+        assert await pool.take("dwightism") == "dwightism #1"
+        assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 0
+    finally:
+        await pool.close()
+        service.close()
+
+@pytest.mark.asyncio
+async def test_schrutebot_is_busy_while_a_generation_runs():
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate(prompt, **kwargs):
+        started.set()
+        release.wait()
+        return prompt
+
+    service = InferenceService(generate, name="test-model")
+    bot = SchruteBot.__new__(SchruteBot)
+    bot.inference = service
+    future = service.submit("live request")
+    assert started.wait(5)
+    assert not bot.model_is_idle()
+    release.set()
+    future.result(5)
+    assert bot.model_is_idle()
+    service.close()
+
+@pytest.mark.asyncio
+async def test_first_take_fills_only_its_own_bucket(store):
+    generate = Generator()
+    buckets = [("dwightism", ""), ("view_tasks", "Report"), ("daily_report", "Acceptable.")]
+    pool = CommentaryPool(store, generate, buckets=buckets, depth=2, low_water=1)
+    await pool.take("dwightism")
+    await settle(pool)
+    assert set(generate.calls) == {("dwightism", "")}
+    assert await store.read(commentary_levels) == {("dwightism", ""): 2}
+    await pool.close()
@@ -0,0 +1,93 @@
+import sqlite3
+import pytest
+
+from agents.schrute_bot.ingest import file_checksum, ingest
+from agents.schrute_bot.search import build_quote_index, search_lines, search_quotes
+
+COLUMNS = ["season", "episode", "speaker", "line_text"]
+LINES = [
+    ("Dwight", "Bears. Beets. Battlestar Galactica."),
+    ("Jim", "Bears, beets, Battlestar Galactica."),
+    ("Dwight", "Identity theft is not a joke, Jim!"),
+    ("Michael", "That's what she said."),
+    ("Dwight", "Bears. Beets. Battlestar Galactica."),
+    ("Dwight", "I grow beets on my beet farm."),
+    ("Pam", "I don't care what they say about me."),
+]
+
+def batches(lines, size):
+    """Column batches shaped like RecordBatch.to_pydict(), as read_parquet_batches yields them."""
+    for start in range(0, len(lines), size):
+        chunk = lines[start:start + size]
+        yield {
+            "season": [1] * len(chunk),
+            "episode": list(range(start, start + len(chunk))),
+            "speaker": [speaker for speaker, _ in chunk],
+            "line_text": [text for _, text in chunk],
+        }
+
+def reader(lines, size=3):
+    def read_batches(skip_rows):
+        return batches(lines[skip_rows:], size)
+    return read_batches
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "office.db"))
+    yield conn
+    conn.close()
+
+def test_loads_lines_quotes_and_indexes_in_one_pass(conn):
+    assert ingest(conn, "office.parquet", "v1", COLUMNS, reader(LINES)) == {"status": "loaded", "rows": 7}
+
+    assert conn.execute("SELECT COUNT(*) FROM office_lines").fetchone()[0] == 7
+    # The repeated line is stored once.
+    assert conn.execute("SELECT COUNT(*) FROM dwight_quotes").fetchone()[0] == 3
+    assert search_quotes(conn, "identity joke", k=1) == ["Identity theft is not a joke, Jim!"]
+    assert search_lines(conn, "battlestar", speaker="Jim") == [("Jim", "Bears, beets, Battlestar Galactica.")]
+    # The indexes were filled during the load, so there is nothing left to build.
+    assert build_quote_index(conn) == []
+
+def test_unchanged_source_is_skipped(conn):
+    ingest(conn, "office.parquet", "v1", COLUMNS, reader(LINES))
+
+    def must_not_read(skip_rows):
+        raise AssertionError("an unchanged file was read again")
+
+    assert ingest(conn, "office.parquet", "v1", COLUMNS, must_not_read) == {"status": "skipped", "rows": 7}
+
+def test_interrupted_load_resumes_after_the_last_committed_batch(conn):
+    def crashing(skip_rows):
+        yield from batches(LINES[:3], 3)
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        ingest(conn, "office.parquet", "v1", COLUMNS, crashing)
+    assert conn.execute("SELECT COUNT(*) FROM office_lines").fetchone()[0] == 3
+
+    skipped = []
+    def resuming(skip_rows):
+        skipped.append(skip_rows)
+        return reader(LINES)(skip_rows)
+
+    assert ingest(conn, "office.parquet", "v1", COLUMNS, resuming) == {"status": "resumed", "rows": 7}
+    assert skipped == [3]
+    rows = conn.execute("SELECT speaker, line_text FROM office_lines ORDER BY rowid").fetchall()
+    assert rows == LINES
+    assert conn.execute("SELECT COUNT(*) FROM dwight_quotes").fetchone()[0] == 3
+    assert len(search_lines(conn, "beets", k=10)) == 4
+
+def test_changed_source_replaces_the_previous_load(conn):
+    ingest(conn, "office.parquet", "v1", COLUMNS, reader(LINES))
+    assert ingest(conn, "office.parquet", "v2", COLUMNS, reader(LINES[3:])) == {"status": "loaded", "rows": 4}
+
+    assert conn.execute("SELECT COUNT(*) FROM office_lines").fetchone()[0] == 4
+    assert search_lines(conn, "identity") == []
+    assert search_quotes(conn, "beet farm", k=1) == ["I grow beets on my beet farm."]
+
+def test_file_checksum_tracks_content(tmp_path):
+    path = tmp_path / "office.parquet"
+    path.write_bytes(b"PAR1" * 1000)
+    first = file_checksum(str(path))
+    path.write_bytes(b"PAR1" * 1001)
+    assert file_checksum(str(path)) != first
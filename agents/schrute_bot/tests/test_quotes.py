@@ -0,0 +1,60 @@
+import random
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from agents.schrute_bot.quotes import build_quote_weights, sample_quotes
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "office.db"))
+    conn.execute("CREATE TABLE dwight_quotes (id INTEGER PRIMARY KEY AUTOINCREMENT, line_text TEXT UNIQUE)")
+    conn.executemany("INSERT INTO dwight_quotes (line_text) VALUES (?)", [(f"quote {i}",) for i in range(20)])
+    # Leave gaps in the id range, as deduplicated inserts do.
+    conn.execute("DELETE FROM dwight_quotes WHERE id % 3 = 0")
+    conn.commit()
+    yield conn
+    conn.close()
+
+def test_uniform_sample_is_distinct_and_skips_id_gaps(conn):
+    rng = random.Random(7)
+    quotes = sample_quotes(conn, 5, rng=rng)
+    stored = {row[0] for row in conn.execute("SELECT line_text FROM dwight_quotes")}
+    assert len(quotes) == len(set(quotes)) == 5
+    assert set(quotes) <= stored
+
+    counts = Counter(quote for _ in range(3000) for quote in sample_quotes(conn, 1, rng=rng))
+    assert set(counts) == stored
+    # Every surviving quote is about equally likely, including those right after a gap.
+    assert max(counts.values()) < 2 * min(counts.values())
+
+def test_excluded_quotes_are_never_returned(conn):
+    exclude = [row[0] for row in conn.execute("SELECT line_text FROM dwight_quotes LIMIT 10")]
+    for seed in range(20):
+        assert not set(sample_quotes(conn, 3, exclude=exclude, rng=random.Random(seed))) & set(exclude)
+
+def test_weighted_sample_favours_longer_quotes(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "weighted.db"))
+    conn.execute("CREATE TABLE dwight_quotes (id INTEGER PRIMARY KEY AUTOINCREMENT, line_text TEXT UNIQUE)")
+    conn.executemany("INSERT INTO dwight_quotes (line_text) VALUES (?)", [("Fact.",), ("Bears. " * 20,)])
+    conn.commit()
+    assert build_quote_weights(conn)
+    assert not build_quote_weights(conn)
+
+    rng = random.Random(1)
+    counts = Counter(sample_quotes(conn, 1, weighted=True, rng=rng)[0] for _ in range(2000))
+    assert counts["Bears. " * 20] > 20 * counts["Fact."]
+
+    # New quotes make the table stale, and the next build picks them up.
+    conn.execute("INSERT INTO dwight_quotes (line_text) VALUES ('Identity theft is not a joke, Jim!')")
+    conn.commit()
+    assert build_quote_weights(conn)
+    assert conn.execute("SELECT COUNT(*) FROM dwight_quote_weights").fetchone()[0] == 3
+    conn.close()
+
+def test_missing_table_samples_nothing(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "empty.db"))
+    assert sample_quotes(conn, 5) == []
+    assert not build_quote_weights(conn)
+    conn.close()
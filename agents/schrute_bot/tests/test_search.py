@@ -0,0 +1,52 @@
+import sqlite3
+import pytest
+
+from agents.schrute_bot.search import build_quote_index, fts_query, search_lines, search_quotes
+
+LINES = [
+    ("Dwight", "Bears. Beets. Battlestar Galactica."),
+    ("Dwight", "I grow beets on my beet farm, the finest beets in Pennsylvania."),
+    ("Dwight", "Identity theft is not a joke, Jim!"),
+    ("Dwight", "Whenever I'm about to do something, I think, would an idiot do that?"),
+    ("Jim", "Bears, beets, Battlestar Galactica."),
+    ("Michael", "That's what she said."),
+]
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "office.db"))
+    conn.execute("CREATE TABLE office_lines (speaker TEXT, line_text TEXT)")
+    conn.executemany("INSERT INTO office_lines VALUES (?, ?)", LINES)
+    conn.execute("CREATE TABLE dwight_quotes (id INTEGER PRIMARY KEY AUTOINCREMENT, line_text TEXT UNIQUE)")
+    conn.execute("INSERT INTO dwight_quotes (line_text) SELECT line_text FROM office_lines WHERE speaker = 'Dwight'")
+    conn.commit()
+    yield conn
+    conn.close()
+
+def test_fts_query_quotes_terms_and_drops_stopwords():
+    assert fts_query('The "beet" farm AND OR NEAR(') == '"beet" OR "farm" OR "near"'
+    assert fts_query("the a of") is None
+
+def test_index_is_built_once_and_rebuilt_on_request(conn):
+    assert build_quote_index(conn) == ["dwight_quotes_fts", "office_lines_fts"]
+    assert build_quote_index(conn) == []
+    assert build_quote_index(conn, rebuild=True) == ["dwight_quotes_fts", "office_lines_fts"]
+
+def test_quotes_are_ranked_by_relevance(conn):
+    build_quote_index(conn)
+    quotes = search_quotes(conn, "Someone stole my identity, and it's no joke", k=2)
+    assert quotes[0] == "Identity theft is not a joke, Jim!"
+
+    # Porter stemming: "beet" matches "beets", and the beet-heavy line ranks first.
+    assert search_quotes(conn, "beet harvest", k=5)[0].startswith("I grow beets")
+
+def test_transcript_search_can_filter_by_speaker(conn):
+    build_quote_index(conn)
+    assert {speaker for speaker, _ in search_lines(conn, "battlestar galactica")} == {"Dwight", "Jim"}
+    assert search_lines(conn, "battlestar galactica", speaker="Jim") == [("Jim", "Bears, beets, Battlestar Galactica.")]
+
+def test_missing_tables_return_nothing(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "empty.db"))
+    assert build_quote_index(conn) == []
+    assert search_quotes(conn, "beets") == []
+    conn.close()
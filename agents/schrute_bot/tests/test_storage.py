@@ -0,0 +1,219 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+
+from agents.schrute_bot.storage import (
+    AsyncTaskStore, LIST_TASKS_SQL, SCHEMA_VERSION, TaskQuery, TaskStore, decode_cursor, encode_cursor,
+    select_task_page, task_hash
+)
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+def test_new_database_is_migrated_and_in_wal_mode(store):
+    assert store.schema_version() == SCHEMA_VERSION
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_legacy_database_is_upgraded_with_counters(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            priority TEXT DEFAULT 'medium',
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            hash TEXT UNIQUE
+        )
+    """)
+    conn.executemany("INSERT INTO tasks (description, status, hash) VALUES (?, ?, ?)",
+                     [("sell paper", "completed", task_hash("sell paper")),
+                      ("guard beets", "pending", task_hash("guard beets"))])
+    conn.commit()
+    conn.close()
+
+    store = TaskStore(path)
+    assert store.schema_version() == SCHEMA_VERSION
+    assert store.count() == 2
+    assert store.count("completed") == 1
+    store.close()
+
+def test_reopening_does_not_rerun_migrations(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    store = TaskStore(path)
+    store.add_task("sell paper")
+    store.close()
+
+    store = TaskStore(path)
+    assert store.count() == 1
+    store.close()
+
+def test_counters_follow_inserts_updates_and_deletes(store):
+    assert store.add_task("sell paper", "high") is not None
+    assert store.add_task("guard beets") is not None
+    assert store.add_task("sell paper") is None  # duplicate
+    assert store.count() == 2
+    assert store.count("pending") == 2
+
+    assert store.complete_task("sell paper")
+    assert store.complete_task("sell paper")  # already done, still found
+    assert not store.complete_task("nonexistent")
+    assert store.count("completed") == 1
+    assert store.count("pending") == 1
+
+    with store.conn:
+        store.conn.execute("DELETE FROM tasks WHERE hash = ?", (task_hash("guard beets"),))
+    assert store.count() == 1
+    assert store.count("pending") == 0
+
+def test_tasks_are_listed_by_priority_then_age(store):
+    store.add_task("low one", "low")
+    store.add_task("medium one")
+    store.add_task("high one", "high")
+    store.add_task("high two", "high")
+    assert [desc for desc, _, _ in store.list_tasks()] == ["high one", "high two", "medium one", "low one"]
+
+def test_queries_use_indexes(store):
+    def plan(sql, *params):
+        return " ".join(row[3] for row in store.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+    assert "idx_tasks_priority_rank" in plan(LIST_TASKS_SQL)
+    assert "TEMP B-TREE" not in plan(LIST_TASKS_SQL)
+    assert "idx_tasks_status" in plan("SELECT COUNT(*) FROM tasks WHERE status = ?", "completed")
+
+@pytest.fixture
+def async_store(tmp_path):
+    store = AsyncTaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_add_complete_and_view(async_store):
+    async def session(n):
+        for i in range(10):
+            await async_store.add_task(f"session {n} task {i}")
+        await async_store.complete_task(f"session {n} task 0")
+        return await async_store.list_tasks()
+
+    views = await asyncio.gather(*(session(n) for n in range(8)))
+
+    assert all(len(view) >= 10 for view in views)
+    assert await async_store.count() == 80
+    assert await async_store.count("completed") == 8
+
+@pytest.mark.asyncio
+async def test_slow_write_does_not_block_reads_or_the_loop(async_store):
+    await async_store.add_task("sell paper")
+
+    def slow_write(conn):
+        with conn:
+            conn.execute("UPDATE tasks SET priority = 'high'")
+            time.sleep(0.3)
+
+    writing = asyncio.ensure_future(async_store.write(slow_write))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    tasks = await async_store.list_tasks()
+    elapsed = time.perf_counter() - started
+    await writing
+
+    assert tasks == [("sell paper", "pending", "medium")]  # last committed state
+    assert elapsed < 0.2
+    assert (await async_store.list_tasks())[0][2] == "high"
+
+@pytest.mark.asyncio
+async def test_read_connections_are_read_only(async_store):
+    with pytest.raises(sqlite3.OperationalError):
+        await async_store.read(lambda conn: conn.execute("DELETE FROM tasks"))
+
+def test_bulk_import_of_ten_thousand_tasks_is_fast(store):
+    rows = [(f"task {i}", "high" if i % 3 == 0 else "medium") for i in range(10_000)]
+    started = time.perf_counter()
+    added = store.add_tasks(rows + rows[:100])
+    assert time.perf_counter() - started < 2.0
+
+    assert added == 10_000
+    assert store.count() == 10_000
+    assert store.complete_tasks(f"task {i}" for i in range(0, 20_000, 2)) == 5_000
+    assert store.count("completed") == 5_000
+    assert store.count("pending") == 5_000
+
+@pytest.mark.asyncio
+async def test_async_bulk_operations(async_store):
+    assert await async_store.add_tasks([("a", "high"), ("b", "low"), ("a", "high")]) == 2
+    assert await async_store.complete_tasks(["a", "missing"]) == 1
+    assert await async_store.count("completed") == 1
+
+def walk_pages(store, query, limit):
+    page = store.task_page(query, limit=limit)
+    rows = list(page.rows)
+    while page.next_cursor:
+        next_query, number, after = decode_cursor(page.next_cursor)
+        assert next_query == query
+        page = store.task_page(next_query, number, after, limit=limit)
+        rows.extend(page.rows)
+    return rows
+
+@pytest.mark.parametrize("query", [
+    TaskQuery(),
+    TaskQuery(status="pending"),
+    TaskQuery(priority="low"),
+    TaskQuery(status="completed", priority="high"),
+])
+def test_cursor_pages_cover_the_listing_exactly(store, query):
+    store.add_tasks((f"task {i}", ("high", "medium", "low")[i % 3]) for i in range(250))
+    store.complete_tasks(f"task {i}" for i in range(0, 250, 4))
+    expected = [row for row in store.list_tasks()
+                if (query.status is None or row[1] == query.status)
+                and (query.priority is None or row[2] == query.priority)]
+
+    assert walk_pages(store, query, limit=17) == expected
+
+def test_page_numbers_and_totals(store):
+    store.add_tasks((f"task {i}", "medium") for i in range(45))
+    third = store.task_page(page=3, limit=20)
+    assert third.rows == store.list_tasks()[40:]
+    assert third.next_cursor is None
+    assert store.task_page(limit=20).total == 45
+    assert store.task_page(TaskQuery(priority="medium")).total is None
+
+def test_cursor_tokens_round_trip_and_reject_garbage():
+    query = TaskQuery(status="pending", priority="high")
+    assert decode_cursor(encode_cursor(query, 4, 1, 99)) == (query, 4, (1, 99))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-token")
+
+@pytest.mark.parametrize("query", [TaskQuery(), TaskQuery("pending"), TaskQuery(priority="high"),
+                                   TaskQuery("pending", "low")])
+def test_pages_are_index_seeks(store, query):
+    plans = []
+    original = store.conn
+
+    class PlanRecorder:
+        def execute(self, sql, params=()):
+            if sql.startswith("SELECT description"):
+                plans.append(" ".join(row[3] for row in original.execute(f"EXPLAIN QUERY PLAN {sql}", params)))
+            return original.execute(sql, params)
+
+    select_task_page(PlanRecorder(), query, 2, after=(1, 5))
+    assert "USING INDEX" in plans[0] and "TEMP B-TREE" not in plans[0]
+    assert plans[0].startswith("SEARCH")
+
+def test_task_search_follows_inserts_updates_and_deletes(store):
+    store.add_tasks([("Sell paper to Blue Cross", "high"), ("Harvest beets", "low"), ("Sell beets at market", "medium")])
+    assert [desc for desc, _, _ in store.search_tasks("beet")] in (
+        ["Harvest beets", "Sell beets at market"], ["Sell beets at market", "Harvest beets"]
+    )
+    assert store.search_tasks("selling paper")[0][0] == "Sell paper to Blue Cross"
+
+    with store.conn:
+        store.conn.execute("UPDATE tasks SET description = 'Harvest turnips' WHERE description = 'Harvest beets'")
+        store.conn.execute("DELETE FROM tasks WHERE description = 'Sell beets at market'")
+    assert store.search_tasks("beets") == []
+    assert store.search_tasks("turnip") == [("Harvest turnips", "pending", "low")]
+    assert store.search_tasks("the of") == []
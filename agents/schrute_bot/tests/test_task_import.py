@@ -0,0 +1,59 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents.schrute_bot.schrute_bot import SchruteBot
+from agents.schrute_bot.storage import AsyncTaskStore, select_tasks
+from agents.schrute_bot.task_import import parse_task_list, read_task_batch
+
+def test_pasted_list_with_markers_and_priorities():
+    text = """
+    - Sell paper to Blue Cross (high)
+    * [ ] Guard the beet farm
+    3. Reorganise the supply closet !low
+    """
+    assert parse_task_list(text) == [
+        ("Sell paper to Blue Cross", "high"),
+        ("Guard the beet farm", "medium"),
+        ("Reorganise the supply closet", "low"),
+    ]
+
+def test_single_line_is_split_on_semicolons():
+    assert read_task_batch("Buy beets; Sharpen nunchucks (HIGH);") == [
+        ("Buy beets", "medium"),
+        ("Sharpen nunchucks", "high"),
+    ]
+
+def test_csv_with_header(tmp_path):
+    path = tmp_path / "tasks.csv"
+    path.write_text("Priority,Description\nhigh,Fax the TPS report\nurgent,\"Call Jan, again\"\n")
+    assert read_task_batch(str(path)) == [("Fax the TPS report", "high"), ("Call Jan, again", "medium")]
+
+def test_csv_without_header(tmp_path):
+    path = tmp_path / "tasks.csv"
+    path.write_text("task one is sell paper,low\nWater the plants\n")
+    assert read_task_batch(str(path)) == [("task one is sell paper", "low"), ("Water the plants", "medium")]
+
+def test_jsonl(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    lines = [json.dumps({"task": "Alert security", "priority": "high"}), "", json.dumps("Fire Ryan (low)")]
+    path.write_text("\n".join(lines))
+    assert read_task_batch(f'"{path}"') == [("Alert security", "high"), ("Fire Ryan", "low")]
+
+@pytest.mark.asyncio
+async def test_batch_and_single_commands_find_the_same_tasks(tmp_path):
+    bot = SchruteBot.__new__(SchruteBot)  # skips loading the real model
+    bot.store = AsyncTaskStore(str(tmp_path / "tasks.db"))
+    bot.jimster = SimpleNamespace(prank_mode=False, prank_task=lambda task: asyncio.sleep(0, task))
+    bot.commentary = SimpleNamespace(take=lambda prompt_type, context="": asyncio.sleep(0, "Fact."))
+    try:
+        await bot.add_tasks("File TPS reports\nGuard  the Beets")
+        assert "Task completed: file tps reports" in await bot.complete_task("file tps reports")
+        assert "already on the list" in await bot.add_task("guard the beets")
+        assert "Completed 1 tasks" in await bot.complete_tasks("GUARD THE BEETS")
+        assert await bot.store.read(select_tasks) == [("file tps reports", "completed", "medium"),
+                                                      ("guard the beets", "completed", "medium")]
+    finally:
+        bot.store.close()
@@ -0,0 +1,19 @@
+import pytest
+
+from agents.schrute_bot.schrute_bot import parse_view_tasks
+from agents.schrute_bot.storage import TaskQuery, encode_cursor
+
+def test_plain_listing():
+    assert parse_view_tasks("") == (TaskQuery(), 1, None)
+
+def test_page_and_filters():
+    assert parse_view_tasks(" page 3 status:pending priority:HIGH") == (TaskQuery("pending", "high"), 3, None)
+
+def test_after_token_keeps_its_filters():
+    token = encode_cursor(TaskQuery(priority="low"), 2, 3, 41)
+    assert parse_view_tasks(f" after {token}") == (TaskQuery(priority="low"), 2, (3, 41))
+
+@pytest.mark.parametrize("args", ["for jim", "priority:urgent", "page two", "after !!!"])
+def test_bad_options_are_rejected(args):
+    with pytest.raises(ValueError):
+        parse_view_tasks(args)
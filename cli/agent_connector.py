@@ -1,36 +1,116 @@
 import sys
 import os
-from typing import Tuple
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple
 
 # Make sure we can import PamBot
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from agents.pam_bot.agent_pam import PamBot
+from common.streaming import StreamingResponse
+from common.sqlite_chat_storage import CHAT_DB_FILE
+
+logger = logging.getLogger(__name__)
 
 class AgentConnector:
-    def __init__(self):
-        self.pam = PamBot(log_verbose=False)
+    """Bridges synchronous front ends to PamBot.
+
+    Owns one long-lived event loop running on a background thread, so connection
+    pools and background tasks survive between queries and several queries can be
+    in flight at once.
+    """
+
+    def __init__(self, chat_db: str = CHAT_DB_FILE):
+        self.pam = PamBot(log_verbose=False, chat_db=chat_db)
         self.user_id = "ani"
         self.session_id = f"session_{os.getpid()}"
+        self._closed = False
+        # Held while checking _closed, so no query is scheduled once close() has started.
+        self._lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="agent-connector-loop", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _route(self, query: str, on_token: Optional[Callable[[str], None]]):
+        result = await self.pam.route_requests(query, self.user_id, self.session_id, stream=on_token is not None)
+        if isinstance(result.output, StreamingResponse):
+            async for chunk in result.output:
+                on_token(chunk)
+            result.output = result.output.collected()
+        return result
+
+    def submit(self, query: str, on_token: Optional[Callable[[str], None]] = None) -> Future:
+        """Schedules a query on the connector's loop and returns a future for its AgentResponse.
+
+        ``on_token`` runs on the loop thread for each streamed chunk.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AgentConnector is closed.")
+            return asyncio.run_coroutine_threadsafe(self._route(query, on_token), self.loop)
+
+    async def acall_agent(self, query: str, on_token: Optional[Callable[[str], None]] = None):
+        """Awaitable variant of call_agent for callers running their own event loop."""
+        return await asyncio.wrap_future(self.submit(query, on_token))
 
-    def call_agent(self, agent_id: str, query: str) -> Tuple[bool, str]:
+    def call_agent(self, agent_id: str, query: str, on_token: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
         """
         Routes a user query to PamBot, which dispatches it to the appropriate agent.
 
         Args:
             agent_id (str): Currently unused, can be passed as context.
             query (str): The user's input text.
+            on_token (callable, optional): Called with each chunk of a streamed response as it arrives.
 
         Returns:
             Tuple of (success, response_text)
         """
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.pam.route_requests(query, self.user_id, self.session_id)
-            )
+            result = self.submit(query, on_token).result()
             return True, result
         except Exception as e:
             return False, f"Error routing request: {e}"
+
+    def close(self, timeout: float = 5.0):
+        """Cancels in-flight queries, stops the loop and joins its thread.
+
+        A loop thread that is still busy after ``timeout`` is left running, and its loop open.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        async def shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.loop.shutdown_asyncgens()
+
+        stopping = asyncio.run_coroutine_threadsafe(shutdown(), self.loop)
+        # Stop only once the cancelled queries have unwound, even if that outlasts the timeout.
+        stopping.add_done_callback(lambda _: self.loop.call_soon_threadsafe(self.loop.stop))
+        try:
+            stopping.result(timeout)
+        except TimeoutError:
+            logger.warning(f"In-flight queries did not stop within {timeout}s.")
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # Closing a running loop raises; this one stops by itself once it is unblocked.
+            logger.warning(f"Agent connector loop still running after {timeout}s; leaving it open.")
+        else:
+            self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -2,6 +2,7 @@
 import os
 import sys
 import time
+STARTUP_BEGAN = time.perf_counter()
 import readline
 import random
 import logging
@@ -32,12 +33,16 @@ AGENT_COLORS = {
 
 TYPING_CHARS = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
 
+# SchruteBot ends a partial task list with "Next page: view tasks after <token>".
+NEXT_PAGE_PATTERN = re.compile(r"view tasks after ([A-Za-z0-9_-]+)")
+
 class DunderMifflinCLI:
     def __init__(self):
         self.connector = AgentConnector()
         self.current_agent = "pam"
         self.session_id = f"session_{int(time.time())}"
         self.history = []
+        self.next_page_query = None
 
     def print_logo(self):
         logo = f"""
@@ -98,9 +103,20 @@ class DunderMifflinCLI:
                 print(textwrap.fill(line, width=80))
 
 
+    def print_chunk(self, chunk, streamed):
+        """Print a streamed response chunk as soon as it arrives."""
+        if not streamed:
+            print(f"\n{AGENT_COLORS.get(self.current_agent.capitalize(), Colors.ENDC)}")
+        streamed.append(chunk)
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
     def run(self):
         self.print_logo()
-        print(f"{Colors.GREEN}Type '/agents' to list characters, '/use [agent]', or just ask something...{Colors.ENDC}\n")
+        ready_ms = (time.perf_counter() - STARTUP_BEGAN) * 1000
+        print(f"{Colors.CYAN}⏱️  Ready in {ready_ms:.0f} ms (agents load on first use){Colors.ENDC}")
+        print(f"{Colors.GREEN}Type '/agents' to list characters, '/use [agent]', or just ask something...{Colors.ENDC}")
+        print(f"{Colors.GREEN}'/more' shows the next page of a task list.{Colors.ENDC}\n")
 
         while True:
             try:
@@ -127,6 +143,16 @@ class DunderMifflinCLI:
                         else:
                             print(f"{Colors.RED}Unknown agent: {new_agent}{Colors.ENDC}")
                         continue
+                    elif query == "/stats":
+                        for stage, counters in self.connector.pam.stats().items():
+                            details = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in counters.items())
+                            print(f"  {Colors.BOLD}{stage}{Colors.ENDC}: {details}")
+                        continue
+                    elif query == "/more":
+                        if not self.next_page_query:
+                            print(f"{Colors.YELLOW}Nothing more to show. Try 'view tasks' first.{Colors.ENDC}")
+                            continue
+                        query = self.next_page_query
                     elif query == "/history":
                         for entry in self.history:
                             print(f"\n📝 You: {entry['query']}")
@@ -139,18 +165,24 @@ class DunderMifflinCLI:
 
                 self.typing_animation(self.current_agent)
 
-                success, response = self.connector.call_agent(self.current_agent, query)
+                streamed = []
+                success, response = self.connector.call_agent(
+                    self.current_agent, query, on_token=lambda chunk: self.print_chunk(chunk, streamed)
+                )
                 if not success:
                     print(f"{Colors.RED}Error: {response}{Colors.ENDC}")
                 else:
                     output = getattr(response, "output", response)
+                    next_page = NEXT_PAGE_PATTERN.search(str(output))
+                    self.next_page_query = f"view tasks after {next_page.group(1)}" if next_page else None
                     self.history.append({
                         "agent": self.current_agent.capitalize(),
                         "query": query,
                         "response": output
                     })
-                    print(f"\n{AGENT_COLORS.get(self.current_agent.capitalize(), Colors.ENDC)}")
-                    self.format_response(output)
+                    if not streamed:
+                        print(f"\n{AGENT_COLORS.get(self.current_agent.capitalize(), Colors.ENDC)}")
+                        self.format_response(output)
                     print(Colors.ENDC + "\n" + "─" * 80)
 
             except KeyboardInterrupt:
@@ -160,7 +192,10 @@ class DunderMifflinCLI:
 
 def main():
     cli = DunderMifflinCLI()
-    cli.run()
+    try:
+        cli.run()
+    finally:
+        cli.connector.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cli.agent_connector import AgentConnector
+from common.streaming import StreamingResponse
+
+@pytest.fixture
+def connector(tmp_path):
+    connector = AgentConnector(chat_db=str(tmp_path / "chat_history.db"))
+    loops = []
+
+    async def fake_route(message, user_id, session_id, stream=False):
+        loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.1)
+        if message == "stream":
+            async def chunks():
+                yield "a"
+                yield "b"
+            return SimpleNamespace(output=StreamingResponse(chunks()))
+        return SimpleNamespace(output=f"done: {message}")
+
+    connector.pam.route_requests = fake_route
+    connector.loops = loops
+    yield connector
+    connector.close()
+
+def test_queries_share_one_loop(connector):
+    assert connector.call_agent("pam", "one")[1].output == "done: one"
+    assert connector.call_agent("pam", "two")[1].output == "done: two"
+    assert connector.loops[0] is connector.loops[1] is connector.loop
+
+def test_queries_run_concurrently(connector):
+    started = time.perf_counter()
+    futures = [connector.submit(str(i)) for i in range(5)]
+    outputs = [f.result().output for f in futures]
+    assert outputs == [f"done: {i}" for i in range(5)]
+    assert time.perf_counter() - started < 0.4
+
+def test_streamed_chunks_reach_callback(connector):
+    chunks = []
+    success, result = connector.call_agent("pam", "stream", on_token=chunks.append)
+    assert success
+    assert chunks == ["a", "b"]
+    assert result.output == "ab"
+
+@pytest.mark.asyncio
+async def test_async_submit_from_another_loop(connector):
+    result = await connector.acall_agent("async")
+    assert result.output == "done: async"
+
+def test_close_stops_the_loop(connector):
+    pending = connector.submit("slow")
+    connector.close()
+    assert pending.cancelled() or pending.done()
+    assert connector.loop.is_closed()
+    assert not connector.call_agent("pam", "late")[0]
+
+def test_close_leaves_a_blocked_loop_open(connector, caplog):
+    async def blocking():
+        time.sleep(0.3)  # holds the loop thread, like a synchronous call in a handler
+
+    blocked = asyncio.run_coroutine_threadsafe(blocking(), connector.loop)
+    time.sleep(0.05)
+    connector.close(timeout=0.05)
+    assert not connector.loop.is_closed()
+    assert "still running" in caplog.text
+    blocked.result(5)
+    connector._thread.join(5)
+    assert not connector._thread.is_alive()
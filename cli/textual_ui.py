@@ -1,12 +1,14 @@
 import sys
 import os
+import time
+STARTUP_BEGAN = time.perf_counter()
 import asyncio
 import logging
 import re
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Vertical
-from textual.widgets import Header, Footer, Input, ListView, ListItem, Label, RichLog, TextArea, LoadingIndicator, Button
+from textual.widgets import Header, Footer, Input, ListView, ListItem, Label, RichLog, TextArea, LoadingIndicator, Button, Static
 from textual.reactive import reactive
 from rich.text import Text
 
@@ -23,6 +25,7 @@ from cli.widgets.command_box import CommandBox
 from textual.containers import Horizontal
 
 from agents.pam_bot.agent_pam import PamBot
+from common.streaming import StreamingResponse
 
 class DunderAgentUI(App):
     CSS_PATH = "textual_ui.css"
@@ -30,11 +33,16 @@ class DunderAgentUI(App):
         ("q", "quit", "Quit"),
         ("ctrl+l", "clear_log", "Clear Log"),
         ("tab", "toggle_sidebar", "Toggle Agent Panel"),
+        ("ctrl+n", "next_page", "Next Task Page"),
     ]
 
+    # SchruteBot ends a partial task list with "Next page: view tasks after <token>".
+    NEXT_PAGE_PATTERN = re.compile(r"view tasks after ([A-Za-z0-9_-]+)")
+
     def __init__(self):
         super().__init__()
         self.pambot = PamBot()
+        self.next_page_query = None
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -72,6 +80,8 @@ class DunderAgentUI(App):
         self.set_focus(self.command_box)
         self.interaction_log.write(Text("Welcome to the Dunder Mifflin Agent Interface!", style="bold green"))
         self.interaction_log.write("Type your requests for Pam below.")
+        ready_ms = (time.perf_counter() - STARTUP_BEGAN) * 1000
+        self.interaction_log.write(Text(f"⏱️ Ready in {ready_ms:.0f} ms (agents load on first use)", style="dim"))
 
     def detect_code(self, text: str) -> tuple[str, tuple[str, str] | None]:
         match = re.search(r"```(\w+)?\n(.*?)```", text, re.DOTALL)
@@ -84,11 +94,30 @@ class DunderAgentUI(App):
             return "", ("python", text.strip())
         return text, None
 
+    async def stream_to_screen(self, stream: StreamingResponse) -> str:
+        """Show a streamed response live, then hand back the full text for the log."""
+        live = Static("", id="streaming-output")
+        await self.mount(live, after=self.interaction_log)
+        try:
+            async for _ in stream:
+                live.update(stream.collected())
+        finally:
+            await live.remove()
+        return stream.collected()
+
     async def on_input_submitted(self, event: Input.Submitted) -> None:
         command = event.value.strip()
         if not command:
             return
+        await self.run_command(command)
 
+    async def action_next_page(self) -> None:
+        if not self.next_page_query:
+            self.interaction_log.write(Text("Nothing more to show. Try 'view tasks' first.", style="italic"))
+            return
+        await self.run_command(self.next_page_query)
+
+    async def run_command(self, command: str) -> None:
         self.interaction_log.write(Text(f"You: {command}", style="bold #cccccc"))
         self.command_box.value = ""
         self.command_box.disabled = True
@@ -100,7 +129,8 @@ class DunderAgentUI(App):
             response = await self.pambot.route_requests(
                 message=command,
                 user_id="tui_user",
-                session_id="tui_session_0"
+                session_id="tui_session_0",
+                stream=True
             )
             selected_agent = getattr(response, "agent", None)
             if selected_agent:
@@ -112,10 +142,15 @@ class DunderAgentUI(App):
                 agent_style = agent_colors.get(selected_agent, "bold yellow")
                 self.interaction_log.write(Text(f"🧠 Pam routed this to: {selected_agent}", style=agent_style))
             output = getattr(response, "output", "*No response text found.*")
+            if isinstance(output, StreamingResponse):
+                output = await self.stream_to_screen(output)
 
             if output.startswith("INFO:"):
                 output = re.sub(r"INFO:.*", "", output)
 
+            next_page = self.NEXT_PAGE_PATTERN.search(str(output))
+            self.next_page_query = f"view tasks after {next_page.group(1)}" if next_page else None
+
             cleaned, code_block = self.detect_code(str(output))
 
             if code_block:
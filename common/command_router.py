@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+def command_words(text: str) -> List[str]:
+    """Lower-cased words of ``text``; a trailing ":" or "," ("view tasks:") is not part of a word."""
+    return [word for word in (word.rstrip(":,") for word in text.lower().split()) if word]
+
+
+@dataclass(frozen=True)
+class Command:
+    """One entry in an agent's command grammar.
+
+    ``phrase`` is matched word by word at the start of the input. Exact commands
+    must make up the whole input; the rest accept trailing arguments.
+    """
+    phrase: str
+    exact: bool = False
+
+    @property
+    def words(self) -> tuple:
+        return tuple(command_words(self.phrase))
+
+
+class _Node:
+    __slots__ = ("children", "prefix_agents", "exact_agents")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.prefix_agents = set()
+        self.exact_agents = set()
+
+
+class CommandRouter:
+    """Word-level trie over every agent's command grammar.
+
+    Routes inputs that start with a known command straight to its agent so they
+    never reach the LLM classifier. The longest matching command wins; a command
+    claimed by more than one agent is ambiguous and left to the classifier.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, grammars: Dict[str, Iterable[Command]]):
+        """Rebuilds the trie from ``{agent_name: commands}``."""
+        self._root = _Node()
+        for agent_name, commands in grammars.items():
+            for command in commands:
+                self.add(agent_name, command)
+
+    def add(self, agent_name: str, command: Command):
+        node = self._root
+        for word in command.words:
+            node = node.children.setdefault(word, _Node())
+        (node.exact_agents if command.exact else node.prefix_agents).add(agent_name)
+
+    def match(self, text: str) -> Optional[str]:
+        """Returns the agent name for a command input, or None for free-form text."""
+        words = command_words(text)
+        node = self._root
+        best = None
+        for i, word in enumerate(words):
+            node = node.children.get(word)
+            if node is None:
+                break
+            if node.prefix_agents:
+                best = node.prefix_agents
+            if i == len(words) - 1 and node.exact_agents:
+                best = node.exact_agents | node.prefix_agents
+
+        if best is not None and len(best) == 1:
+            self.hits += 1
+            return next(iter(best))
+        self.misses += 1
+        return None
+
+    def starts_with_command(self, text: str) -> bool:
+        """True if ``text`` opens with a whole command phrase, exact or not. Not counted in the stats."""
+        node = self._root
+        for word in command_words(text):
+            node = node.children.get(word)
+            if node is None:
+                return False
+            if node.prefix_agents or node.exact_agents:
+                return True
+        return False
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
@@ -0,0 +1,358 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WEB_CACHE_FILE = os.getenv("DUNDER_WEB_CACHE", "web_cache.db")
+WEB_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Compressed bytes kept on disk before LRU eviction
+SEARCH_CACHE_TTL = 6 * 60 * 60  # seconds
+PAGE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases and collapses whitespace so trivially different queries share an entry."""
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    expires_at: Optional[float]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is None or self.expires_at > now
+
+
+@dataclass
+class Fetched:
+    """What a cache fetch function returns: a new value, or ``not_modified`` to keep the stale one.
+
+    A ``value`` of None is returned to the caller but never stored.
+    """
+    value: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+class FetchAbandoned(Exception):
+    """Set on a shared fetch whose leader was cancelled; waiting callers retry instead of failing."""
+
+
+def is_not_modified(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                    timeout: float = 10.0) -> bool:
+    """Sends a conditional GET and returns True if the server answers 304 Not Modified."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    if not headers:
+        return False
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return False
+    except urllib.error.HTTPError as e:
+        return e.code == 304
+    except Exception as e:
+        logger.info(f"Revalidation of {url} failed: {e}")
+        return False
+
+
+class DiskCache:
+    """Persistent SQLite cache for web lookups, shared across runs.
+
+    Values are stored as zlib-compressed JSON blobs addressed by their SHA-256, so
+    identical content fetched under different keys is stored once. Entries expire
+    after their TTL and, when a fetch supplies ETag/Last-Modified validators, can be
+    revalidated instead of refetched. Once the blobs exceed ``max_bytes`` the least
+    recently used entries are evicted. Concurrent lookups of the same missing key
+    share a single fetch.
+    """
+
+    def __init__(self, path: str = WEB_CACHE_FILE, max_bytes: int = WEB_CACHE_MAX_BYTES,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                blob_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_entries_blob ON entries(blob_hash);
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @staticmethod
+    def make_key(namespace: str, key: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{key}".encode("utf-8")).hexdigest()
+
+    def lookup(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """Returns the stored entry, fresh or stale, and marks it as recently used."""
+        cache_key = self.make_key(namespace, key)
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT b.data, e.stored_at, e.expires_at, e.etag, e.last_modified
+                FROM entries e JOIN blobs b ON b.hash = e.blob_hash
+                WHERE e.key = ?
+            """, (cache_key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (self.clock(), cache_key))
+        data, stored_at, expires_at, etag, last_modified = row
+        return CacheEntry(json.loads(zlib.decompress(data)), stored_at, expires_at, etag, last_modified)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Returns the cached value if it has not expired."""
+        entry = self.lookup(namespace, key)
+        if entry is None or not entry.is_fresh(self.clock()):
+            return default
+        return entry.value
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        data = zlib.compress(json.dumps(value).encode("utf-8"))
+        blob_hash = hashlib.sha256(data).hexdigest()
+        now = self.clock()
+        expires_at = now + ttl if ttl is not None else None
+        cache_key = self.make_key(namespace, key)
+        with self._lock, self._transaction():
+            previous = self.conn.execute("SELECT blob_hash FROM entries WHERE key = ?", (cache_key,)).fetchall()
+            self.conn.execute("INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                              (blob_hash, data, len(data)))
+            self.conn.execute("""
+                INSERT OR REPLACE INTO entries
+                    (key, namespace, blob_hash, stored_at, expires_at, accessed_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (cache_key, namespace, blob_hash, now, expires_at, now, etag, last_modified))
+            self._drop_orphans(previous)
+            self._evict()
+
+    def refresh(self, namespace: str, key: str, ttl: Optional[float] = None):
+        """Extends an entry's lifetime after the origin confirmed it is unchanged."""
+        now = self.clock()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self.conn.execute("UPDATE entries SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                              (expires_at, now, self.make_key(namespace, key)))
+
+    def delete(self, namespace: str, key: str):
+        cache_key = self.make_key(namespace, key)
+        with self._lock, self._transaction():
+            previous = self.conn.execute("SELECT blob_hash FROM entries WHERE key = ?", (cache_key,)).fetchall()
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+            self._drop_orphans(previous)
+
+    def clear(self):
+        with self._lock, self._transaction():
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM blobs")
+
+    def _drop_orphans(self, hashes):
+        """Deletes the given blobs unless another entry still points at them."""
+        self.conn.executemany(
+            "DELETE FROM blobs WHERE hash = ?1 AND NOT EXISTS (SELECT 1 FROM entries WHERE blob_hash = ?1)",
+            [(row[0],) for row in hashes]
+        )
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self.conn.execute("SELECT key, blob_hash FROM entries ORDER BY accessed_at LIMIT 16").fetchall()
+            if not oldest:
+                break
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in oldest])
+            self.evictions += len(oldest)
+            self._drop_orphans([(blob_hash,) for _, blob_hash in oldest])
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _claim(self, cache_key: str):
+        """Returns (future, is_leader); only the leader runs the fetch for a key."""
+        with self._lock:
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[cache_key] = future
+            return future, True
+
+    def _settle(self, cache_key: str, future: Future, value: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._inflight.pop(cache_key, None)
+        if future.done():
+            return
+        if error is None:
+            future.set_result(value)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # The leader was cancelled (e.g. a straggler crawl), not the followers' requests.
+            future.set_exception(FetchAbandoned(cache_key))
+
+    def _fresh_or_none(self, namespace: str, key: str):
+        entry = self.lookup(namespace, key)
+        with self._lock:
+            if entry is not None and entry.is_fresh(self.clock()):
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def _store(self, namespace: str, key: str, stale: Optional[CacheEntry], fetched: Fetched,
+               ttl: Optional[float]) -> Any:
+        if fetched.not_modified and stale is not None:
+            with self._lock:
+                self.revalidated += 1
+            self.refresh(namespace, key, ttl)
+            return stale.value
+        if fetched.value is not None:
+            self.put(namespace, key, fetched.value, ttl, fetched.etag, fetched.last_modified)
+        return fetched.value
+
+    async def aget_or_fetch(self, namespace: str, key: str,
+                            fetch: Callable[[Optional[CacheEntry]], Awaitable[Fetched]],
+                            ttl: Optional[float] = None) -> Any:
+        """Returns the cached value, or awaits ``fetch(stale_entry)`` and caches its result.
+
+        ``stale_entry`` is the expired entry (or None), so ``fetch`` can revalidate it.
+        Callers on any thread or event loop asking for the same key share one fetch.
+        If the caller running it is cancelled, one of the others takes the fetch over.
+        SQLite reads and writes run in a worker thread, never on the event loop.
+        """
+        cache_key = self.make_key(namespace, key)
+        while True:
+            entry = await asyncio.to_thread(self._fresh_or_none, namespace, key)
+            if entry is not None and entry.is_fresh(self.clock()):
+                return entry.value
+
+            future, leader = self._claim(cache_key)
+            if leader:
+                break
+            try:
+                # Shielded so a cancelled follower does not cancel the shared fetch.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except FetchAbandoned:
+                continue
+        try:
+            fetched = await fetch(entry)
+            value = await asyncio.to_thread(self._store, namespace, key, entry, fetched, ttl)
+        except BaseException as e:
+            self._settle(cache_key, future, error=e)
+            raise
+        self._settle(cache_key, future, value)
+        return value
+
+    def get_or_fetch(self, namespace: str, key: str,
+                     fetch: Callable[[Optional[CacheEntry]], Fetched],
+                     ttl: Optional[float] = None) -> Any:
+        """Blocking counterpart of aget_or_fetch for synchronous callers."""
+        cache_key = self.make_key(namespace, key)
+        while True:
+            entry = self._fresh_or_none(namespace, key)
+            if entry is not None and entry.is_fresh(self.clock()):
+                return entry.value
+
+            future, leader = self._claim(cache_key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except FetchAbandoned:
+                continue
+        try:
+            value = self._store(namespace, key, entry, fetch(entry), ttl)
+        except BaseException as e:
+            self._settle(cache_key, future, error=e)
+            raise
+        self._settle(cache_key, future, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": self.total_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_web_cache: Optional[DiskCache] = None
+_web_cache_lock = threading.Lock()
+
+
+def web_cache() -> DiskCache:
+    """The process-wide cache behind DueDiligenceTool and WebScraper, opened on first use."""
+    global _web_cache
+    with _web_cache_lock:
+        if _web_cache is None:
+            _web_cache = DiskCache()
+        return _web_cache
+
+
+def web_cache_stats() -> Optional[Dict[str, Any]]:
+    """Stats for the shared web cache, or None if nothing has used it yet."""
+    return _web_cache.stats() if _web_cache is not None else None
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.model_registry import model_registry
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2.gguf2.f16.gguf"
+ROUTER_MARGIN_THRESHOLD = 0.05  # Below this top-1/top-2 gap the LLM classifier decides
+
+
+def load_embed4all(model_name: str, **params):
+    from gpt4all import Embed4All
+    return Embed4All(model_name, **params)
+
+
+class EmbeddingUnavailable(RuntimeError):
+    """Raised when the embedding model cannot be imported or loaded at all."""
+
+
+class Embedder:
+    """Sentence embeddings from a shared GPT4All embedding model."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        try:
+            self.handle = model_registry.acquire(model_name, loader=load_embed4all)
+        except Exception as e:
+            raise EmbeddingUnavailable(f"Could not load embedding model {model_name}: {e}") from e
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        with self.handle.lock:
+            vectors = self.handle.model.embed(list(texts))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def close(self):
+        self.handle.release()
+
+
+@dataclass
+class RouteMatch:
+    agent_name: str
+    score: float   # cosine similarity of the best example for this agent
+    margin: float  # gap to the best example of any other agent
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingRouter:
+    """Nearest-neighbour intent router over embedded agent descriptions and examples.
+
+    Examples are embedded once into a single float32 matrix; routing a request is
+    one embedding plus a matrix-vector product.
+    """
+
+    def __init__(self, embed_fn: Callable[[Sequence[str]], np.ndarray],
+                 margin_threshold: float = ROUTER_MARGIN_THRESHOLD):
+        self.embed_fn = embed_fn
+        self.margin_threshold = margin_threshold
+        self.agent_names: List[str] = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.intp)
+
+    @property
+    def fitted(self) -> bool:
+        return len(self.labels) > 0
+
+    def fit(self, examples: List[Tuple[str, str]]):
+        """Embeds ``(text, agent_name)`` pairs, replacing anything fitted before."""
+        if not examples:
+            self.agent_names, self.vectors, self.labels = [], np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.intp)
+            return
+        self.agent_names = sorted({agent_name for _, agent_name in examples})
+        index = {name: i for i, name in enumerate(self.agent_names)}
+        self.labels = np.array([index[agent_name] for _, agent_name in examples], dtype=np.intp)
+        self.vectors = _normalize_rows(np.asarray(self.embed_fn([text for text, _ in examples]), dtype=np.float32))
+
+    def route(self, text: str) -> Optional[RouteMatch]:
+        if not self.fitted:
+            return None
+        query = _normalize_rows(np.asarray(self.embed_fn([text]), dtype=np.float32))[0]
+        scores = self.vectors @ query
+
+        # Best score per agent, then compare the top two agents.
+        best = np.full(len(self.agent_names), -np.inf, dtype=np.float32)
+        np.maximum.at(best, self.labels, scores)
+        order = np.argsort(best)[::-1]
+        top = float(best[order[0]])
+        runner_up = float(best[order[1]]) if len(order) > 1 else -1.0
+        return RouteMatch(agent_name=self.agent_names[order[0]], score=top, margin=top - runner_up)
+
+    def is_confident(self, match: Optional[RouteMatch]) -> bool:
+        return match is not None and match.margin >= self.margin_threshold
@@ -0,0 +1,149 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+from multi_agent_orchestrator.types import ConversationMessage, TimestampedMessage
+
+from common.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = 1200  # Most history tokens handed to the classifier or an agent
+SUMMARY_TOKENS = 200  # Length asked of the running summary; reserved out of the budget
+REFRESH_TOKENS = 400  # Older, not yet summarised tokens that trigger a summary refresh
+SUMMARY_REQUEST = "Summarise our conversation so far."
+
+
+@dataclass
+class Summary:
+    text: str = ""
+    through: int = 0  # Timestamp (ms) of the newest message folded into the summary
+
+
+@dataclass
+class CompactedHistory:
+    messages: List[ConversationMessage]
+    tokens_in: int
+    tokens_out: int
+    # Turns that fell out of the verbatim window but are not in the summary yet.
+    unsummarised: List[TimestampedMessage] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+def message_text(message: ConversationMessage) -> str:
+    return " ".join(str(part.get("text", "")) for part in message.content or [] if isinstance(part, dict))
+
+
+def message_tokens(message: ConversationMessage) -> int:
+    return estimate_tokens(message_text(message)) + 4  # role and separators
+
+
+class HistoryCompactor:
+    """
+    Keeps chat history under a fixed token budget.
+
+    The newest whole turns are kept verbatim up to ``token_budget - summary_tokens``.
+    Everything older is represented by a running summary, sent as one
+    question-and-answer pair in front of the recent turns. ``compact`` never calls the
+    model. It reports the older turns that the summary does not cover yet, and once they
+    reach ``refresh_tokens`` the caller runs ``refresh`` in the background to fold them in.
+    Until then those turns are simply left out, so the budget holds either way.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, str, int], Awaitable[str]],
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_tokens: int = SUMMARY_TOKENS,
+        refresh_tokens: int = REFRESH_TOKENS
+    ):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.refresh_tokens = refresh_tokens
+        self.requests = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.refreshes = 0
+        self.last_saved = 0
+
+    def _recent_start(self, messages: List[TimestampedMessage]) -> int:
+        """Index of the oldest message kept verbatim: whole turns, newest first, within the budget."""
+        budget = self.token_budget - self.summary_tokens
+        start = len(messages)
+        spent = 0
+        while start > 0:
+            # A turn is the user message and everything after it up to the next turn.
+            turn_start = start - 1
+            while turn_start > 0 and messages[turn_start].role != "user":
+                turn_start -= 1
+            cost = sum(message_tokens(message) for message in messages[turn_start:start])
+            if spent + cost > budget and start < len(messages):
+                break
+            spent += cost
+            start = turn_start
+        return start
+
+    def compact(self, messages: List[TimestampedMessage], summary: Summary) -> CompactedHistory:
+        tokens_in = sum(message_tokens(message) for message in messages)
+        start = self._recent_start(messages)
+        recent = [ConversationMessage(role=message.role, content=message.content) for message in messages[start:]]
+        older = [message for message in messages[:start] if message.timestamp > summary.through]
+
+        # The summary stands in for whatever is not shown: dropped turns, or turns already trimmed from storage.
+        hidden = start > 0 or (messages and summary.through < messages[0].timestamp)
+        compacted = recent
+        if summary.text and hidden:
+            compacted = [
+                ConversationMessage(role="user", content=[{"text": SUMMARY_REQUEST}]),
+                ConversationMessage(role="assistant", content=[{"text": summary.text}]),
+            ] + recent
+        tokens_out = sum(message_tokens(message) for message in compacted)
+
+        self.requests += 1
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+        self.last_saved = tokens_in - tokens_out
+        if self.last_saved:
+            logger.debug(f"History compacted from {tokens_in} to {tokens_out} tokens")
+        return CompactedHistory(compacted, tokens_in, tokens_out, older)
+
+    def needs_refresh(self, history: CompactedHistory) -> bool:
+        return sum(message_tokens(message) for message in history.unsummarised) >= self.refresh_tokens
+
+    async def refresh(self, summary: Summary, unsummarised: List[TimestampedMessage]) -> Summary:
+        """Folds ``unsummarised`` into ``summary`` with one model call; returns the new summary."""
+        if not unsummarised:
+            return summary
+        transcript = "\n".join(f"{message.role}: {message_text(message)}" for message in unsummarised)
+        text = (await self.summarize(summary.text, transcript, self.summary_tokens)).strip()
+        self.refreshes += 1
+        return Summary(text or summary.text, max(message.timestamp for message in unsummarised))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "tokens_saved": self.tokens_in - self.tokens_out,
+            "last_tokens_saved": self.last_saved,
+            "summary_refreshes": self.refreshes,
+        }
+
+
+def build_summary_prompt(previous: str, transcript: str, max_tokens: int) -> str:
+    """Prompt for HistoryCompactor.refresh: merge the new turns into the previous summary."""
+    previous = previous or "(nothing yet)"
+    return f"""Update the running summary of a chat between a user and the Dunder Mifflin assistants.
+Keep names, tasks, decisions and open questions. Reply with the summary only, at most {max_tokens * 3 // 4} words.
+
+### Summary so far:
+{previous}
+
+### New messages:
+{transcript}
+
+### Updated summary:"""
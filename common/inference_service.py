@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_QUEUE_SIZE = 64
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a prompt is submitted while the inference queue is at capacity."""
+
+
+_END = object()
+
+
+class _Job:
+    __slots__ = ("prompt", "kwargs", "future", "enqueued_at", "on_token")
+
+    def __init__(self, prompt: str, kwargs: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None):
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.on_token = on_token
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+    def batch_key(self):
+        return tuple(sorted(self.kwargs.items()))
+
+
+class InferenceService:
+    """Queues generation requests for one model and runs them on a dedicated worker thread.
+
+    Blocking model calls never run on the event loop: ``generate`` is awaitable and
+    ``submit`` returns a future usable from synchronous code. When ``batch_fn`` is
+    given, prompts queued within ``batch_window`` seconds with identical generation
+    kwargs are handed to it together (up to ``max_batch_size``). ``stream_fn``
+    yields tokens for one prompt and backs ``stream``; streamed jobs are never batched.
+    """
+
+    def __init__(
+        self,
+        generate_fn: Callable[..., str],
+        batch_fn: Optional[Callable[..., List[str]]] = None,
+        stream_fn: Optional[Callable[..., Iterable[str]]] = None,
+        max_queue: int = INFERENCE_QUEUE_SIZE,
+        max_batch_size: int = 8,
+        batch_window: float = 0.01,
+        name: str = "inference"
+    ):
+        self.generate_fn = generate_fn
+        self.batch_fn = batch_fn
+        self.stream_fn = stream_fn
+        self.max_batch_size = max_batch_size if batch_fn else 1
+        self.batch_window = batch_window
+        self.name = name
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue(maxsize=max_queue)
+        self._carry: Optional[_Job] = None
+        self._closed = False
+        self._stopping = False
+        # Held while checking _closed and enqueueing, so no job can land behind the shutdown sentinel.
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._in_flight = 0  # Submitted and not yet finished, including the batch on the worker
+        self._worker = threading.Thread(target=self._run, name=f"{name}-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, prompt: str, on_token: Optional[Callable[[str], None]] = None, **kwargs) -> Future:
+        """Queues a prompt and returns a concurrent future for its completion.
+
+        With ``on_token`` the prompt is streamed and the callback runs on the worker thread per token.
+        """
+        if on_token is not None and self.stream_fn is None:
+            raise ValueError(f"Inference service '{self.name}' does not support streaming.")
+        job = _Job(prompt, kwargs, on_token)
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError(f"Inference service '{self.name}' is closed.")
+            # Counted before the put so the worker can never finish the job first.
+            with self._stats_lock:
+                self._in_flight += 1
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                with self._stats_lock:
+                    self._in_flight -= 1
+                    self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue for '{self.name}' is full ({self._queue.maxsize} pending).")
+        with self._stats_lock:
+            self.submitted += 1
+        return job.future
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        with span("inference.generate", model=self.name):
+            return await asyncio.wrap_future(self.submit(prompt, **kwargs))
+
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Yields tokens on the event loop as the worker thread generates them."""
+        loop = asyncio.get_running_loop()
+        tokens: asyncio.Queue = asyncio.Queue()
+        with span("inference.stream", model=self.name):
+            future = asyncio.wrap_future(self.submit(
+                prompt,
+                on_token=lambda token: loop.call_soon_threadsafe(tokens.put_nowait, token),
+                **kwargs
+            ))
+            # Tokens and completion are both scheduled on the loop in order, so _END comes last.
+            future.add_done_callback(lambda _: tokens.put_nowait(_END))
+            while True:
+                token = await tokens.get()
+                if token is _END:
+                    break
+                yield token
+            await future
+
+    def _next_batch(self) -> Optional[List[_Job]]:
+        if self._stopping and self._carry is None:
+            return None
+        first = self._carry or self._queue.get()
+        self._carry = None
+        if first is None:
+            return None
+
+        batch = [first]
+        if first.on_token is not None:
+            return batch
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # Shutdown sentinel: finish this batch, then stop.
+                self._stopping = True
+                break
+            if job.on_token is not None or job.batch_key() != first.batch_key():
+                # Streams and different generation settings start the next batch.
+                self._carry = job
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.batches += 1
+                for job in batch:
+                    wait = started - job.enqueued_at
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Job]):
+        live = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not live:
+            with self._stats_lock:
+                self._in_flight -= len(batch)
+            return
+        try:
+            if live[0].on_token is not None:
+                results = [self._run_stream(live[0])]
+            elif len(live) > 1:
+                results = self.batch_fn([job.prompt for job in live], **live[0].kwargs)
+            else:
+                results = [self.generate_fn(live[0].prompt, **live[0].kwargs)]
+            if len(results) != len(live):
+                raise RuntimeError(f"Batch of {len(live)} prompts returned {len(results)} results.")
+        except Exception as e:
+            logger.error(f"Inference failed on {self.name}: {e}")
+            # Counted down before the futures resolve, so a woken caller already sees the model free.
+            with self._stats_lock:
+                self.failed += len(live)
+                self._in_flight -= len(batch)
+            for job in live:
+                job.future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            self.completed += len(live)
+            self._in_flight -= len(batch)
+        for job, result in zip(live, results):
+            job.future.set_result(result)
+
+    def _run_stream(self, job: _Job) -> str:
+        parts = []
+        for token in self.stream_fn(job.prompt, **job.kwargs):
+            parts.append(token)
+            job.on_token(token)
+        return "".join(parts)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        """Prompts queued or being generated; zero only when the model is free."""
+        with self._stats_lock:
+            return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            started = self.completed + self.failed
+            return {
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_batch_size": started / self.batches if self.batches else 0.0,
+                "avg_wait_ms": self.total_wait / started * 1000 if started else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def close(self, timeout: Optional[float] = None):
+        """Stops accepting work; queued prompts still run before the worker exits."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join(timeout)
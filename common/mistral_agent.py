@@ -1,26 +1,75 @@
-from gpt4all import GPT4All
+from common.model_registry import model_registry
+from common.inference_service import InferenceService
+from common.streaming import StreamingResponse
 
 MODEL_NAME = "mistral-7b-instruct-v0.1.Q4_0.gguf"  # Replace with your downloaded model
 
+
+def load_gpt4all(model_name: str, **params):
+    """Loads a GPT4All model. Used as the registry loader so the model is only loaded once per process."""
+    from gpt4all import GPT4All
+    return GPT4All(model_name, **params)
+
+
+def create_inference_service(handle) -> InferenceService:
+    """One queue and worker thread per loaded model, shared by every MistralAgent using it."""
+    def generate(prompt, **kwargs):
+        with handle.lock:
+            return handle.model.generate(prompt, **kwargs)
+
+    def stream(prompt, **kwargs):
+        with handle.lock:
+            yield from handle.model.generate(prompt, streaming=True, **kwargs)
+
+    # GPT4All generates one prompt at a time, so there is no batch_fn.
+    return InferenceService(generate, stream_fn=stream, name=handle.model_name)
+
+
+def inference_stats():
+    """Queue depth and wait-time metrics for every loaded model's inference service."""
+    return {name: service.stats() for name, service in model_registry.find_shared("inference").items()}
+
+
 class MistralAgent:
-    def __init__(self):
-        self.llm = GPT4All(MODEL_NAME)
+    def __init__(self, model_name: str = MODEL_NAME, **model_params):
+        # Every MistralAgent with the same model and params shares one loaded copy.
+        self.handle = model_registry.acquire(model_name, loader=load_gpt4all, **model_params)
         # Define a list of intents that the agent can recognize
         self.intents = ["greeting", "question", "command", "farewell"]
         # Initialize other necessary attributes and components
         # For example, if you're using a language model, initialize it here
         # self.language_model = SomeLanguageModel()
 
-    def generate_response(self, user_input):
-        """Generate a response using Mistral 7B."""
-        prompt = f"""
+    @property
+    def llm(self):
+        return self.handle.model
+
+    @property
+    def service(self) -> InferenceService:
+        return self.handle.shared("inference", create_inference_service)
+
+    def close(self):
+        """Releases this agent's reference to the shared model."""
+        self.handle.release()
+
+    def build_prompt(self, user_input):
+        return f"""
         You are an intelligent assistant. Respond in a helpful and insightful manner.
 
         User: {user_input}
         Assistant:"""
 
-        response = self.llm.generate(prompt, max_tokens=100)
-        return response
+    def generate_response(self, user_input):
+        """Generate a response using Mistral 7B."""
+        return self.service.submit(self.build_prompt(user_input), max_tokens=100).result()
+
+    async def agenerate_response(self, user_input):
+        """Awaitable generate_response; the model runs on the inference worker, not the event loop."""
+        return await self.service.generate(self.build_prompt(user_input), max_tokens=100)
+
+    def astream_response(self, user_input) -> StreamingResponse:
+        """Like agenerate_response, but returns the tokens as they are generated."""
+        return StreamingResponse(self.service.stream(self.build_prompt(user_input), max_tokens=100))
 
     def analyze_intent(self, message: str) -> str:
         """
@@ -34,17 +83,17 @@ class MistralAgent:
         """
         # Construct the prompt for the language model
         prompt = f"Classify the intent of the following message into one of the predefined categories {self.intents}: \"{message}\""
-        
+
         # Use the language model to generate a response
         # Ensure that the language model is properly initialized and can process the prompt
         response = self.generate_response(prompt)
-        
+
         # Process the response to extract the identified intent
         # This might involve parsing the response text to match one of the predefined intents
         identified_intent = response.strip().lower()
-        
+
         # Validate the identified intent
         if identified_intent in self.intents:
             return identified_intent
         else:
-            return "unknown_intent"
\ No newline at end of file
+            return "unknown_intent"
@@ -1,9 +1,15 @@
 from multi_agent_orchestrator.classifiers import Classifier, ClassifierResult
 from common.mistral_agent import MistralAgent
-from typing import List, Optional, Dict
+from common.command_router import CommandRouter
+from common.embedding_router import EmbeddingRouter, Embedder, EmbeddingUnavailable, ROUTER_MARGIN_THRESHOLD
+from common.lru_cache import LRUCache
+from common.tracing import span
+from typing import Any, Callable, List, Optional, Dict, Sequence, Tuple
 from multi_agent_orchestrator.types import ConversationMessage
 from multi_agent_orchestrator.agents import Agent
+import asyncio
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.CRITICAL)
@@ -14,11 +20,62 @@ if not logging.getLogger().handlers:
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
 
+CLASSIFICATION_CACHE_SIZE = 2048
+CLASSIFICATION_CACHE_TTL = 15 * 60  # seconds
+
+def normalize_input(text: str) -> str:
+    """Lowercases and strips punctuation/extra whitespace so near-identical inputs share a cache entry."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+# Used both in the LLM prompt and as labelled points for the embedding router.
+EXAMPLE_MAPPINGS = [
+    ("write code to sort a list", "DarrylAgent"),
+    ("give me python code for binary search", "DarrylAgent"),
+    ("how do I write a REST API in FastAPI?", "DarrylAgent"),
+    ("debug this script", "DarrylAgent"),
+    ("generate code", "DarrylAgent"),
+    ("assign a task to Jim", "SchruteBot"),
+    ("view my task list", "SchruteBot"),
+    ("mark the client proposal as complete", "SchruteBot"),
+    ("daily report", "SchruteBot"),
+    ("give me a dwight quote", "SchruteBot"),
+    ("who won the NBA finals?", "Use a general factual agent if available"),
+]
+
 class MistralClassifier(Classifier):
-    def __init__(self):
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[Sequence[str]], Any]] = None,
+        margin_threshold: float = ROUTER_MARGIN_THRESHOLD,
+        extra_examples: Optional[List[Tuple[str, str]]] = None,
+        cache_size: int = CLASSIFICATION_CACHE_SIZE,
+        cache_ttl: Optional[float] = CLASSIFICATION_CACHE_TTL
+    ):
         super().__init__()
-        self.mistral_agent = MistralAgent()
+        self._mistral_agent = None
         self.agents = []
+        self.command_router = CommandRouter()
+        self.embedding_router = EmbeddingRouter(embed_fn or self._default_embed, margin_threshold)
+        self.extra_examples = list(extra_examples or [])
+        self._router_stale = True
+        self._router_available = True
+        self.embedding_hits = 0
+        self.llm_fallbacks = 0
+        self._embedder = None
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._roster = ()
+
+    @property
+    def mistral_agent(self) -> MistralAgent:
+        # Loaded on the first classification rather than at startup.
+        if self._mistral_agent is None:
+            self._mistral_agent = MistralAgent()
+        return self._mistral_agent
+
+    def _default_embed(self, texts: Sequence[str]):
+        if self._embedder is None:
+            self._embedder = Embedder()
+        return self._embedder.embed(texts)
 
     def set_agents(self, agents: List[Agent]):
         if isinstance(agents, dict):
@@ -28,6 +85,16 @@ class MistralClassifier(Classifier):
             raise TypeError(f"Expected a list of Agent objects, but got {type(agents)} with values: {agents}")
 
         self.agents = agents
+        roster = tuple(sorted(agent.name for agent in agents))
+        if roster != self._roster:
+            # Cached routes may point at agents that are gone or miss new ones.
+            self.cache.clear()
+            self._roster = roster
+        self.command_router.compile({
+            agent.name: getattr(agent, "commands", [])
+            for agent in self.agents
+        })
+        self._router_stale = True
         logger.debug(f"✅ Agents set in MistralClassifier: {self.agents}")
         for agent in self.agents:
             logger.debug(f"- {agent.name}: {agent.description}")
@@ -41,22 +108,92 @@ class MistralClassifier(Classifier):
             for agent in self.agents
         ])
 
+    def get_agent(self, name: str) -> Optional[Agent]:
+        for agent in self.agents:
+            if agent.name == name:
+                return agent
+        return None
+
+    def routing_examples(self) -> List[Tuple[str, str]]:
+        """Labelled (text, agent name) pairs for the embedding router."""
+        names = {agent.name for agent in self.agents}
+        examples = []
+        for agent in self.agents:
+            examples.append((agent.description, agent.name))
+            examples.extend((text, agent.name) for text in getattr(agent, "examples", []))
+        examples.extend(pair for pair in EXAMPLE_MAPPINGS + self.extra_examples if pair[1] in names)
+        return list(dict.fromkeys(examples))
+
+    async def route_by_embedding(self, user_input: str):
+        """Nearest-neighbour match against the routing examples, or None if embeddings are unavailable."""
+        if not self._router_available:
+            return None
+        try:
+            if self._router_stale:
+                await asyncio.to_thread(self.embedding_router.fit, self.routing_examples())
+                self._router_stale = False
+            return await asyncio.to_thread(self.embedding_router.route, user_input)
+        except (ImportError, EmbeddingUnavailable) as e:
+            # No embedding model in this install; stop trying for the life of the process.
+            logger.warning(f"Embedding router unavailable, using the LLM classifier: {e}")
+            self._router_available = False
+            return None
+        except Exception as e:
+            logger.warning(f"Embedding router failed, using the LLM classifier for this request: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters, e.g. how often the command fast path skipped the LLM."""
+        return {
+            "fast_path": self.command_router.stats(),
+            "embedding": {"hits": self.embedding_hits, "llm_fallbacks": self.llm_fallbacks},
+            "cache": self.cache.stats(),
+        }
+
     async def classify(self, user_input, chat_history):
+        with span("classify") as current:
+            # Exact commands ("add task ...", "view tasks", ...) are routed without the LLM.
+            command_agent = self.command_router.match(user_input)
+            if command_agent:
+                current.attributes.update(route="command", agent=command_agent)
+                return ClassifierResult(selected_agent=self.get_agent(command_agent), confidence=1.0)
+
+            cache_key = (normalize_input(user_input), self._roster)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                agent_name, confidence = cached
+                current.attributes.update(route="cache", agent=agent_name)
+                return ClassifierResult(selected_agent=self.get_agent(agent_name), confidence=confidence)
+
+            result, route = await self.classify_free_form(user_input)
+            current.attributes.update(route=route,
+                                      agent=result.selected_agent.name if result.selected_agent else None)
+            if result.selected_agent is not None:
+                self.cache.put(cache_key, (result.selected_agent.name, result.confidence))
+            return result
+
+    async def classify_free_form(self, user_input) -> Tuple[ClassifierResult, str]:
+        """Returns the result and the route that produced it: "embedding" or "llm"."""
+        # Free-form input: nearest agent by embedding, unless the top two are too close to call.
+        match = await self.route_by_embedding(user_input)
+        if self.embedding_router.is_confident(match):
+            self.embedding_hits += 1
+            return ClassifierResult(selected_agent=self.get_agent(match.agent_name), confidence=match.score), "embedding"
+
+        self.llm_fallbacks += 1
+        result = await self.classify_with_llm(user_input)
+        if result.selected_agent is None and match is not None:
+            # The LLM answered with something that isn't an agent name; take the best embedding guess.
+            return ClassifierResult(selected_agent=self.get_agent(match.agent_name), confidence=match.score), "llm"
+        return result, "llm"
+
+    async def classify_with_llm(self, user_input) -> ClassifierResult:
+        examples = "\n                ".join(f'- "{text}" → {target}' for text, target in EXAMPLE_MAPPINGS)
         prompt = f"""
                 You are a classifier that assigns user inputs to the most suitable agent based on their expertise.
 
                 Here are example mappings:
-                - "write code to sort a list" → DarrylAgent
-                - "give me python code for binary search" → DarrylAgent
-                - "how do I write a REST API in FastAPI?" → DarrylAgent
-                - "debug this script" → DarrylAgent
-                - "generate code" → DarrylAgent
-                - "assign a task to Jim" → SchruteBot
-                - "view my task list" → SchruteBot
-                - "mark the client proposal as complete" → SchruteBot
-                - "daily report" → SchruteBot
-                - "give me a dwight quote" → SchruteBot
-                - "who won the NBA finals?" → Use a general factual agent if available
+                {examples}
 
                 Available agents and their descriptions:
                 {self.get_agents_descriptions()}
@@ -66,7 +203,9 @@ class MistralClassifier(Classifier):
                 Which agent is best suited to handle this input? Provide only the agent's name.
                 """
 
-        response = self.mistral_agent.generate_response(prompt).strip()
+        # The first call loads the model, so build the agent off the event loop.
+        mistral_agent = self._mistral_agent or await asyncio.to_thread(lambda: self.mistral_agent)
+        response = (await mistral_agent.agenerate_response(prompt)).strip()
 
         for agent in self.agents:
             if agent.name.lower() == response.lower():
@@ -0,0 +1,187 @@
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+class _ModelEntry:
+    """Bookkeeping for one loaded (model, params) pair."""
+
+    def __init__(self, key: ModelKey):
+        self.key = key
+        self.model = None
+        self.refcount = 0
+        self.load_lock = threading.Lock()
+        # Most local backends (GPT4All included) are not safe to call from several threads at once.
+        self.lock = threading.RLock()
+        # Guards building and clearing shared objects only. Never held during a model call, so
+        # looking up the inference service does not wait behind a running generation.
+        self.shared_lock = threading.Lock()
+        self.shared: Dict[str, Any] = {}
+
+
+class ModelHandle:
+    """A reference-counted handle to a model owned by a ModelRegistry."""
+
+    def __init__(self, registry: "ModelRegistry", entry: _ModelEntry):
+        self._registry = registry
+        self._entry = entry
+        self.released = False
+
+    @property
+    def key(self) -> ModelKey:
+        return self._entry.key
+
+    @property
+    def model_name(self) -> str:
+        return self._entry.key[0]
+
+    @property
+    def model(self):
+        model = self._entry.model
+        if model is None or self.released:
+            raise RuntimeError(f"Model '{self.model_name}' is no longer loaded.")
+        return model
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Serialises access to the underlying model across every handle that shares it."""
+        return self._entry.lock
+
+    def shared(self, name: str, factory: Callable[["ModelHandle"], Any]):
+        """Returns an object shared by every handle on this model, creating it on first use.
+
+        Shared objects with a ``close()`` method are closed when the model is unloaded.
+        ``factory`` gets a handle owned by the model itself rather than this one, so the
+        object keeps working after the handle that created it is released.
+        """
+        shared = self._entry.shared.get(name)
+        if shared is not None:
+            return shared
+        with self._entry.shared_lock:
+            if name not in self._entry.shared:
+                self._entry.shared[name] = factory(_SharedHandle(self._registry, self._entry))
+            return self._entry.shared[name]
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self._registry.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class _SharedHandle(ModelHandle):
+    """Handle held by a model's shared objects; valid until the model is unloaded, never released."""
+
+    def release(self):
+        pass
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each (model, params) pair once and shares it.
+
+    Every ``acquire`` returns a new handle and bumps the reference count. The model is
+    unloaded when the last handle is released, or immediately via ``unload``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[ModelKey, _ModelEntry] = {}
+
+    @staticmethod
+    def make_key(model_name: str, params: Dict[str, Any]) -> ModelKey:
+        return model_name, tuple(sorted(params.items()))
+
+    def acquire(self, model_name: str, loader: Callable[..., Any], **params) -> ModelHandle:
+        """Returns a handle to ``model_name``, loading it with ``loader(model_name, **params)`` if needed."""
+        key = self.make_key(model_name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ModelEntry(key)
+                self._entries[key] = entry
+            entry.refcount += 1
+
+        # Load outside the registry lock so other models can be acquired meanwhile;
+        # concurrent callers for the same key wait on the entry's load lock instead.
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    logger.info(f"Loading model {model_name} {params or ''}")
+                    entry.model = loader(model_name, **params)
+        except Exception:
+            self._decref(entry)
+            raise
+
+        return ModelHandle(self, entry)
+
+    def release(self, handle: ModelHandle):
+        self._decref(handle._entry)
+
+    def _decref(self, entry: _ModelEntry):
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount > 0 or self._entries.get(entry.key) is not entry:
+                # Still referenced, or already force-unloaded via unload().
+                return
+            del self._entries[entry.key]
+        self._close_entry(entry)
+
+    def unload(self, model_name: str, **params) -> bool:
+        """Unloads a model even if handles to it are still held. Returns True if it was loaded."""
+        key = self.make_key(model_name, params)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._close_entry(entry)
+        return True
+
+    def unload_all(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def _close_entry(self, entry: _ModelEntry):
+        with entry.shared_lock:
+            shared_objects = list(entry.shared.values())
+            entry.shared.clear()
+        # Closed outside the locks: shared workers may need the model lock to finish in-flight calls.
+        for shared in shared_objects:
+            close = getattr(shared, "close", None)
+            if callable(close):
+                close()
+        with entry.lock:
+            model, entry.model = entry.model, None
+        close = getattr(model, "close", None)
+        if callable(close):
+            close()
+        logger.info(f"Unloaded model {entry.key[0]}")
+
+    def loaded(self) -> Dict[ModelKey, int]:
+        """Maps each loaded (model, params) key to its current reference count."""
+        with self._lock:
+            return {key: entry.refcount for key, entry in self._entries.items() if entry.model is not None}
+
+    def find_shared(self, name: str) -> Dict[str, Any]:
+        """Maps model names to the shared object called ``name``, for models that have one."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {entry.key[0]: entry.shared[name] for entry in entries if name in entry.shared}
+
+    def is_loaded(self, model_name: str, **params) -> bool:
+        return self.make_key(model_name, params) in self.loaded()
+
+
+model_registry = ModelRegistry()
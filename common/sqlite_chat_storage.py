@@ -0,0 +1,297 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from multi_agent_orchestrator.storage import ChatStorage
+from multi_agent_orchestrator.types import ConversationMessage, TimestampedMessage
+
+from common.history_compactor import HistoryCompactor, Summary
+from common.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CHAT_DB_FILE = os.getenv("DUNDER_CHAT_DB", "chat_history.db")
+CHAT_HISTORY_PAIRS = 10  # User/assistant pairs read back per conversation
+SESSION_CACHE_SIZE = 128  # Conversations kept in memory
+SESSION_IDLE_TTL = 30 * 60.0  # Seconds before an idle conversation leaves memory
+COMPACT_EVERY_WRITES = 500  # Saved messages between background compactions
+CHAT_RETENTION = 30 * 24 * 3600  # Seconds a conversation is kept after its last message
+
+Key = Tuple[str, str, str]  # (user_id, session_id, agent_id)
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        agent_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(user_id, session_id, agent_id, id);
+    CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(user_id, session_id, id);
+    CREATE TABLE IF NOT EXISTS chat_summaries (
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        agent_id TEXT NOT NULL,
+        summary TEXT NOT NULL,
+        through INTEGER NOT NULL,
+        PRIMARY KEY (user_id, session_id, agent_id)
+    );
+"""
+INSERT_SQL = """
+    INSERT INTO messages (user_id, session_id, agent_id, role, content, timestamp) VALUES (?, ?, ?, ?, ?, ?)
+"""
+# Newest first so LIMIT reads only the tail of a long conversation off the index.
+FETCH_SQL = """
+    SELECT role, content, timestamp FROM messages
+    WHERE user_id = ? AND session_id = ? AND agent_id = ?
+    ORDER BY id DESC LIMIT ?
+"""
+FETCH_SESSION_SQL = """
+    SELECT agent_id, role, content, timestamp FROM messages
+    WHERE user_id = ? AND session_id = ?
+    ORDER BY id DESC LIMIT ?
+"""
+TRIM_SQL = """
+    DELETE FROM messages WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, session_id, agent_id ORDER BY id DESC) AS age
+            FROM messages
+        ) WHERE age > ?
+    )
+"""
+EXPIRE_SQL = """
+    DELETE FROM messages WHERE (user_id, session_id, agent_id) IN (
+        SELECT user_id, session_id, agent_id FROM messages
+        GROUP BY user_id, session_id, agent_id HAVING MAX(timestamp) < ?
+    )
+"""
+
+SESSION_AGENT = ""  # agent_id of the session-wide history the classifier reads
+
+
+def _role(message: ConversationMessage) -> str:
+    return getattr(message.role, "value", message.role)
+
+
+class SqliteChatStorage(ChatStorage):
+    """
+    Orchestrator chat storage in a local SQLite file, so conversations survive restarts.
+
+    Only the last ``max_pairs`` user/assistant pairs of a conversation are read, straight
+    off the (user, session, agent, id) index. Recently used conversations stay in an LRU
+    that drops sessions idle for ``idle_ttl`` seconds. Saves append one row; every
+    ``compact_every`` saves a background job trims conversations back to their readable
+    tail and deletes those idle longer than ``retention`` seconds. All database work runs
+    on one thread, off the event loop.
+
+    With a ``compactor`` every fetch is also held to its token budget, and the running
+    summaries it builds are stored alongside the messages.
+    """
+
+    def __init__(
+        self,
+        path: str = CHAT_DB_FILE,
+        max_pairs: int = CHAT_HISTORY_PAIRS,
+        cache_size: int = SESSION_CACHE_SIZE,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        compact_every: int = COMPACT_EVERY_WRITES,
+        retention: float = CHAT_RETENTION,
+        clock: Callable[[], float] = time.time,
+        compactor: Optional[HistoryCompactor] = None
+    ):
+        super().__init__()
+        self.max_messages = max_pairs * 2
+        self.compact_every = compact_every
+        self.retention = retention
+        self.clock = clock
+        self.sessions = LRUCache(maxsize=cache_size, ttl=idle_ttl)
+        self.compactor = compactor
+        self.summaries = LRUCache(maxsize=cache_size, ttl=idle_ttl)
+        self._refreshing: Dict[Key, asyncio.Task] = {}
+        self.writes = 0
+        self.compactions = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-storage")
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA_SQL)
+
+    def _submit(self, fn: Callable[..., Any], *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _limit(self, max_history_size: Optional[int]) -> int:
+        if max_history_size is None:
+            return self.max_messages
+        # Whole pairs only, as ChatStorage.trim_conversation does.
+        return min(self.max_messages, max_history_size - max_history_size % 2)
+
+    # Database work; runs on the storage thread.
+
+    def _insert(self, key: Key, messages: List[TimestampedMessage]):
+        with self.conn:
+            self.conn.executemany(INSERT_SQL, [
+                (*key, _role(message), json.dumps(message.content or []), message.timestamp)
+                for message in messages
+            ])
+
+    def _load(self, key: Key) -> List[TimestampedMessage]:
+        rows = self.conn.execute(FETCH_SQL, (*key, self.max_messages)).fetchall()
+        return [TimestampedMessage(role, json.loads(content), timestamp) for role, content, timestamp in reversed(rows)]
+
+    def _load_session(self, user_id: str, session_id: str) -> List[TimestampedMessage]:
+        rows = self.conn.execute(FETCH_SESSION_SQL, (user_id, session_id, self.max_messages)).fetchall()
+        messages = []
+        for agent_id, role, content, timestamp in reversed(rows):
+            content = json.loads(content)
+            if content and role == "assistant":
+                content = [{"text": f"[{agent_id}] {content[0].get('text', '')}"}]
+            messages.append(TimestampedMessage(role, content, timestamp))
+        return messages
+
+    def _load_summary(self, key: Key) -> Summary:
+        row = self.conn.execute(
+            "SELECT summary, through FROM chat_summaries WHERE user_id = ? AND session_id = ? AND agent_id = ?", key
+        ).fetchone()
+        return Summary(*row) if row else Summary()
+
+    def _save_summary(self, key: Key, summary: Summary):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO chat_summaries VALUES (?, ?, ?, ?, ?)",
+                              (*key, summary.text, summary.through))
+
+    def compact(self) -> Dict[str, int]:
+        """Trims every conversation to its readable tail and drops expired ones; returns rows removed."""
+        with self.conn:
+            trimmed = self.conn.execute(TRIM_SQL, (self.max_messages,)).rowcount
+            cutoff = int((self.clock() - self.retention) * 1000)
+            expired = self.conn.execute(EXPIRE_SQL, (cutoff,)).rowcount
+            self.conn.execute("DELETE FROM chat_summaries WHERE through < ?", (cutoff,))
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self.compactions += 1
+        return {"trimmed": trimmed, "expired": expired}
+
+    async def _compacted(self, key: Key, messages: List[TimestampedMessage],
+                         max_history_size: Optional[int]) -> List[ConversationMessage]:
+        messages = self.trim_conversation(messages, self._limit(max_history_size))
+        if self.compactor is None:
+            return self._remove_timestamps(messages)
+        summary = self.summaries.get(key)
+        if summary is None:
+            summary = await self._run(self._load_summary, key)
+            self.summaries.put(key, summary)
+        history = self.compactor.compact(messages, summary)
+        if self.compactor.needs_refresh(history) and key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key, summary, history.unsummarised))
+        return history.messages
+
+    async def _refresh(self, key: Key, summary: Summary, unsummarised: List[TimestampedMessage]):
+        try:
+            summary = await self.compactor.refresh(summary, unsummarised)
+            await self._run(self._save_summary, key, summary)
+            self.summaries.put(key, summary)
+        except Exception as e:
+            logger.warning(f"Chat summary refresh failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    # ChatStorage interface.
+
+    async def _conversation(self, key: Key) -> List[TimestampedMessage]:
+        conversation = self.sessions.get(key)
+        if conversation is None:
+            conversation = await self._run(self._load, key)
+            self.sessions.put(key, conversation)
+        return conversation
+
+    async def _append(self, key: Key, messages: List[TimestampedMessage],
+                      max_history_size: Optional[int]) -> List[ConversationMessage]:
+        await self._run(self._insert, key, messages)
+        # Read the cache only after the insert, so saves that overlap never drop each other's messages.
+        conversation = self.sessions.get(key)
+        if conversation is None:
+            conversation = await self._run(self._load, key)
+        else:
+            conversation = (conversation + messages)[-self.max_messages:]
+        self.sessions.put(key, conversation)
+
+        self.writes += len(messages)
+        if self.writes >= self.compact_every:
+            self.writes = 0
+            # Queued behind the insert on the storage thread; nobody waits for it.
+            self._submit(self.compact)
+        return self._remove_timestamps(self.trim_conversation(conversation, self._limit(max_history_size)))
+
+    async def save_chat_message(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        new_message: Union[ConversationMessage, TimestampedMessage],
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        key = (user_id, session_id, agent_id)
+        conversation = await self._conversation(key)
+        if self.is_same_role_as_last_message(conversation, new_message):
+            return self._remove_timestamps(self.trim_conversation(conversation, self._limit(max_history_size)))
+        return await self._append(key, [self._timestamped(new_message)], max_history_size)
+
+    async def save_chat_messages(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        new_messages: Union[List[ConversationMessage], List[TimestampedMessage]],
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        if not new_messages:
+            return await self.fetch_chat(user_id, session_id, agent_id, max_history_size)
+        messages = [self._timestamped(message) for message in new_messages]
+        return await self._append((user_id, session_id, agent_id), messages, max_history_size)
+
+    async def fetch_chat(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        key = (user_id, session_id, agent_id)
+        return await self._compacted(key, await self._conversation(key), max_history_size)
+
+    async def fetch_all_chats(self, user_id: str, session_id: str) -> List[ConversationMessage]:
+        """The session's latest messages across all agents, oldest first, tagged with the agent that replied."""
+        messages = await self._run(self._load_session, user_id, session_id)
+        return await self._compacted((user_id, session_id, SESSION_AGENT), messages, None)
+
+    @staticmethod
+    def _timestamped(message: ConversationMessage) -> TimestampedMessage:
+        if isinstance(message, TimestampedMessage):
+            return message
+        return TimestampedMessage(role=_role(message), content=message.content)
+
+    @staticmethod
+    def _remove_timestamps(messages: List[ConversationMessage]) -> List[ConversationMessage]:
+        return [ConversationMessage(role=message.role, content=message.content) for message in messages]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"sessions": self.sessions.stats(), "compactions": self.compactions}
+        if self.compactor is not None:
+            stats["history"] = self.compactor.stats()
+        return stats
+
+    def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._executor.shutdown(wait=True)
+        self.conn.close()
@@ -0,0 +1,65 @@
+import time
+from typing import AsyncIterator, Optional
+
+
+class StreamingResponse:
+    """Agent output that arrives as text chunks while the model is still generating.
+
+    Iterate with ``async for`` to render chunks as they come, or await ``text()``
+    for the whole string. ``time_to_first_token`` is set once the first model
+    chunk has arrived.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], prefix: str = "", suffix: str = ""):
+        self._chunks = chunks
+        self.prefix = prefix
+        self.suffix = suffix
+        self.parts = []
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.done = False
+        self._iterator = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def __aiter__(self):
+        if self.done:
+            return self._replay()
+        # Every iteration shares one underlying stream, so a partly read response can be resumed.
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def _replay(self):
+        yield self.collected()
+
+    async def _iterate(self):
+        if self.prefix:
+            yield self.prefix
+        async for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.parts.append(chunk)
+            yield chunk
+        if self.suffix:
+            yield self.suffix
+        self.done = True
+
+    def collected(self) -> str:
+        return self.prefix + "".join(self.parts) + (self.suffix if self.done else "")
+
+    async def text(self) -> str:
+        """Consumes the rest of the stream and returns the full response."""
+        if not self.done:
+            async for _ in self:
+                pass
+        return self.collected()
+
+    def __str__(self) -> str:
+        return self.collected()
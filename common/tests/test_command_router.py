@@ -0,0 +1,52 @@
+from common.command_router import Command, CommandRouter
+
+def make_router():
+    router = CommandRouter()
+    router.compile({
+        "SchruteBot": [Command("add task"), Command("view tasks", exact=True), Command("daily report", exact=True)],
+        "JimsterAgent": [Command("generate prank task", exact=True)],
+        "DarrylAgent": [Command("set model gemma3:1b", exact=True)],
+        "OscarAgent": [Command("set model")],
+    })
+    return router
+
+def test_prefix_and_exact_commands():
+    router = make_router()
+    assert router.match("add task file TPS reports") == "SchruteBot"
+    assert router.match("  View   Tasks ") == "SchruteBot"
+    assert router.match("generate prank task") == "JimsterAgent"
+
+def test_exact_commands_need_the_whole_input():
+    router = make_router()
+    assert router.match("view tasks for jim") is None
+    assert router.match("generate prank task now") is None
+
+def test_longest_command_wins():
+    router = make_router()
+    assert router.match("set model gemma3:1b") == "DarrylAgent"
+    assert router.match("set model llama3") == "OscarAgent"
+
+def test_trailing_colons_and_commas_are_ignored():
+    router = make_router()
+    assert router.match("add task: file TPS reports") == "SchruteBot"
+    assert router.match("View tasks:") == "SchruteBot"
+    assert router.match("daily report,") == "SchruteBot"
+    assert router.match("set model gemma3:1b") == "DarrylAgent"
+    assert router.starts_with_command("add task, then view tasks")
+    assert router.starts_with_command("view tasks: page 2")
+
+def test_free_form_input_is_not_matched():
+    router = make_router()
+    assert router.match("write code to sort a list") is None
+    assert router.match("add taskforce meeting") is None
+
+def test_ambiguous_commands_fall_through():
+    router = CommandRouter()
+    router.compile({"A": [Command("set model")], "B": [Command("set model")]})
+    assert router.match("set model x") is None
+
+def test_hit_rate():
+    router = make_router()
+    router.match("daily report")
+    router.match("what is the weather")
+    assert router.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
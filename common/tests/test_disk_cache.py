@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from common.disk_cache import DiskCache, Fetched, normalize_query
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), clock=clock)
+    yield cache
+    cache.close()
+
+def test_values_round_trip_and_persist(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = DiskCache(path)
+    cache.put("search", "office", [["Dunder Mifflin", "https://example.com"]], ttl=60)
+    cache.close()
+
+    reopened = DiskCache(path)
+    assert reopened.get("search", "office") == [["Dunder Mifflin", "https://example.com"]]
+    reopened.close()
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("page", "https://example.com", "hello", ttl=10)
+    clock.now += 5
+    assert cache.get("page", "https://example.com") == "hello"
+    clock.now += 10
+    assert cache.get("page", "https://example.com") is None
+    assert cache.lookup("page", "https://example.com").value == "hello"
+
+def test_identical_content_is_stored_once(cache):
+    cache.put("page", "https://a.example", "same body" * 100)
+    cache.put("page", "https://b.example", "same body" * 100)
+    assert cache.stats()["entries"] == 2
+    assert cache.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+
+    cache.delete("page", "https://a.example")
+    assert cache.get("page", "https://b.example") == "same body" * 100
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=2000, clock=clock)
+    for i in range(3):
+        clock.now += 1
+        cache.put("page", f"url{i}", f"{i}".join(str(n) for n in range(400)))
+    clock.now += 1
+    cache.get("page", "url0")  # url1 is now the least recently used
+    clock.now += 1
+    cache.put("page", "url3", "3".join(str(n) for n in range(400)))
+
+    assert cache.total_bytes() <= 2000
+    assert cache.get("page", "url1") is None
+    assert cache.get("page", "url3") is not None
+    assert cache.evictions >= 1
+    cache.close()
+
+def test_stale_entry_kept_when_not_modified(cache, clock):
+    def first(stale):
+        return Fetched("v1", etag='"abc"')
+
+    def revalidate(stale):
+        assert stale.etag == '"abc"'
+        return Fetched(not_modified=True)
+
+    assert cache.get_or_fetch("page", "u", first, ttl=10) == "v1"
+    clock.now += 20
+    assert cache.get_or_fetch("page", "u", revalidate, ttl=10) == "v1"
+    assert cache.get("page", "u") == "v1"
+    assert cache.revalidated == 1
+
+def test_none_values_are_not_cached(cache):
+    assert cache.get_or_fetch("page", "u", lambda stale: Fetched(None)) is None
+    assert cache.lookup("page", "u") is None
+
+@pytest.mark.asyncio
+async def test_async_lookups_run_off_the_event_loop(cache, monkeypatch):
+    threads = []
+    for name in ("lookup", "put"):
+        method = getattr(cache, name)
+        def record(*args, method=method, **kwargs):
+            threads.append(threading.current_thread())
+            return method(*args, **kwargs)
+        monkeypatch.setattr(cache, name, record)
+
+    async def fetch(stale):
+        return Fetched("page body")
+
+    assert await cache.aget_or_fetch("page", "u", fetch) == "page body"
+    assert await cache.aget_or_fetch("page", "u", fetch) == "page body"
+    assert len(threads) == 3  # miss, store, hit
+    assert threading.main_thread() not in threads
+
+@pytest.mark.asyncio
+async def test_concurrent_async_requests_share_one_fetch(cache):
+    calls = 0
+
+    async def fetch(stale):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return Fetched("page body")
+
+    results = await asyncio.gather(*(cache.aget_or_fetch("page", "u", fetch) for _ in range(5)))
+    assert results == ["page body"] * 5
+    assert calls == 1
+    assert cache.coalesced == 4
+
+def test_concurrent_threads_share_one_fetch(cache):
+    calls = 0
+    results = []
+
+    def fetch(stale):
+        nonlocal calls
+        calls += 1
+        time.sleep(0.05)
+        return Fetched("page body")
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("page", "u", fetch)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["page body"] * 4
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_fetch_errors_reach_every_waiter(cache):
+    async def fetch(stale):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("offline")
+
+    results = await asyncio.gather(*(cache.aget_or_fetch("page", "u", fetch) for _ in range(3)),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.lookup("page", "u") is None
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_the_leader_is_cancelled(cache):
+    calls = []
+
+    async def fetch(stale):
+        calls.append(stale)
+        await asyncio.sleep(0.05)
+        return Fetched(f"page body {len(calls)}")
+
+    leader = asyncio.create_task(cache.aget_or_fetch("page", "u", fetch))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cache.aget_or_fetch("page", "u", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()  # e.g. crawl_in_rank_order dropping a straggler
+
+    assert await asyncio.wait_for(follower, timeout=5) == "page body 2"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert len(calls) == 2
+    assert cache.lookup("page", "u").value == "page body 2"
+
+def test_normalize_query():
+    assert normalize_query("  Dunder   MIFFLIN paper ") == "dunder mifflin paper"
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import zlib
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from multi_agent_orchestrator.classifiers import ClassifierResult
+
+import common.mistral_classifier as mistral_classifier
+from common.embedding_router import EmbeddingRouter, EmbeddingUnavailable
+from common.mistral_classifier import MistralClassifier
+from common.tracing import Tracer
+from agents.registry import AgentRegistry, DEFAULT_AGENTS
+
+def bag_of_words(texts, dims=256):
+    """Deterministic hashed bag-of-words embedding, enough to tell the agents apart."""
+    vectors = np.zeros((len(texts), dims), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().replace("?", "").split():
+            vectors[row, zlib.crc32(word.encode()) % dims] += 1.0
+    return vectors
+
+def test_routes_to_nearest_agent():
+    router = EmbeddingRouter(bag_of_words, margin_threshold=0.05)
+    router.fit([
+        ("write python code", "DarrylAgent"),
+        ("debug this script", "DarrylAgent"),
+        ("view my task list", "SchruteBot"),
+        ("daily report", "SchruteBot"),
+    ])
+    match = router.route("write python code to parse a csv")
+    assert match.agent_name == "DarrylAgent"
+    assert router.is_confident(match)
+
+def test_low_margin_is_not_confident():
+    router = EmbeddingRouter(bag_of_words, margin_threshold=0.05)
+    router.fit([("report", "SchruteBot"), ("report", "OscarAgent")])
+    match = router.route("report")
+    assert match.margin == pytest.approx(0.0)
+    assert not router.is_confident(match)
+
+def test_unfitted_router_returns_none():
+    assert EmbeddingRouter(bag_of_words).route("hello") is None
+
+@pytest.mark.asyncio
+async def test_classifier_skips_llm_when_confident():
+    classifier = MistralClassifier(embed_fn=bag_of_words, extra_examples=[("parse a csv file in python", "DarrylAgent")])
+    classifier.set_agents(AgentRegistry(DEFAULT_AGENTS).proxies())
+
+    result = await classifier.classify("give me python code to parse a csv file", [])
+    assert result.selected_agent.name == "DarrylAgent"
+    assert classifier.stats()["embedding"] == {"hits": 1, "llm_fallbacks": 0}
+    assert classifier._mistral_agent is None
+
+@pytest.mark.asyncio
+async def test_one_failed_embedding_does_not_disable_the_router():
+    calls = []
+
+    def flaky(texts):
+        calls.append(len(texts))
+        if len(calls) == 2:
+            raise RuntimeError("embedding batch failed")
+        return bag_of_words(texts)
+
+    classifier = MistralClassifier(embed_fn=flaky)
+    classifier.set_agents(AgentRegistry(DEFAULT_AGENTS).proxies())
+    assert await classifier.route_by_embedding("write python code") is None
+    match = await classifier.route_by_embedding("write python code")
+    assert match.agent_name == "DarrylAgent"
+
+@pytest.mark.asyncio
+async def test_missing_embedding_model_disables_the_router():
+    calls = []
+
+    def unavailable(texts):
+        calls.append(texts)
+        raise EmbeddingUnavailable("model file not found")
+
+    classifier = MistralClassifier(embed_fn=unavailable)
+    classifier.set_agents(AgentRegistry(DEFAULT_AGENTS).proxies())
+    assert await classifier.route_by_embedding("write python code") is None
+    assert await classifier.route_by_embedding("write python code") is None
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_classifier_caches_normalised_inputs():
+    classifier = MistralClassifier(embed_fn=bag_of_words)
+    proxies = AgentRegistry(DEFAULT_AGENTS).proxies()
+    classifier.set_agents(proxies)
+
+    first = await classifier.classify("View my task list", [])
+    second = await classifier.classify("  view my TASK list! ", [])
+    assert first.selected_agent is second.selected_agent
+    assert classifier.cache.stats()["hits"] == 1
+
+    classifier.set_agents(proxies[:2])
+    assert len(classifier.cache) == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_classifications_trace_their_own_route(monkeypatch, tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(mistral_classifier, "span", tracer.span)
+    classifier = MistralClassifier(embed_fn=bag_of_words)
+    classifier.set_agents(AgentRegistry(DEFAULT_AGENTS).proxies())
+
+    async def route_by_embedding(text):
+        if text == "write code":
+            await asyncio.sleep(0.05)  # the LLM fallback below happens meanwhile
+            return SimpleNamespace(agent_name="DarrylAgent", score=0.9, confident=True)
+        return SimpleNamespace(agent_name="OscarAgent", score=0.1, confident=False)
+
+    async def classify_with_llm(text):
+        return ClassifierResult(selected_agent=classifier.get_agent("OscarAgent"), confidence=1.0)
+
+    monkeypatch.setattr(classifier, "route_by_embedding", route_by_embedding)
+    monkeypatch.setattr(classifier, "classify_with_llm", classify_with_llm)
+    monkeypatch.setattr(classifier.embedding_router, "is_confident", lambda match: match.confident)
+
+    embedded = asyncio.create_task(classifier.classify("write code", []))
+    await asyncio.sleep(0.01)
+    await classifier.classify("something vague", [])
+    await embedded
+    tracer.close()
+
+    with open(tmp_path / "traces.jsonl", encoding="utf-8") as file:
+        routes = {span["agent"]: span["route"] for span in map(json.loads, file)}
+    assert routes == {"OscarAgent": "llm", "DarrylAgent": "embedding"}
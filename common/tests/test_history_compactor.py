@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from multi_agent_orchestrator.types import ParticipantRole, TimestampedMessage
+
+from common.history_compactor import HistoryCompactor, Summary, SUMMARY_REQUEST, message_tokens
+from common.sqlite_chat_storage import SqliteChatStorage
+from common.tests.test_sqlite_chat_storage import user, assistant, texts
+
+def turns(count, words=20):
+    messages = []
+    for turn in range(count):
+        filler = " ".join(["beets"] * words)
+        messages.append(TimestampedMessage(role=ParticipantRole.USER.value, content=[{"text": f"q{turn} {filler}"}],
+                                           timestamp=1000 + turn * 10))
+        messages.append(TimestampedMessage(role=ParticipantRole.ASSISTANT.value,
+                                           content=[{"text": f"a{turn} {filler}"}], timestamp=1001 + turn * 10))
+    return messages
+
+class Summarizer:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, previous, transcript, max_tokens):
+        self.calls.append((previous, transcript, max_tokens))
+        return f"summary {len(self.calls)}"
+
+def test_short_history_is_untouched():
+    compactor = HistoryCompactor(Summarizer(), token_budget=1000, summary_tokens=100)
+    history = compactor.compact(turns(2), Summary())
+    assert [text.split()[0] for text in texts(history.messages)] == ["q0", "a0", "q1", "a1"]
+    assert history.tokens_saved == 0 and history.unsummarised == []
+
+def test_long_history_keeps_whole_recent_turns_within_budget():
+    messages = turns(20)
+    compactor = HistoryCompactor(Summarizer(), token_budget=200, summary_tokens=50)
+    history = compactor.compact(messages, Summary("Dwight bought beets.", through=1051))
+
+    assert texts(history.messages)[:2] == [SUMMARY_REQUEST, "Dwight bought beets."]
+    recent = [text.split()[0] for text in texts(history.messages)[2:]]
+    assert recent[0].startswith("q") and recent[-1] == "a19"
+    assert sum(message_tokens(message) for message in history.messages[2:]) <= 150
+    assert history.tokens_out <= 200 and history.tokens_saved > 0
+    # Turns newer than the summary but outside the window are waiting to be folded in.
+    assert history.unsummarised[0].timestamp == 1060
+    assert compactor.stats()["tokens_saved"] == history.tokens_saved
+
+@pytest.mark.asyncio
+async def test_refresh_folds_unsummarised_turns_into_the_summary():
+    summarize = Summarizer()
+    compactor = HistoryCompactor(summarize, token_budget=200, summary_tokens=50, refresh_tokens=100)
+    history = compactor.compact(turns(20), Summary())
+    assert compactor.needs_refresh(history)
+
+    summary = await compactor.refresh(Summary(), history.unsummarised)
+    assert summary == Summary("summary 1", through=history.unsummarised[-1].timestamp)
+    assert summarize.calls[0][0] == "" and summarize.calls[0][1].startswith("user: q0")
+
+    again = compactor.compact(turns(20), summary)
+    assert again.unsummarised == [] and not compactor.needs_refresh(again)
+    assert texts(again.messages)[1] == "summary 1"
+
+@pytest.mark.asyncio
+async def test_storage_summarises_in_the_background_and_keeps_the_summary(tmp_path):
+    path = str(tmp_path / "chat.db")
+    summarize = Summarizer()
+    compactor = HistoryCompactor(summarize, token_budget=60, summary_tokens=20, refresh_tokens=20)
+    storage = SqliteChatStorage(path, compactor=compactor)
+    for turn in range(6):
+        await storage.save_chat_messages("pam", "s", "a", [user(f"question {turn} " * 5), assistant(f"answer {turn} " * 5)])
+
+    first = await storage.fetch_chat("pam", "s", "a")
+    assert SUMMARY_REQUEST not in texts(first)  # nothing summarised yet, older turns are left out
+    await asyncio.gather(*storage._refreshing.values())
+    assert len(summarize.calls) == 1
+
+    second = await storage.fetch_chat("pam", "s", "a")
+    assert texts(second)[:2] == [SUMMARY_REQUEST, "summary 1"]
+    assert storage.stats()["history"]["summary_refreshes"] == 1
+    storage.close()
+
+    reopened = SqliteChatStorage(path, compactor=HistoryCompactor(Summarizer(), token_budget=60, summary_tokens=20))
+    assert texts(await reopened.fetch_chat("pam", "s", "a"))[1] == "summary 1"
+    reopened.close()
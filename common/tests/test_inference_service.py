@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import pytest
+
+from common.inference_service import InferenceService, InferenceQueueFull
+from common.mistral_agent import create_inference_service
+from common.model_registry import ModelRegistry
+
+def slow_echo(prompt, **kwargs):
+    time.sleep(0.05)
+    return f"{prompt}:{kwargs.get('max_tokens')}"
+
+@pytest.mark.asyncio
+async def test_generate_does_not_block_the_event_loop():
+    service = InferenceService(slow_echo)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    result = await service.generate("hello", max_tokens=5)
+    task.cancel()
+    service.close()
+
+    assert result == "hello:5"
+    assert ticks > 3
+
+@pytest.mark.asyncio
+async def test_requests_run_in_submission_order():
+    service = InferenceService(slow_echo)
+    results = await asyncio.gather(*(service.generate(str(i)) for i in range(4)))
+    service.close()
+    assert results == ["0:None", "1:None", "2:None", "3:None"]
+    stats = service.stats()
+    assert stats["completed"] == 4
+    assert stats["queue_depth"] == 0
+    assert stats["max_wait_ms"] > 0
+
+def test_full_queue_rejects():
+    release = threading.Event()
+    service = InferenceService(lambda prompt, **kw: release.wait() and prompt, max_queue=1)
+    service.submit("running")
+    time.sleep(0.05)  # let the worker pick up the first job
+    service.submit("queued")
+    with pytest.raises(InferenceQueueFull):
+        service.submit("rejected")
+    release.set()
+    service.close()
+    assert service.stats()["rejected"] == 1
+
+def test_in_flight_counts_the_running_prompt():
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate(prompt, **kwargs):
+        started.set()
+        release.wait()
+        return prompt
+
+    service = InferenceService(generate)
+    future = service.submit("running")
+    assert started.wait(5)
+    # The queue is empty once the worker takes the job, but the model is still busy.
+    assert service.queue_depth == 0 and service.in_flight == 1
+    service.submit("queued")
+    assert service.in_flight == 2
+    release.set()
+    assert future.result(5) == "running"
+    service.close()
+    assert service.in_flight == 0 and service.stats()["in_flight"] == 0
+
+def test_micro_batching_groups_queued_prompts():
+    calls = []
+    release = threading.Event()
+
+    def generate(prompt, **kwargs):
+        release.wait()
+        return prompt
+
+    def generate_batch(prompts, **kwargs):
+        calls.append(list(prompts))
+        return [p.upper() for p in prompts]
+
+    service = InferenceService(generate, batch_fn=generate_batch, max_batch_size=8, batch_window=0.05)
+    first = service.submit("first")
+    time.sleep(0.1)  # first prompt is now running alone
+    queued = [service.submit(p) for p in ["a", "b", "c"]]
+    release.set()
+
+    assert first.result(timeout=2) == "first"
+    assert [f.result(timeout=2) for f in queued] == ["A", "B", "C"]
+    service.close()
+    assert calls == [["a", "b", "c"]]
+
+def test_errors_propagate_to_callers():
+    def broken(prompt, **kwargs):
+        raise ValueError("model crashed")
+
+    service = InferenceService(broken)
+    with pytest.raises(ValueError):
+        service.submit("x").result(timeout=2)
+    service.close()
+    assert service.stats()["failed"] == 1
+
+def test_short_batch_fails_every_job_in_it():
+    release = threading.Event()
+    service = InferenceService(lambda prompt, **kw: release.wait() and prompt,
+                               batch_fn=lambda prompts, **kw: prompts[:1], batch_window=0.05)
+    first = service.submit("first")
+    time.sleep(0.1)
+    queued = [service.submit(p) for p in ["a", "b"]]
+    release.set()
+    assert first.result(timeout=2) == "first"
+    for future in queued:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=2)
+    service.close()
+    assert service.stats()["failed"] == 2
+
+def test_submit_racing_close_never_strands_a_job():
+    service = InferenceService(lambda prompt, **kw: prompt, max_queue=1000)
+    futures = []
+    start = threading.Event()
+
+    def submitter():
+        start.wait()
+        for i in range(200):
+            try:
+                futures.append(service.submit(str(i)))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=submitter) for _ in range(4)]
+    for t in threads:
+        t.start()
+    start.set()
+    service.close()
+    for t in threads:
+        t.join()
+    assert all(future.result(timeout=2) is not None for future in futures)
+
+@pytest.mark.asyncio
+async def test_service_lookup_does_not_wait_for_a_running_generation():
+    started = threading.Event()
+
+    class SlowModel:
+        def generate(self, prompt, **kwargs):
+            started.set()
+            time.sleep(0.5)
+            return prompt
+
+    registry = ModelRegistry()
+    handle = registry.acquire("slow", loader=lambda name: SlowModel())
+    service = handle.shared("inference", create_inference_service)
+    pending = service.generate("long answer")
+    task = asyncio.ensure_future(pending)
+    await asyncio.to_thread(started.wait, 2)
+
+    # The generation holds the model lock; every lookup on the loop must still return at once.
+    worst = 0.0
+    for _ in range(10):
+        before = time.perf_counter()
+        assert handle.shared("inference", create_inference_service) is service
+        worst = max(worst, time.perf_counter() - before)
+        await asyncio.sleep(0.01)
+    assert worst < 0.05
+    assert await task == "long answer"
+    registry.unload_all()
@@ -0,0 +1,107 @@
+import threading
+import pytest
+from common.model_registry import ModelRegistry
+
+class FakeModel:
+    def __init__(self, name, **params):
+        self.name = name
+        self.params = params
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def counting_loader(counter):
+    def loader(name, **params):
+        counter.append(name)
+        return FakeModel(name, **params)
+    return loader
+
+def test_same_model_is_loaded_once():
+    registry = ModelRegistry()
+    loads = []
+    first = registry.acquire("mistral", loader=counting_loader(loads))
+    second = registry.acquire("mistral", loader=counting_loader(loads))
+    assert first.model is second.model
+    assert loads == ["mistral"]
+    assert registry.loaded() == {("mistral", ()): 2}
+
+def test_different_params_get_separate_models():
+    registry = ModelRegistry()
+    loads = []
+    cpu = registry.acquire("mistral", loader=counting_loader(loads), device="cpu")
+    gpu = registry.acquire("mistral", loader=counting_loader(loads), device="gpu")
+    assert cpu.model is not gpu.model
+    assert len(loads) == 2
+
+def test_model_unloaded_after_last_release():
+    registry = ModelRegistry()
+    first = registry.acquire("mistral", loader=FakeModel)
+    second = registry.acquire("mistral", loader=FakeModel)
+    model = first.model
+    first.release()
+    assert not model.closed
+    second.release()
+    assert model.closed
+    assert not registry.is_loaded("mistral")
+
+def test_explicit_unload_invalidates_handles():
+    registry = ModelRegistry()
+    handle = registry.acquire("mistral", loader=FakeModel)
+    assert registry.unload("mistral")
+    with pytest.raises(RuntimeError):
+        handle.model
+    handle.release()
+    assert registry.loaded() == {}
+
+def test_released_handle_cannot_reach_the_model():
+    registry = ModelRegistry()
+    first = registry.acquire("mistral", loader=counting_loader([]))
+    second = registry.acquire("mistral", loader=counting_loader([]))
+    first.release()
+    with pytest.raises(RuntimeError):
+        first.model
+    assert second.model.name == "mistral"
+
+def test_shared_objects_outlive_the_handle_that_created_them():
+    registry = ModelRegistry()
+    first = registry.acquire("mistral", loader=counting_loader([]))
+    second = registry.acquire("mistral", loader=counting_loader([]))
+    service = first.shared("inference", lambda handle: handle)
+    assert second.shared("inference", lambda handle: None) is service
+    first.release()
+    assert service.model is second.model
+
+    second.release()
+    with pytest.raises(RuntimeError):
+        service.model
+
+def test_concurrent_acquire_loads_once():
+    registry = ModelRegistry()
+    loads = []
+    start = threading.Barrier(8)
+    handles = []
+
+    def worker():
+        start.wait()
+        handles.append(registry.acquire("mistral", loader=counting_loader(loads)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["mistral"]
+    assert len({id(h.model) for h in handles}) == 1
+
+def test_failed_load_does_not_leak_entry():
+    registry = ModelRegistry()
+
+    def broken_loader(name, **params):
+        raise OSError("model file missing")
+
+    with pytest.raises(OSError):
+        registry.acquire("mistral", loader=broken_loader)
+    assert registry.loaded() == {}
+    assert registry.acquire("mistral", loader=FakeModel).model.name == "mistral"
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from multi_agent_orchestrator.types import ConversationMessage, ParticipantRole, TimestampedMessage
+
+from common.sqlite_chat_storage import SqliteChatStorage
+
+def user(text):
+    return ConversationMessage(role=ParticipantRole.USER.value, content=[{"text": text}])
+
+def assistant(text):
+    return ConversationMessage(role=ParticipantRole.ASSISTANT.value, content=[{"text": text}])
+
+def texts(messages):
+    return [message.content[0]["text"] for message in messages]
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "chat.db")
+
+@pytest.mark.asyncio
+async def test_history_survives_a_restart(path):
+    storage = SqliteChatStorage(path)
+    await storage.save_chat_message("jim", "s1", "schrutebot", user("add task buy beets"))
+    await storage.save_chat_message("jim", "s1", "schrutebot", assistant("Task added"))
+    storage.close()
+
+    reopened = SqliteChatStorage(path)
+    assert texts(await reopened.fetch_chat("jim", "s1", "schrutebot")) == ["add task buy beets", "Task added"]
+    assert await reopened.fetch_chat("jim", "s2", "schrutebot") == []
+    reopened.close()
+
+@pytest.mark.asyncio
+async def test_only_the_last_pairs_are_read(path):
+    storage = SqliteChatStorage(path, max_pairs=2)
+    for turn in range(5):
+        await storage.save_chat_messages("pam", "s", "a", [user(f"q{turn}"), assistant(f"a{turn}")])
+    assert texts(await storage.fetch_chat("pam", "s", "a")) == ["q3", "a3", "q4", "a4"]
+    assert texts(await storage.fetch_chat("pam", "s", "a", max_history_size=3)) == ["q4", "a4"]
+
+    storage.sessions.clear()  # cold read goes to the database
+    assert texts(await storage.fetch_chat("pam", "s", "a")) == ["q3", "a3", "q4", "a4"]
+    plan = " ".join(row[3] for row in storage.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT role FROM messages WHERE user_id = ? AND session_id = ? AND agent_id = ? "
+        "ORDER BY id DESC LIMIT 4", ("pam", "s", "a")))
+    assert "idx_messages_conversation" in plan and "TEMP B-TREE" not in plan
+    storage.close()
+
+@pytest.mark.asyncio
+async def test_consecutive_messages_from_the_same_role_are_not_saved(path):
+    storage = SqliteChatStorage(path)
+    await storage.save_chat_message("u", "s", "a", user("hello"))
+    await storage.save_chat_message("u", "s", "a", user("hello again"))
+    assert texts(await storage.fetch_chat("u", "s", "a")) == ["hello"]
+    storage.close()
+
+@pytest.mark.asyncio
+async def test_session_history_spans_agents_and_names_them(path):
+    storage = SqliteChatStorage(path)
+    await storage.save_chat_messages("u", "s", "SchruteBot", [user("view tasks"), assistant("No tasks")])
+    await storage.save_chat_messages("u", "s", "OscarAgent", [user("research beets"), assistant("Beets are roots")])
+    assert texts(await storage.fetch_all_chats("u", "s")) == [
+        "view tasks", "[SchruteBot] No tasks", "research beets", "[OscarAgent] Beets are roots",
+    ]
+    storage.close()
+
+@pytest.mark.asyncio
+async def test_idle_sessions_leave_memory(path):
+    storage = SqliteChatStorage(path, cache_size=2)
+    for session in ("s1", "s2", "s3"):
+        await storage.save_chat_message("u", session, "a", user(session))
+    assert len(storage.sessions) == 2
+    assert texts(await storage.fetch_chat("u", "s1", "a")) == ["s1"]
+    storage.close()
+
+@pytest.mark.asyncio
+async def test_background_compaction_trims_and_expires(path):
+    now = [time.time()]
+    storage = SqliteChatStorage(path, max_pairs=1, compact_every=1000, retention=3600, clock=lambda: now[0])
+    old = [TimestampedMessage(role="user", content=[{"text": "old"}], timestamp=int((now[0] - 7200) * 1000)),
+           TimestampedMessage(role="assistant", content=[{"text": "reply"}], timestamp=int((now[0] - 7200) * 1000))]
+    await storage.save_chat_messages("u", "stale", "a", old)
+    for turn in range(3):
+        await storage.save_chat_messages("u", "live", "a", [user(f"q{turn}"), assistant(f"a{turn}")])
+
+    storage.compact_every = 1
+    await storage.save_chat_message("u", "live", "a", user("one more"))
+    await asyncio.wrap_future(storage._submit(lambda: None))  # wait for the queued compaction
+    assert storage.compactions == 1
+    rows = storage.conn.execute("SELECT session_id, COUNT(*) FROM messages GROUP BY session_id").fetchall()
+    assert rows == [("live", 2)]
+    storage.close()
@@ -0,0 +1,54 @@
+import asyncio
+import time
+import pytest
+
+from common.inference_service import InferenceService
+from common.streaming import StreamingResponse
+
+async def words(*items, delay=0.0):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+@pytest.mark.asyncio
+async def test_chunks_arrive_with_prefix_and_suffix():
+    response = StreamingResponse(words("def ", "add", "()"), prefix="```python", suffix="```")
+    chunks = [chunk async for chunk in response]
+    assert chunks == ["```python", "def ", "add", "()", "```"]
+    assert await response.text() == "```pythondef add()```"
+    assert response.time_to_first_token is not None
+
+@pytest.mark.asyncio
+async def test_text_collects_an_unread_stream():
+    response = StreamingResponse(words("a", "b"))
+    assert await response.text() == "ab"
+    assert [chunk async for chunk in response] == ["ab"]
+
+@pytest.mark.asyncio
+async def test_inference_service_streams_before_generation_finishes():
+    def stream_fn(prompt, **kwargs):
+        for token in ["one ", "two ", "three"]:
+            time.sleep(0.05)
+            yield token
+
+    service = InferenceService(lambda prompt, **kw: "", stream_fn=stream_fn)
+    response = StreamingResponse(service.stream("count"))
+    started = time.perf_counter()
+    first = await response.__aiter__().__anext__()
+    first_at = time.perf_counter() - started
+    assert await response.text() == "one two three"
+    service.close()
+
+    assert first == "one "
+    assert first_at < 0.12  # well before all three tokens (0.15s) were generated
+
+@pytest.mark.asyncio
+async def test_stream_errors_reach_the_consumer():
+    def stream_fn(prompt, **kwargs):
+        yield "partial"
+        raise RuntimeError("backend died")
+
+    service = InferenceService(lambda prompt, **kw: "", stream_fn=stream_fn)
+    with pytest.raises(RuntimeError):
+        await StreamingResponse(service.stream("x")).text()
+    service.close()
@@ -0,0 +1,22 @@
+from common.tokens import CHARS_PER_TOKEN, chunk_text, estimate_tokens
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * CHARS_PER_TOKEN * 10) == 10
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("  Bears. Beets. Battlestar Galactica.  ", 100) == ["Bears. Beets. Battlestar Galactica."]
+
+def test_chunks_respect_budget_and_paragraphs():
+    paragraphs = [f"Paragraph {i} " + "word " * 30 for i in range(10)]
+    chunks = chunk_text("\n\n".join(paragraphs), 100)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    # Paragraphs are never split when they fit on their own.
+    assert all(chunk.startswith("Paragraph") for chunk in chunks)
+    assert sum(chunk.count("Paragraph") for chunk in chunks) == 10
+
+def test_long_sentences_are_cut_hard():
+    chunks = chunk_text("x" * 1000, 50)
+    assert "".join(chunks) == "x" * 1000
+    assert all(len(chunk) <= 50 * CHARS_PER_TOKEN for chunk in chunks)
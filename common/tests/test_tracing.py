@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from common import tracing
+from common.tracing import Tracer
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_gathered_tasks(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer = Tracer(path)
+
+    async def part(name):
+        with tracer.span("agent.process_request", agent=name):
+            await asyncio.sleep(0.01)
+
+    with tracer.span("route_requests") as root:
+        root.attributes["parts"] = 2
+        await asyncio.gather(part("SchruteBot"), part("DarrylAgent"))
+    tracer.close()
+
+    spans = read_spans(path)
+    assert [span["name"] for span in spans[-1:]] == ["route_requests"]
+    children = spans[:2]
+    assert {span["agent"] for span in children} == {"SchruteBot", "DarrylAgent"}
+    assert all(span["parent"] == spans[2]["span"] and span["trace"] == spans[2]["trace"] for span in children)
+    assert spans[2]["parent"] is None and spans[2]["parts"] == 2
+    assert spans[2]["duration_ms"] >= 10 and spans[2]["status"] == "ok"
+
+def test_failures_are_recorded_and_reraised(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer = Tracer(path)
+    with pytest.raises(RuntimeError):
+        with tracer.span("db.read", op="view_tasks"):
+            raise RuntimeError("database is locked")
+    tracer.close()
+
+    [span] = read_spans(path)
+    assert span["status"] == "error" and span["error"] == "RuntimeError: database is locked"
+    assert span["op"] == "view_tasks"
+    assert tracing.current_span() is None
+
+@pytest.mark.asyncio
+async def test_cancelled_spans_are_not_errors(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer = Tracer(path)
+
+    async def straggler():
+        with tracer.span("crawl.page", url="https://example.com/slow"):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(straggler())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    tracer.close()
+
+    [span] = read_spans(path)
+    assert span["status"] == "cancelled" and "error" not in span
+    assert set(tracer.histograms) == {("crawl.page", "cancelled")}
+
+def test_trace_file_is_written_by_a_background_thread(tmp_path):
+    first, second = tmp_path / "first.jsonl", tmp_path / "second.jsonl"
+    tracer = Tracer(str(first))
+    for i in range(100):
+        with tracer.span("db.read", i=i):
+            pass
+    writer = tracer._writer
+    assert writer is not None and writer is not threading.current_thread() and writer.is_alive()
+
+    # Moving the trace writes out everything queued for the old file first.
+    tracer._stop_writer()
+    tracer.path = str(second)
+    with tracer.span("db.write"):
+        pass
+    tracer.close()
+    assert [span["i"] for span in read_spans(first)] == list(range(100))
+    assert [span["name"] for span in read_spans(second)] == ["db.write"]
+    assert not writer.is_alive()
+
+def test_prometheus_histograms_are_cumulative(tmp_path):
+    tracer = Tracer(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        span = tracing.Span("classify", "t", "s", None, duration=seconds)
+        tracer.finish(span)
+
+    text = tracer.prometheus_text()
+    assert '# TYPE dunder_span_duration_seconds histogram' in text
+    assert 'dunder_span_duration_seconds_bucket{span="classify",status="ok",le="0.1"} 1' in text
+    assert 'dunder_span_duration_seconds_bucket{span="classify",status="ok",le="1.0"} 2' in text
+    assert 'dunder_span_duration_seconds_bucket{span="classify",status="ok",le="+Inf"} 3' in text
+    assert 'dunder_span_duration_seconds_count{span="classify",status="ok"} 3' in text
+    assert 'dunder_span_duration_seconds_sum{span="classify",status="ok"} 5.550000' in text
+
+    metrics_file = tmp_path / "dunder.prom"
+    tracer.write_metrics(str(metrics_file))
+    assert metrics_file.read_text() == text
+
+def test_metrics_endpoint_serves_the_histograms():
+    tracer = Tracer()
+    with tracer.span("crawl.page", url="https://example.com"):
+        pass
+    port = tracer.serve_metrics(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert 'span="crawl.page"' in body
+    finally:
+        tracer.close()
+
+@pytest.mark.asyncio
+async def test_task_store_calls_are_traced(tmp_path):
+    from agents.schrute_bot.storage import AsyncTaskStore, select_tasks
+    store = AsyncTaskStore(str(tmp_path / "tasks.db"))
+    before = tracing.tracer().histograms.get(("db.read", "ok"))
+    count = before.count if before else 0
+    try:
+        await store.read(select_tasks)
+    finally:
+        store.close()
+    assert tracing.tracer().histograms[("db.read", "ok")].count == count + 1
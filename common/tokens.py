@@ -0,0 +1,59 @@
+import math
+import re
+from typing import List
+
+# Rough average for English text with the gemma/mistral tokenizers; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used to size prompts without loading a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_long(piece: str, max_chars: int) -> List[str]:
+    """Splits text longer than max_chars on sentence boundaries, cutting hard only when a sentence is too long."""
+    parts = []
+    for sentence in _SENTENCE_END.split(piece):
+        while len(sentence) > max_chars:
+            parts.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence:
+            parts.append(sentence)
+    return parts
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits text into chunks of at most ``max_tokens`` (estimated), preferring paragraph
+    boundaries, then sentence boundaries.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(_split_long(paragraph, max_chars))
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
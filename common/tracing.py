@@ -0,0 +1,252 @@
+import asyncio
+import bisect
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = os.getenv("DUNDER_TRACE_FILE", "")  # JSONL trace of every span; off unless set
+METRICS_PORT = int(os.getenv("DUNDER_METRICS_PORT", "0"))  # 0 leaves the /metrics endpoint off
+METRIC_NAME = "dunder_span_duration_seconds"
+# Upper bounds in seconds: from a cached SQLite read up to a long crawl or generation.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    started_at: float = 0.0  # wall clock, for the trace file
+    duration: float = 0.0  # seconds
+    error: Optional[str] = None
+    cancelled: bool = False
+
+    @property
+    def status(self) -> str:
+        return "cancelled" if self.cancelled else "error" if self.error else "ok"
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": round(self.started_at, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            **({"error": self.error} if self.error else {}),
+            **self.attributes,
+        }
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram of durations."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            rows.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return rows
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("dunder_span", default=None)
+
+
+class Tracer:
+    """
+    Times the stages of a request.
+
+    ``span`` nests through a context variable, so spans opened inside asyncio tasks and
+    gathered sub-requests still point at the span that started them. Every finished span
+    goes into a per-name histogram and, with a ``path``, one JSON line in the trace file,
+    written by a background thread so no span waits on the disk. The histograms are rendered in the Prometheus text format by ``prometheus_text``.
+    """
+
+    def __init__(self, path: Optional[str] = None, buckets=DURATION_BUCKETS):
+        self.path = path or None
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+        self._records: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Times the block; attributes added to the yielded span are written with it."""
+        parent = _current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(8),
+            span_id=secrets.token_hex(4),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+            started_at=time.time(),
+        )
+        token = _current.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except GeneratorExit:
+            raise  # a stream closed early by its reader is not a failure
+        except asyncio.CancelledError:
+            # Cancelled on purpose, e.g. a straggler crawl; kept out of the error histogram.
+            span.cancelled = True
+            raise
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            try:
+                _current.reset(token)
+            except ValueError:
+                pass  # closed from another context, e.g. a stream finished by a different task
+            self.finish(span)
+
+    def finish(self, span: Span):
+        status = span.status
+        record = span.record() if self.path else None
+        with self._lock:
+            histogram = self.histograms.get((span.name, status))
+            if histogram is None:
+                histogram = self.histograms[(span.name, status)] = Histogram(self.buckets)
+            histogram.observe(span.duration)
+            if record is not None and self.path:
+                if self._writer is None:
+                    # Each writer drains its own queue, so a reconfigured path never gets stale spans.
+                    self._records = queue.SimpleQueue()
+                    self._writer = threading.Thread(target=self._write_records, args=(self.path, self._records),
+                                                    name="trace-writer", daemon=True)
+                    self._writer.start()
+                self._records.put(record)
+
+    def _write_records(self, path: str, records: "queue.SimpleQueue[Optional[Dict[str, Any]]]"):
+        """Runs on the writer thread, appending records to ``path`` until it takes None."""
+        try:
+            with open(path, "a", encoding="utf-8") as file:
+                while True:
+                    record = records.get()
+                    if record is None:
+                        return
+                    file.write(json.dumps(record, default=str) + "\n")
+                    if records.empty():
+                        file.flush()
+        except OSError as e:
+            logger.warning(f"Trace file {path} disabled: {e}")
+            self.path = None
+
+    def _stop_writer(self):
+        """Writes out every queued span and stops the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._records.put(None)
+        if writer is not None:
+            writer.join()
+
+    def prometheus_text(self) -> str:
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each traced stage of a request.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for (name, status), histogram in sorted(self.histograms.items()):
+                labels = f'span="{name}",status="{status}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: str):
+        """Writes ``prometheus_text`` to ``path`` atomically, e.g. for node_exporter's textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(file.name, path)
+
+    def serve_metrics(self, port: int, host: str = "127.0.0.1") -> int:
+        """Serves ``prometheus_text`` at http://host:port/metrics from a daemon thread; returns the port."""
+        if self._server is not None:
+            return self._server.server_address[1]
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        self._stop_writer()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_tracer = Tracer()  # Aggregates only, until configure() gives it a trace file
+
+
+def tracer() -> Tracer:
+    return _tracer
+
+
+def configure(path: Optional[str] = TRACE_FILE, metrics_port: int = METRICS_PORT) -> Tracer:
+    """Points the process-wide tracer at a trace file and, with a port, starts the /metrics endpoint."""
+    _tracer._stop_writer()
+    with _tracer._lock:
+        _tracer.path = path or None
+    if metrics_port:
+        _tracer.serve_metrics(metrics_port)
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """A span on the process-wide tracer: ``with span("db.read", op="view_tasks"): ...``"""
+    return _tracer.span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
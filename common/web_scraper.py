@@ -1,31 +1,40 @@
 import os
 from dotenv import load_dotenv
 from tavily import TavilyClient
+from common.disk_cache import Fetched, PAGE_CACHE_TTL, SEARCH_CACHE_TTL, normalize_query, web_cache
 
 # Load environment variables from .env file
 load_dotenv()
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, cache=None):
         api_key = os.getenv("TAVILY_API_KEY")
         if not api_key:
             raise ValueError("TAVILY_API_KEY is not set. Please set it in a .env file.")
         self.client = TavilyClient(api_key=api_key)
+        self.cache = cache or web_cache()
 
     def search(self, query, max_results=5):
-        """Performs a search using Tavily's API."""
-        try:
+        """Performs a search using Tavily's API. Results are cached on disk per normalised query."""
+        def fetch(stale):
             response = self.client.search(query, max_results=max_results)
-            return response.get('results', [])
+            return Fetched(response.get('results', []))
+
+        try:
+            key = f"{max_results}:{normalize_query(query)}"
+            return self.cache.get_or_fetch("tavily-search", key, fetch, ttl=SEARCH_CACHE_TTL)
         except Exception as e:
             print(f"⚠️ Error during Tavily search: {e}")
             return []
 
     def extract(self, url):
-        """Extracts content from a given URL using Tavily's API."""
-        try:
+        """Extracts content from a given URL using Tavily's API. Results are cached on disk per URL."""
+        def fetch(stale):
             response = self.client.extract(urls=[url])
-            return response.get('results', [])
+            return Fetched(response.get('results', []))
+
+        try:
+            return self.cache.get_or_fetch("tavily-extract", url, fetch, ttl=PAGE_CACHE_TTL)
         except Exception as e:
             print(f"⚠️ Error during Tavily extract: {e}")
             return []
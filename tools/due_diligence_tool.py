@@ -1,64 +1,213 @@
 import asyncio
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
-from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
-from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
-import ollama
-from duckduckgo_search import DDGS
+from contextlib import AsyncExitStack, asynccontextmanager
 from itertools import islice
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from common.disk_cache import (
+    DiskCache, Fetched, PAGE_CACHE_TTL, SEARCH_CACHE_TTL, is_not_modified, normalize_query, web_cache
+)
+from common.streaming import StreamingResponse
+from common.tracing import span
+from tools.summarizer import MapReduceSummarizer
+
+# crawl4ai, ollama and duckduckgo_search are imported where they are used, so
+# loading the tool (and Oscar) does not pull in a browser stack up front.
+
+CRAWL_CONCURRENCY = 4  # Pages fetched at once per query
+CRAWL_TIMEOUT = 20.0  # Seconds before a single page fetch is abandoned
+CRAWL_SPARE_RESULTS = 2  # Extra search hits crawled so slow or broken pages can be skipped
+
+SearchHit = Tuple[str, str]
+CrawledPage = Tuple[str, str, str]
+
+
+async def crawl_in_rank_order(
+    hits: List[SearchHit],
+    fetch: Callable[[str], Awaitable[str]],
+    enough: Optional[int] = None,
+    concurrency: int = CRAWL_CONCURRENCY,
+    timeout: float = CRAWL_TIMEOUT
+) -> List[CrawledPage]:
+    """
+    Fetches every (title, url) hit concurrently, at most ``concurrency`` at a time and
+    ``timeout`` seconds each. Once ``enough`` pages have content the stragglers are
+    cancelled. Returns (title, url, content) for the pages that succeeded, in the
+    order the hits were ranked.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def crawl(title: str, url: str) -> Optional[CrawledPage]:
+        async with semaphore:
+            try:
+                with span("crawl.page", url=url):
+                    content = await asyncio.wait_for(fetch(url), timeout)
+            except asyncio.TimeoutError:
+                print(f"Timed out fetching {url} after {timeout}s")
+                return None
+            except Exception as e:
+                print(f"Error fetching content from {url}: {e}")
+                return None
+        content = (content or "").strip()
+        return (title, url, content) if content else None
+
+    tasks = {asyncio.create_task(crawl(title, url)): rank for rank, (title, url) in enumerate(hits)}
+    pages = {}
+    pending = set(tasks)
+    try:
+        while pending and (enough is None or len(pages) < enough):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = task.result()
+                if page is not None:
+                    pages[tasks[task]] = page
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    ranked = [pages[rank] for rank in sorted(pages)]
+    return ranked[:enough] if enough is not None else ranked
+
 
 class DueDiligenceTool:
-    def __init__(self):
+    def __init__(self, crawl_concurrency: int = CRAWL_CONCURRENCY, crawl_timeout: float = CRAWL_TIMEOUT,
+                 cache: Optional[DiskCache] = None):
         self.summarization_model = "gemma3:1b"
+        self.crawl_concurrency = crawl_concurrency
+        self.crawl_timeout = crawl_timeout
+        # Search results and page content persist across runs; see common/disk_cache.py.
+        self.cache = cache or web_cache()
 
-    async def _generate_response_async(self, prompt: str) -> str:
-        try:
-            response = await asyncio.to_thread(
-                ollama.chat,
-                model=self.summarization_model,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response['message']['content']
-        except Exception as e:
-            print(f"Error generating Ollama response: {e}")
-            return f"Error generating summary: {e}"
+    def _stream_response_async(self, prompt: str, max_tokens: Optional[int] = None) -> StreamingResponse:
+        async def chunks():
+            try:
+                import ollama
+                with span("ollama.generate", model=self.summarization_model):
+                    stream = await ollama.AsyncClient().chat(
+                        model=self.summarization_model,
+                        messages=[{"role": "user", "content": prompt}],
+                        options={"num_predict": max_tokens} if max_tokens else None,
+                        stream=True
+                    )
+                    async for part in stream:
+                        yield part['message']['content']
+            except Exception as e:
+                print(f"Error generating Ollama response: {e}")
+                yield f"Error generating summary: {e}"
+
+        return StreamingResponse(chunks())
+
+    async def _generate_response_async(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        return await self._stream_response_async(prompt, max_tokens).text()
+
+    def summarizer(self) -> MapReduceSummarizer:
+        """A fresh map-reduce summariser over the Ollama model (its semaphore is bound to the running loop)."""
+        return MapReduceSummarizer(self._generate_response_async, self._stream_response_async)
+
+    async def _search(self, query: str, max_results: int) -> List[SearchHit]:
+        """Returns the top (title, url) DuckDuckGo hits; the blocking client runs off the event loop."""
+        def run():
+            from duckduckgo_search import DDGS
+            with DDGS() as ddgs:
+                ddgs_text_gen = ddgs.text(query, region='wt-wt', safesearch='Moderate')
+                return [
+                    (result.get('title', 'Untitled'), result.get('href', '#'))
+                    for result in islice(ddgs_text_gen, max_results)
+                ]
+        return await asyncio.to_thread(run)
+
+    async def _cached_search(self, query: str, max_results: int) -> List[SearchHit]:
+        async def fetch(stale):
+            # No hits is usually a rate limit or a hiccup, so it is not cached for hours.
+            return Fetched(await self._search(query, max_results) or None)
+
+        key = f"{max_results}:{normalize_query(query)}"
+        hits = await self.cache.aget_or_fetch("search", key, fetch, ttl=SEARCH_CACHE_TTL)
+        return [tuple(hit) for hit in hits or []]
 
-    async def get_crawled_results(self, query: str, max_results: int = 5):
+    @asynccontextmanager
+    async def _page_fetcher(self):
         """
-        Performs a DuckDuckGo search and uses Crawl4AI to extract content from each result.
-        Returns a list of (title, url, content).
+        Yields an async ``fetch(url) -> (content, headers)``. The Crawl4AI browser is only
+        launched on the first fetch, so fully cached queries never start it, and is shared
+        by every fetch after that.
         """
-        results = []
-        fetch_config = CrawlerRunConfig(
-            deep_crawl_strategy=BFSDeepCrawlStrategy(
-                max_depth=0,
-                max_pages=1,
-                include_external=False
-            ),
-            scraping_strategy=LXMLWebScrapingStrategy(),
-            verbose=False
-        )
+        async with AsyncExitStack() as stack:
+            crawler = None
+            fetch_config = None
+            launch_lock = asyncio.Lock()
 
+            async def open_crawler():
+                nonlocal crawler, fetch_config
+                async with launch_lock:
+                    if crawler is None:
+                        from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+                        from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
+                        from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
+                        fetch_config = CrawlerRunConfig(
+                            deep_crawl_strategy=BFSDeepCrawlStrategy(
+                                max_depth=0,
+                                max_pages=1,
+                                include_external=False
+                            ),
+                            scraping_strategy=LXMLWebScrapingStrategy(),
+                            verbose=False
+                        )
+                        crawler = await stack.enter_async_context(AsyncWebCrawler())
+                return crawler
+
+            async def fetch(url: str) -> Tuple[str, Dict[str, str]]:
+                crawler = await open_crawler()
+                crawl_results = await crawler.arun(url, config=fetch_config)
+                page = crawl_results[0] if crawl_results else None
+                content = getattr(page, 'markdown', None) or getattr(page, 'html', None) or ""
+                return str(content), getattr(page, 'response_headers', None) or {}
+            yield fetch
+
+    def _cached_page_fetch(self, fetch_page: Callable[[str], Awaitable[Tuple[str, Dict[str, str]]]]):
+        """Wraps a page fetcher with the disk cache; stale pages are revalidated with their ETag/Last-Modified."""
+        async def fetch(url: str) -> str:
+            async def refetch(stale):
+                if stale is not None and (stale.etag or stale.last_modified):
+                    if await asyncio.to_thread(is_not_modified, url, stale.etag, stale.last_modified):
+                        return Fetched(not_modified=True)
+                content, headers = await fetch_page(url)
+                headers = {name.lower(): value for name, value in headers.items()}
+                return Fetched(
+                    content.strip() or None,
+                    etag=headers.get('etag'),
+                    last_modified=headers.get('last-modified')
+                )
+            return await self.cache.aget_or_fetch("page", url, refetch, ttl=PAGE_CACHE_TTL)
+        return fetch
+
+    async def get_crawled_results(self, query: str, max_results: int = 5, spare_results: int = CRAWL_SPARE_RESULTS):
+        """
+        Performs a DuckDuckGo search and uses Crawl4AI to extract content from the results.
+        Pages are crawled concurrently; a few spare hits are crawled as well so the first
+        ``max_results`` pages with content can be used without waiting on slow ones.
+        Both the search and the pages are served from the disk cache when possible.
+        Returns a list of (title, url, content) in ranking order.
+        """
         try:
-            with DDGS() as ddgs:
-                ddgs_text_gen = ddgs.text(query, region='wt-wt', safesearch='Moderate')
-                async with AsyncWebCrawler() as crawler:
-                    for result in islice(ddgs_text_gen, max_results):
-                        title = result.get('title', 'Untitled')
-                        url = result.get('href', '#')
-
-                        try:
-                            crawl_results = await crawler.arun(url, config=fetch_config)
-                            page = crawl_results[0] if crawl_results else None
-                            content = getattr(page, 'markdown', None) or getattr(page, 'html', None) or "[No content]"
-                        except Exception as e:
-                            print(f"Error fetching content from {url}: {e}")
-                            content = "[Error fetching content]"
-
-                        results.append((title, url, content.strip()[:1500]))
+            with span("crawl.search", results=max_results):
+                hits = await self._cached_search(query, max_results + spare_results)
+            if not hits:
+                return []
+            async with self._page_fetcher() as fetch_page:
+                pages = await crawl_in_rank_order(
+                    hits,
+                    self._cached_page_fetch(fetch_page),
+                    enough=max_results,
+                    concurrency=self.crawl_concurrency,
+                    timeout=self.crawl_timeout
+                )
         except Exception as e:
             print(f"Search failed: {e}")
+            return []
 
-        return results
+        return pages
 
     async def search(self, query: str, max_results: int = 5) -> str:
         entries = await self.get_crawled_results(query, max_results)
@@ -71,16 +220,13 @@ class DueDiligenceTool:
 
         return "\n".join(output_lines)
 
-    async def summarize_search_results(self, query: str, max_urls_to_summarize: int = 3) -> str:
+    async def summarize_search_results(self, query: str, max_urls_to_summarize: int = 3, stream: bool = False):
         entries = await self.get_crawled_results(query, max_urls_to_summarize)
         if not entries:
             return "No usable content found to generate a summary."
 
-        sources_block = "\n\n".join([
-            f"### {title}\nURL: {url}\n\n{content}" for title, url, content in entries
-        ])
-
-        prompt = f"""You are Oscar Martinez from The Office. Using the following sources, write a clear, professional research summary in Markdown. Include:
+        def build_prompt(sources_block: str) -> str:
+            return f"""You are Oscar Martinez from The Office. Using the following sources, write a clear, professional research summary in Markdown. Include:
 
             - An executive summary
             - Bullet-point insights
@@ -93,10 +239,15 @@ class DueDiligenceTool:
             ### Markdown Summary:
         """
 
-        return await self._generate_response_async(prompt)
+        # Pages are no longer truncated; the summariser reads them in chunks up to its token budget.
+        return await self.summarizer().summarize(entries, build_prompt, focus=query, stream=stream)
 
-    async def deep_crawl_url(self, url: str, max_depth: int = 1, max_pages: int = 5) -> str:
+    async def deep_crawl_url(self, url: str, max_depth: int = 1, max_pages: int = 5, stream: bool = False):
         print(f"Starting deep crawl for URL: {url} with max_depth={max_depth}, max_pages={max_pages}")
+        from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+        from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
+        from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
         crawled_content = []
         config = CrawlerRunConfig(
             deep_crawl_strategy=BFSDeepCrawlStrategy(
@@ -109,19 +260,19 @@ class DueDiligenceTool:
         )
 
         try:
-            async with AsyncWebCrawler() as crawler:
-                results = await crawler.arun(url, config=config)
+            with span("crawl.deep", url=url, max_depth=max_depth, max_pages=max_pages):
+                async with AsyncWebCrawler() as crawler:
+                    results = await crawler.arun(url, config=config)
 
             print(f"Deep crawl finished. Found {len(results)} pages.")
             if not results:
                 return f"Deep crawl initiated for {url}, but no pages were successfully crawled or yielded content."
 
             for i, result in enumerate(results):
-                content = getattr(result, 'markdown', None) or getattr(result, 'html', None) or ""
-                if content and content.strip():
-                    crawled_content.append(f"**Crawled URL ({i+1}):** {result.url}\n**Depth:** {result.metadata.get('depth', 'N/A')}\n**Content Snippet:**\n{content[:1000]}...\n---")
-                else:
-                    crawled_content.append(f"**Crawled URL ({i+1}):** {result.url}\n**Depth:** {result.metadata.get('depth', 'N/A')}\n**Content:** [No substantial content extracted]\n---")
+                content = str(getattr(result, 'markdown', None) or getattr(result, 'html', None) or "")
+                if content.strip():
+                    depth = (result.metadata or {}).get('depth', 'N/A')
+                    crawled_content.append((f"Crawled URL {i+1} (depth {depth})", result.url, content.strip()))
 
         except Exception as e:
             print(f"Error during deep crawl of {url}: {e}")
@@ -132,13 +283,14 @@ class DueDiligenceTool:
         if not crawled_content:
             return f"Deep crawl completed for {url}, but no usable content was extracted."
 
-        full_crawled_text = "\n\n".join(crawled_content)
-        prompt = f"""
+        def build_prompt(sources_block: str) -> str:
+            return f"""
             You are Oscar Martinez from The Office. Provide a professional and concise Markdown summary based *only* on the following findings from a deep crawl of the website starting at {url}. Focus on the key information extracted.
 
-            **Collected Content Snippets:**
-            {full_crawled_text}
+            **Collected Content:**
+            {sources_block}
 
             **Markdown Summary of Deep Crawl Findings:**
             """
-        return await self._generate_response_async(prompt)
+
+        return await self.summarizer().summarize(crawled_content, build_prompt, stream=stream)
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+from common.streaming import StreamingResponse
+from common.tokens import chunk_text, estimate_tokens
+
+CHUNK_TOKENS = 1200  # Page text per map call
+NOTE_TOKENS = 200  # Length asked of each partial summary
+MERGE_INPUT_TOKENS = 2400  # Notes merged per reduce call, and the most the final prompt receives
+TOKEN_BUDGET = 12000  # Page tokens read per summary before the rest is skipped
+SUMMARY_CONCURRENCY = 3  # Model calls in flight at once
+
+Document = Tuple[str, str, str]  # (title, url, content)
+
+
+class MapReduceSummarizer:
+    """
+    Summarises documents too large for one prompt.
+
+    Pages are split into token-sized chunks which are summarised concurrently (map),
+    the partial notes are merged in groups until they fit one prompt (reduce), and
+    the final prompt is built from the merged notes. Chunks are taken round-robin
+    across documents, so when ``token_budget`` runs out every source has still been
+    read from the top.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[..., Awaitable[str]],
+        stream: Optional[Callable[..., StreamingResponse]] = None,
+        chunk_tokens: int = CHUNK_TOKENS,
+        note_tokens: int = NOTE_TOKENS,
+        merge_input_tokens: int = MERGE_INPUT_TOKENS,
+        token_budget: int = TOKEN_BUDGET,
+        concurrency: int = SUMMARY_CONCURRENCY
+    ):
+        self.generate = generate
+        self.stream = stream
+        self.chunk_tokens = chunk_tokens
+        self.note_tokens = note_tokens
+        self.merge_input_tokens = merge_input_tokens
+        self.token_budget = token_budget
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.last_run = {}
+
+    async def _call(self, prompt: str) -> str:
+        async with self.semaphore:
+            return (await self.generate(prompt, max_tokens=self.note_tokens * 2)).strip()
+
+    def plan_chunks(self, documents: List[Document]) -> List[Tuple[int, str]]:
+        """Returns (document index, chunk) pairs in reading order, cut off at the token budget."""
+        chunked = [chunk_text(content, self.chunk_tokens) for _, _, content in documents]
+        self.last_run = {
+            "documents": len(documents),
+            "chunks_total": sum(len(chunks) for chunks in chunked),
+        }
+        planned = []
+        spent = 0
+        depth = 0
+        while any(depth < len(chunks) for chunks in chunked):
+            for index, chunks in enumerate(chunked):
+                if depth >= len(chunks):
+                    continue
+                cost = estimate_tokens(chunks[depth])
+                if planned and spent + cost > self.token_budget:
+                    break
+                planned.append((index, chunks[depth]))
+                spent += cost
+            else:
+                depth += 1
+                continue
+            break
+        self.last_run["chunks_read"] = len(planned)
+        # Stable sort: chunks of one document stay in page order.
+        return sorted(planned, key=lambda item: item[0])
+
+    async def map(self, documents: List[Document], focus: str = "") -> List[str]:
+        """Summarises every planned chunk concurrently; returns one note per document, in order."""
+        planned = self.plan_chunks(documents)
+
+        async def summarise(index: int, chunk: str) -> str:
+            title, url, _ = documents[index]
+            return await self._call(f"""Summarise this excerpt from "{title}" ({url}) in at most {self.note_tokens} words.
+Keep concrete facts, figures and names{f' relevant to: {focus}' if focus else ''}. Reply with the notes only.
+
+### Excerpt:
+{chunk}
+
+### Notes:""")
+
+        notes = await asyncio.gather(*(summarise(index, chunk) for index, chunk in planned))
+        by_document = {}
+        for (index, _), note in zip(planned, notes):
+            by_document.setdefault(index, []).append(note)
+
+        return [
+            f"### {documents[index][0]}\nURL: {documents[index][1]}\n\n" + "\n".join(by_document[index])
+            for index in sorted(by_document)
+        ]
+
+    def _groups(self, notes: List[str]) -> List[List[str]]:
+        groups = [[]]
+        size = 0
+        for note in notes:
+            cost = estimate_tokens(note)
+            if groups[-1] and size + cost > self.merge_input_tokens:
+                groups.append([])
+                size = 0
+            groups[-1].append(note)
+            size += cost
+        return groups
+
+    async def reduce(self, notes: List[str]) -> List[str]:
+        """Merges neighbouring notes until they fit in a single prompt together."""
+        rounds = 0
+        while sum(estimate_tokens(note) for note in notes) > self.merge_input_tokens and len(notes) > 1:
+            groups = self._groups(notes)
+            if len(groups) == len(notes):
+                # Every note fills a prompt on its own; merge pairs so the loop still shrinks.
+                groups = [notes[i:i + 2] for i in range(0, len(notes), 2)]
+            notes = await asyncio.gather(*(self._merge(group) for group in groups))
+            rounds += 1
+        self.last_run["reduce_rounds"] = rounds
+        return list(notes)
+
+    async def _merge(self, group: List[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        joined = "\n\n".join(group)
+        return await self._call(f"""Merge these research notes into one set of notes of at most {self.note_tokens * 2} words.
+Keep each source's title and URL as a "### title" heading followed by "URL:". Drop repetition.
+
+{joined}
+
+### Merged notes:""")
+
+    async def summarize(self, documents: List[Document], build_prompt: Callable[[str], str],
+                        focus: str = "", stream: bool = False):
+        """
+        Summarises ``documents`` and returns the final answer for ``build_prompt(sources_block)``.
+        Small inputs go straight to the final prompt. With ``stream=True`` the final call is
+        returned as a StreamingResponse.
+        """
+        total_tokens = sum(estimate_tokens(content) for _, _, content in documents)
+        if total_tokens <= self.merge_input_tokens:
+            sources = [f"### {title}\nURL: {url}\n\n{content}" for title, url, content in documents]
+            self.last_run = {"documents": len(documents), "chunks_read": len(documents),
+                             "chunks_total": len(documents), "reduce_rounds": 0}
+        else:
+            sources = await self.reduce(await self.map(documents, focus))
+
+        prompt = build_prompt("\n\n".join(sources))
+        if stream and self.stream is not None:
+            return self.stream(prompt)
+        return await self.generate(prompt)
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from common.disk_cache import DiskCache
+from tools.due_diligence_tool import DueDiligenceTool, crawl_in_rank_order
+
+HITS = {}
+
+class DelayedPageHandler(BaseHTTPRequestHandler):
+    """Serves /<delay>/<name> after sleeping <delay> seconds; /fail/<name> returns a 500."""
+
+    def do_GET(self):
+        _, delay, name = self.path.split("/")
+        if delay == "fail":
+            self.send_response(500)
+            self.end_headers()
+            return
+        time.sleep(float(delay))
+        etag = f'"{name}"'
+        HITS[self.path] = HITS.get(self.path, 0) + 1
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"<h1>{name}</h1>".encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), DelayedPageHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+async def http_fetch(url):
+    return (await http_fetch_with_headers(url))[0]
+
+async def http_fetch_with_headers(url):
+    """Minimal non-blocking GET, so cancelled fetches really stop."""
+    host, port = url.split("//")[1].split("/")[0].split(":")
+    path = "/" + url.split("//")[1].split("/", 1)[1]
+    reader, writer = await asyncio.open_connection(host, int(port))
+    try:
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        response = (await reader.read()).decode()
+    finally:
+        writer.close()
+    head, body = response.split("\r\n\r\n", 1)
+    status_line, *header_lines = head.split("\r\n")
+    status = int(status_line.split()[1])
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    return body, headers
+
+def hits(server, *paths):
+    return [(path, f"{server}/{path}") for path in paths]
+
+@pytest.mark.asyncio
+async def test_pages_are_fetched_concurrently_in_rank_order(server):
+    started = time.perf_counter()
+    pages = await crawl_in_rank_order(hits(server, "0.3/a", "0.1/b", "0.2/c"), http_fetch)
+    elapsed = time.perf_counter() - started
+
+    assert [title for title, _, _ in pages] == ["0.3/a", "0.1/b", "0.2/c"]
+    assert pages[1][2] == "<h1>b</h1>"
+    assert elapsed < 0.5
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(server):
+    started = time.perf_counter()
+    pages = await crawl_in_rank_order(hits(server, "0.1/a", "0.1/b", "0.1/c"), http_fetch, concurrency=1)
+    assert len(pages) == 3
+    assert time.perf_counter() - started >= 0.3
+
+@pytest.mark.asyncio
+async def test_slow_and_failing_pages_are_dropped(server):
+    pages = await crawl_in_rank_order(hits(server, "1.0/slow", "fail/x", "0/ok"), http_fetch, timeout=0.2)
+    assert [title for title, _, _ in pages] == ["0/ok"]
+
+@pytest.mark.asyncio
+async def test_stragglers_are_cancelled_once_enough_pages_arrive(server):
+    started = time.perf_counter()
+    pages = await crawl_in_rank_order(
+        hits(server, "0.05/a", "2.0/straggler", "0.1/c", "0/d"), http_fetch, enough=2
+    )
+    assert [title for title, _, _ in pages] == ["0.05/a", "0/d"]
+    assert time.perf_counter() - started < 1.0
+
+def local_tool(server, cache, paths, **kwargs):
+    class LocalTool(DueDiligenceTool):
+        searches = 0
+
+        async def _search(self, query, max_results):
+            LocalTool.searches += 1
+            return hits(server, *paths)[:max_results]
+
+        @asynccontextmanager
+        async def _page_fetcher(self):
+            yield http_fetch_with_headers
+
+    return LocalTool(cache=cache, **kwargs)
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DiskCache(str(tmp_path / "web_cache.db"))
+    yield cache
+    cache.close()
+
+@pytest.mark.asyncio
+async def test_get_crawled_results_uses_spare_hits(cache):
+    slow_started = asyncio.Event()
+    slow_cancelled = asyncio.Event()
+
+    async def fetch(url):
+        name = url.rsplit("/", 1)[1]
+        if name == "slow":
+            slow_started.set()
+            try:
+                await asyncio.Event().wait()  # never answers
+            except asyncio.CancelledError:
+                slow_cancelled.set()
+                raise
+        # The fast pages finish only once the slow one is in flight, so it is always a straggler.
+        await slow_started.wait()
+        return f"<h1>{name}</h1>", {}
+
+    class SpareHitsTool(DueDiligenceTool):
+        async def _search(self, query, max_results):
+            return [(name, f"https://example.com/{name}") for name in ("slow", "a", "b", "c")][:max_results]
+
+        @asynccontextmanager
+        async def _page_fetcher(self):
+            yield fetch
+
+    # The crawl timeout is far away; only cancellation can finish this in time.
+    tool = SpareHitsTool(cache=cache, crawl_timeout=60.0)
+    entries = await asyncio.wait_for(tool.get_crawled_results("anything", max_results=2, spare_results=2), 10)
+    assert [title for title, _, _ in entries] == ["a", "b"]
+    assert slow_cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(server, cache):
+    tool = local_tool(server, cache, ["0/cached-a", "0/cached-b"])
+    first = await tool.get_crawled_results("Cached  Query", max_results=2, spare_results=0)
+    second = await tool.get_crawled_results("cached query", max_results=2, spare_results=0)
+
+    assert first == second
+    assert type(tool).searches == 1
+    assert HITS["/0/cached-a"] == 1
+
+@pytest.mark.asyncio
+async def test_empty_search_results_are_not_cached(server, cache):
+    tool = local_tool(server, cache, [])
+    assert await tool.get_crawled_results("rate limited", max_results=2, spare_results=0) == []
+    assert await tool.get_crawled_results("rate limited", max_results=2, spare_results=0) == []
+    assert type(tool).searches == 2
+
+@pytest.mark.asyncio
+async def test_stale_page_is_revalidated_with_its_etag(server, cache):
+    tool = local_tool(server, cache, ["0/etagged"])
+    await tool.get_crawled_results("etag query", max_results=1, spare_results=0)
+    cache.clock = lambda: time.time() + 10 ** 7  # everything is now stale
+
+    entries = await tool.get_crawled_results("etag query", max_results=1, spare_results=0)
+
+    assert entries[0][2] == "<h1>etagged</h1>"
+    assert cache.revalidated == 1
+    assert HITS["/0/etagged"] == 2  # the original fetch plus one 304
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+
+from common.streaming import StreamingResponse
+from tools.summarizer import MapReduceSummarizer
+
+class FakeModel:
+    """Records prompts and how many calls overlapped; returns a short note per call."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    async def generate(self, prompt, max_tokens=None):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return f"note {len(self.prompts)}"
+
+    def stream(self, prompt, max_tokens=None):
+        self.prompts.append(prompt)
+
+        async def chunks():
+            yield "final "
+            yield "summary"
+        return StreamingResponse(chunks())
+
+def page(words):
+    return "\n\n".join("Sentence about paper sales. " * 5 for _ in range(words // 25))
+
+def build_prompt(sources):
+    return f"FINAL\n{sources}"
+
+@pytest.mark.asyncio
+async def test_small_inputs_skip_map_reduce():
+    model = FakeModel()
+    summarizer = MapReduceSummarizer(model.generate)
+    result = await summarizer.summarize([("Title", "https://a", "short page")], build_prompt)
+
+    assert result == "note 1"
+    assert model.prompts == ["FINAL\n### Title\nURL: https://a\n\nshort page"]
+
+@pytest.mark.asyncio
+async def test_chunks_are_summarised_concurrently_and_merged():
+    model = FakeModel()
+    summarizer = MapReduceSummarizer(model.generate, chunk_tokens=200, merge_input_tokens=400, concurrency=3)
+    documents = [(f"Page {i}", f"https://{i}", page(1000)) for i in range(3)]
+
+    result = await summarizer.summarize(documents, build_prompt)
+
+    map_prompts = [p for p in model.prompts if p.startswith("Summarise")]
+    assert len(map_prompts) == summarizer.last_run["chunks_total"]
+    assert model.max_active == 3
+    final = model.prompts[-1]
+    assert final.startswith("FINAL")
+    assert all(f"### Page {i}" in final for i in range(3))
+    assert result.startswith("note")
+
+@pytest.mark.asyncio
+async def test_token_budget_stops_early_but_covers_every_source():
+    model = FakeModel(delay=0)
+    summarizer = MapReduceSummarizer(model.generate, chunk_tokens=200, merge_input_tokens=400, token_budget=900)
+    documents = [(f"Page {i}", f"https://{i}", page(2000)) for i in range(3)]
+
+    await summarizer.summarize(documents, build_prompt)
+
+    run = summarizer.last_run
+    assert run["chunks_read"] < run["chunks_total"]
+    map_prompts = [p for p in model.prompts if p.startswith("Summarise")]
+    assert len(map_prompts) == run["chunks_read"]
+    assert all(any(f'"Page {i}"' in p for p in map_prompts) for i in range(3))
+
+@pytest.mark.asyncio
+async def test_reduce_merges_until_notes_fit():
+    model = FakeModel(delay=0)
+    summarizer = MapReduceSummarizer(model.generate, merge_input_tokens=30)
+    notes = [f"### Page {i}\nURL: https://{i}\n\n" + "detail " * 20 for i in range(8)]
+
+    merged = await summarizer.reduce(notes)
+
+    assert len(merged) < len(notes)
+    assert summarizer.last_run["reduce_rounds"] >= 1
+
+@pytest.mark.asyncio
+async def test_final_step_can_stream():
+    model = FakeModel(delay=0)
+    summarizer = MapReduceSummarizer(model.generate, model.stream, chunk_tokens=200, merge_input_tokens=400)
+    documents = [("Page", "https://p", page(1000))]
+
+    result = await summarizer.summarize(documents, build_prompt, stream=True)
+
+    assert isinstance(result, StreamingResponse)
+    assert await result.text() == "final summary"